@@ -0,0 +1,87 @@
+import json
+import logging
+import sys
+import typing as typ
+from collections.abc import Callable, Collection, Iterable, Mapping
+
+import sidcon.faction
+from sidcon.faction import Faction
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+JSON = typ.Any
+
+# Echoed back on the query's result line so callers can match results to queries.
+ID_KEY = "id"
+
+
+@typ.final
+class QueryError(Exception):
+    pass
+
+
+def required(query: Mapping[str, JSON], key: str) -> JSON:
+    if key not in query:
+        raise QueryError(f"missing parameter '{key}'")
+    return query[key]
+
+
+def integer(query: Mapping[str, JSON], key: str) -> int:
+    value = required(query, key)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise QueryError(f"parameter '{key}' must be an integer")
+    return value
+
+
+def names(query: Mapping[str, JSON], key: str, known: Collection[str]) -> list[str] | None:
+    """Returns the query's optional key, a list of names each in known."""
+    if key not in query:
+        return None
+    value = query[key]
+    if not isinstance(value, list) or not all(isinstance(n, str) for n in value):
+        raise QueryError(f"parameter '{key}' must be a list of strings")
+    unknown = [n for n in value if n not in known]
+    if unknown:
+        raise QueryError(f"unknown {key} {unknown}")
+    return value
+
+
+def factions_filter(query: Mapping[str, JSON]) -> Collection[type[Faction]] | None:
+    """Returns the factions named by the query's optional "factions" list."""
+    factions = names(query, "factions", sidcon.faction.name_to_faction)
+    if factions is None:
+        return None
+    return {sidcon.faction.name_to_faction[n] for n in factions}
+
+
+def run(
+    answer: Callable[[Mapping[str, JSON]], JSON],
+    lines: Iterable[str] = sys.stdin,
+    out: typ.TextIO = sys.stdout,
+) -> int:
+    """Answers one JSON query object per input line with one JSON result per output line.
+
+    Blank lines are skipped. A query that fails gets an {"error": ...} line rather than ending the
+    stream. Output is flushed after every line so results stream to downstream pipeline stages.
+    Returns the number of queries answered.
+    """
+    n = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        n += 1
+        result: dict[str, JSON] = dict()
+        try:
+            query = json.loads(line)
+            if not isinstance(query, Mapping):
+                raise QueryError("query must be a JSON object")
+            if ID_KEY in query:
+                result[ID_KEY] = query[ID_KEY]
+            result.update(answer(query))
+        except (json.JSONDecodeError, QueryError, KeyError, TypeError, ValueError) as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+    return n
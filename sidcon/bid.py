@@ -0,0 +1,287 @@
+import argparse
+import dataclasses
+import json
+import logging
+import time
+import typing as typ
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.countedunits
+import sidcon.faction
+import sidcon.game
+import sidcon.parse
+import sidcon.research
+from sidcon.card import Card, DualFacedColonyCard, ResearchTeam
+from sidcon.converter import Converter, PurpleConverter, alternatives
+from sidcon.countedunits import CountedUnits
+from sidcon.faction import Faction
+from sidcon.rollout import default_turns
+from sidcon.tech_upgrade_value import UpgradeEdge, face_value, upgrade_edges
+from sidcon.unit import AnyColony, Colony, Ship
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+colony_types: Sequence[type[Colony]] = [
+    u for u in sidcon.game.resources if issubclass(u, Colony) and u is not AnyColony
+]
+
+
+def _faction_cards(cards: Sequence[Card], faction: type[Faction]) -> list[Card]:
+    return [c for c in cards if getattr(c, "faction", None) is faction]
+
+
+def _colony_uses(inputs: CountedUnits, gain: float) -> Mapping[type[Colony], float]:
+    """Returns what each colony type among inputs is worth: gain, less the value of the other
+    units, split evenly over the colonies."""
+    colonies = {u: n for u, n in inputs.items() if issubclass(u, Colony)}
+    count = sum(colonies.values())
+    if count == 0:
+        return dict()
+    others = {u: n for u, n in inputs.items() if u not in colonies}
+    per_colony = (gain - sidcon.countedunits.value(others)) / count
+    if AnyColony in colonies:
+        return {t: per_colony for t in colony_types}
+    return {t: per_colony for t in colonies}
+
+
+def colony_demand(
+    cards: Sequence[Card], faction: type[Faction], turns: int = default_turns
+) -> dict[type[Colony], float]:
+    """Returns what a colony of each type is worth to faction over turns turns: the most it adds
+    to any converter whose inputs, or upgrade whose cost, include a colony of that type, over
+    faction's cards. An upgrade is worth what its cost pays out, and what the upgraded face
+    produces over what it replaces, every turn. A colony that nothing uses is worth nothing."""
+    demand = {t: 0.0 for t in colony_types}
+    for c in _faction_cards(cards, faction):
+        for face in c.front.reachable_faces:
+            uses: list[tuple[CountedUnits, float]] = []
+            for x in face.features:
+                if isinstance(x, Converter) and not isinstance(x, PurpleConverter):
+                    uses.extend((i, x.max_output_value) for i in alternatives(x.inputs))
+            for _, requirements, upgraded in face.upgrades:
+                gain = turns * (face_value(upgraded) - face_value(face))
+                for u in requirements:
+                    if isinstance(u, PurpleConverter):
+                        uses.extend((i, gain + u.max_output_value) for i in alternatives(u.inputs))
+            for inputs, gain in uses:
+                for t, v in _colony_uses(inputs, gain).items():
+                    demand[t] = max(demand[t], v)
+    return demand
+
+
+def colony_value(
+    card: DualFacedColonyCard,
+    faction: type[Faction],
+    demand: Mapping[type[Colony], float],
+    turns: int = default_turns,
+) -> float:
+    """Returns what winning card is worth to faction over turns turns: what the colony produces,
+    and what its type adds to faction's cards, demand. A faction that can't support colonies
+    can't use one."""
+    if faction.colony_support == 0:
+        return 0.0
+    return turns * face_value(card.front) + demand[card.front_type]
+
+
+def research_team_value(
+    team: ResearchTeam,
+    faction: type[Faction],
+    edges: Sequence[UpgradeEdge],
+    turns: int = default_turns,
+) -> float:
+    """Returns what winning team is worth to faction over turns turns: what researching it pays
+    out, net of its cost, and what the technology it discovers adds to faction's upgrades,
+    edges, every turn."""
+    gain = sum(
+        face_value(e.upgraded) - face_value(e.front)
+        for e in edges
+        if team.technology is not None and team.technology in e.technologies
+    )
+    return max(team.cost.max_net_value, 0.0) + turns * max(gain, 0.0)
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Results(object):
+    """Totals over simulated bid rounds, per seat: value won, ships paid and items won."""
+
+    factions: tuple[type[Faction], ...]
+    rounds: int
+    won: npt.NDArray
+    paid: npt.NDArray
+    items: npt.NDArray
+
+    @property
+    def surplus(self) -> npt.NDArray:
+        """Returns each seat's mean value won less ships paid, per round."""
+        return (self.won - self.paid * Ship.value) / self.rounds
+
+    def to_json(self) -> dict[str, typ.Any]:
+        return {
+            "rounds": self.rounds,
+            "factions": [
+                {
+                    "faction": f.faction_name,
+                    "won": float(self.won[p] / self.rounds),
+                    "paid": float(self.paid[p] / self.rounds),
+                    "items": float(self.items[p] / self.rounds),
+                    "surplus": float(self.surplus[p]),
+                }
+                for p, f in enumerate(self.factions)
+            ],
+        }
+
+
+@typ.final
+class BidAuction(object):
+    """The bid phase at a table, simulated many rounds at once.
+
+    Each round, colonies colony cards and teams research teams are drawn. Every player bids ships
+    for first pick: their shading of the most they value any item drawn, at Ship.value a ship,
+    and at most their ship budget for the round. Players then pick in order of bid, ties going
+    to the higher tiebreaker, each taking the item drawn they value most and paying their bid;
+    a player bidding nothing still picks, after every player who bid.
+
+    ships is each player's starting ships, the budget run uses unless it's given one.
+    """
+
+    factions: typ.Final[Sequence[type[Faction]]]
+    items: typ.Final[Sequence[Card]]
+    value: typ.Final[npt.NDArray]  # [player, item]
+    ships: typ.Final[npt.NDArray]  # [player]
+    colonies: typ.Final[int]
+    teams: typ.Final[int]
+
+    _colony_items: npt.NDArray
+    _team_items: npt.NDArray
+    _tiebreaker: npt.NDArray
+
+    def __init__(
+        self,
+        cards: Sequence[Card],
+        factions: Sequence[type[Faction]],
+        colonies: int | None = None,
+        teams: int | None = None,
+        research_teams: Sequence[ResearchTeam] | None = None,
+        turns: int = default_turns,
+    ) -> None:
+        if research_teams is None:
+            research_teams = sidcon.research.all_research_teams()
+        colony_cards = [c for c in cards if isinstance(c, DualFacedColonyCard)]
+        self.factions = factions
+        self.items = [*colony_cards, *research_teams]
+        self.colonies = colonies if colonies is not None else len(factions)
+        self.teams = teams if teams is not None else len(factions) // 2
+
+        value = np.zeros((len(factions), len(self.items)))
+        for p, f in enumerate(factions):
+            demand = colony_demand(cards, f, turns)
+            edges = upgrade_edges(_faction_cards(cards, f))
+            for i, c in enumerate(colony_cards):
+                value[p, i] = colony_value(c, f, demand, turns)
+            for i, t in enumerate(research_teams):
+                value[p, len(colony_cards) + i] = research_team_value(t, f, edges, turns)
+        self.value = value
+        self.ships = np.array(
+            [sidcon.game.starting_resources(f).get(Ship, 0) for f in factions], dtype=np.int64
+        )
+        self._colony_items = np.arange(len(colony_cards))
+        self._team_items = np.arange(len(colony_cards), len(self.items))
+        self._tiebreaker = np.array([f.tiebreaker for f in factions], dtype=np.float64)
+
+    def _draw(self, rounds: int, rng: np.random.Generator) -> npt.NDArray:
+        """Returns the items drawn each round [round, item drawn], without replacement."""
+        colonies = self._colony_items[
+            np.argsort(rng.random((rounds, len(self._colony_items))), axis=-1)
+        ][:, : self.colonies]
+        teams = self._team_items[np.argsort(rng.random((rounds, len(self._team_items))), axis=-1)][
+            :, : self.teams
+        ]
+        return np.concatenate([colonies, teams], axis=-1)
+
+    def run(
+        self,
+        rounds: int,
+        shading: Sequence[float],
+        rng: np.random.Generator,
+        ships: npt.ArrayLike | None = None,
+    ) -> Results:
+        """Simulates rounds rounds with each player shading their bids by shading[player].
+
+        ships is the most each player can bid, either per player [player] or per round [round,
+        player], such as the ships in a sidcon.game.Table's inventory; by default, their
+        starting ships.
+        """
+        budget = np.broadcast_to(
+            np.asarray(self.ships if ships is None else ships, dtype=np.int64),
+            (rounds, len(self.factions)),
+        )
+        drawn = self._draw(rounds, rng)
+        value = self.value[:, drawn].transpose(1, 0, 2)  # [round, player, item drawn]
+        most = value.max(axis=-1)
+        bids = np.minimum(
+            np.floor(np.asarray(shading)[None, :] * most / Ship.value), budget
+        ).astype(np.int64)
+        order = np.lexsort((-np.broadcast_to(self._tiebreaker, bids.shape), -bids), axis=-1)
+
+        rows = np.arange(rounds)
+        open_ = np.ones(drawn.shape, dtype=bool)
+        won = np.zeros(bids.shape)
+        paid = np.zeros(bids.shape, dtype=np.int64)
+        picked = np.zeros(bids.shape, dtype=bool)
+        for i in range(len(self.factions)):
+            p = order[:, i]
+            wants = np.where(open_, value[rows, p], -np.inf)
+            pick = np.argmax(wants, axis=-1)
+            picks = open_.any(axis=-1)
+            picked[rows[picks], p[picks]] = True
+            won[rows[picks], p[picks]] = value[rows, p, pick][picks]
+            paid[rows[picks], p[picks]] = bids[rows, p][picks]
+            open_[rows[picks], pick[picks]] = False
+
+        return Results(
+            factions=tuple(self.factions),
+            rounds=rounds,
+            won=won.sum(axis=0),
+            paid=paid.sum(axis=0),
+            items=picked.sum(axis=0),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("factions", nargs="+", help="faction names, one per player")
+    parser.add_argument("-r", "--rounds", type=int, default=10000)
+    parser.add_argument(
+        "-s", "--shading", type=float, nargs="+", default=[0.5], help="one, or one per player"
+    )
+    parser.add_argument(
+        "--ships",
+        type=int,
+        nargs="+",
+        help="the most each player can bid, one or one per player; by default, starting ships",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    factions = [sidcon.faction.name_to_faction[f] for f in args.factions]
+    shading = args.shading * len(factions) if len(args.shading) == 1 else args.shading
+    ships = None
+    if args.ships is not None:
+        ships = args.ships * len(factions) if len(args.ships) == 1 else args.ships
+    auction = BidAuction(sidcon.parse.all_cards(), factions)
+
+    start = time.perf_counter()
+    results = auction.run(args.rounds, shading, np.random.default_rng(args.seed), ships)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps(results.to_json(), indent=2))
+    print(f"{args.rounds / elapsed:,.0f} rounds per second")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import dataclasses
 import enum
+import inspect
 import logging
+import re
+import sys
 import typing as typ
-from collections.abc import Collection, Mapping, Sequence, Set
+from collections.abc import Callable, Collection, Iterator, Mapping, Sequence, Set
 
 from frozendict import frozendict
 
@@ -13,6 +16,8 @@ import sidcon.cost
 import sidcon.exception
 import sidcon.faction
 import sidcon.feature
+import sidcon.technology
+import sidcon.unit
 import sidcon.upgrade
 from sidcon.cost import Cost
 from sidcon.face import Face
@@ -175,6 +180,21 @@ class Card(object):
     def era(self) -> Era | None:
         return self.front.era
 
+    @property
+    def era_or_none(self) -> Era | None:
+        """era, or None if the card's faces don't agree on one."""
+        try:
+            return self.era
+        except ValueError:
+            return None
+
+    @property
+    def faces(self) -> list[Face]:
+        """Every face the card can reach, each once. front.reachable_faces lists a face once per
+        upgrade path to it, as a KtDualCard's fully upgraded state is reached through either
+        half."""
+        return list({id(f): f for f in self.front.reachable_faces}.values())
+
     @classmethod
     def from_row(cls, r: Row) -> Card:
         back: Face | None = None
@@ -257,24 +277,67 @@ class StartingCard(FactionCard, Starting):
 @typ.final
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class SetupCard(FactionCard, Starting):
-    colonies: Collection["Colony"]
-    research_teams: Collection["ResearchTeam"]
+    """A faction's Starting Race Card: its front is the resources the faction starts with."""
+
+    colonies: Sequence[type[Colony]]
+    "The colonies the faction starts with; AnyColony for each one drawn from the deck."
+    research_teams: int
+    "How many research teams the faction draws at the start."
 
     @classmethod
     def from_row(cls, r: Row) -> SetupCard:
-        copied_row = r.copy(upgrade1="", upgrade2="")
-        # TODO: Parse upgrade1 and upgrade2 as colonies/research teams here. When you do, consider
-        # updating the type hint from Collection to Set, or list, or something.
+        # Grand Fleet's card counts some units before the unit ("5g4w3b"), unlike every other,
+        # and Faderan Conclave's spaces its features ("UYTwwwb**, NR").
+        front_converter = ",".join(
+            re.sub(r"(\d+)(\D)", lambda m: m[2] * int(m[1]), s.strip())
+            for s in r.front_converter.split(",")
+        )
+        copied_row = r.copy(front_converter=front_converter, upgrade1="", upgrade2="")
         c = super().from_row(copied_row)
+        colonies, colonies_rest = _setup_colonies(r.upgrade1)
+        research_teams, research_teams_rest = _setup_research_teams(r.upgrade2)
+        for rest in [colonies_rest, research_teams_rest, r.upgrade3.strip(), r.back_name.strip()]:
+            if rest:
+                logger.warning(f"{r.faction_name}'s setup card: '{rest}' isn't parsed")
         return SetupCard(
             front=c.front,
             species=c.species,
             faction=c.faction,
-            colonies=[],
-            research_teams=[],
+            colonies=colonies,
+            research_teams=research_teams,
         )
 
 
+_setup_colony_types: Mapping[str, type[Colony]] = {
+    "Desert": sidcon.unit.DesertColony,
+    "Ice": sidcon.unit.IceColony,
+    "Jungle": sidcon.unit.JungleColony,
+    "Water": sidcon.unit.OceanColony,
+}
+
+
+def _setup_colonies(s: str) -> tuple[list[type[Colony]], str]:
+    """Parses a setup card's colonies, like "2 Colonies" or "3 Colonies: Jungle, Water, Desert",
+    and returns them with the text left unparsed, like Caylion Plutocracy's "with x2"."""
+    s = s.strip()
+    m = re.match(r"(\d+) Colon(?:y|ies)(?::([\w ,]*))?", s)
+    if m is None:
+        return [], s
+    named = [_setup_colony_types[name.strip()] for name in (m[2] or "").split(",") if name.strip()]
+    colonies = named + [sidcon.unit.AnyColony] * (int(m[1]) - len(named))
+    return colonies, s[m.end() :].strip()  # noqa: E203
+
+
+def _setup_research_teams(s: str) -> tuple[int, str]:
+    """Parses a setup card's research teams, like "1 Research Team", and returns them with the
+    text left unparsed, including the era of Caylion Collaborative's "1 Era 2 Research Team"."""
+    s = s.strip()
+    m = re.match(r"(\d+) (?:(Era \d+) )?Research Teams?", s)
+    if m is None:
+        return 0, s
+    return int(m[1]), " ".join(filter(None, [m[2], s[m.end() :].strip()]))  # noqa: E203
+
+
 @typ.final
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class InterestConverterCard(StartingCard):
@@ -331,9 +394,34 @@ class DualFacedColonyCard(FrontedColonyCard):
         )
 
 
+@typ.final
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class ResearchTeam(Card):
-    pass
+    research_era: Era
+    technology: type[Technology] | None  # None for era 4 teams, which are researched only for VPs
+
+    @property
+    def era(self) -> Era | None:
+        return self.research_era
+
+    @property
+    def cost(self) -> sidcon.converter.PurpleConverter:
+        converter = self.front.converter
+        if not isinstance(converter, sidcon.converter.PurpleConverter):
+            raise ValueError(f"research team '{self.name}' has no research cost converter")
+        return converter
+
+    @classmethod
+    def from_row(cls, r: Row) -> ResearchTeam:
+        research_era = Era.from_string(r.era)
+        if research_era is None:
+            raise ValueError(f"research team '{r.front_name}' has no era")
+        c = super().from_row(r.copy(back_name=""))
+        return ResearchTeam(
+            front=c.front,
+            research_era=research_era,
+            technology=sidcon.technology.name_to_technology.get(r.back_name),
+        )
 
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
@@ -368,31 +456,125 @@ class KtColonyCard(CreatedCard, FrontedColonyCard):
         )
 
 
+# One half's upgrades from each of its faces, as (era, requirements, upgraded face index), with
+# faces indexed in reachable_faces order.
+_HalfUpgrades = Sequence[Sequence[tuple[Era | None, Collection[Upgrade], int]]]
+
+
+def _half_upgrades(faces: Sequence[Face]) -> _HalfUpgrades:
+    index = {id(f): i for i, f in enumerate(faces)}
+    return [[(era, u, index[id(upgraded)]) for era, u, upgraded in f.upgrades] for f in faces]
+
+
+@typ.final
+class _KtUpgrades(Sequence[tuple[Era | None, Collection[Upgrade], Face]]):
+    """The upgrades of a KtDualCard state: each of the left half's, then each of the right's.
+
+    Upgraded states are only merged when accessed.
+    """
+
+    card: typ.Final[KtDualCard]
+    state: typ.Final[tuple[int, int]]
+
+    def __init__(self, card: KtDualCard, state: tuple[int, int]) -> None:
+        self.card = card
+        self.state = state
+
+    def _upgrades(self) -> list[tuple[Era | None, Collection[Upgrade], tuple[int, int]]]:
+        i, j = self.state
+        return [(era, u, (k, j)) for era, u, k in self.card._left_upgrades[i]] + [
+            (era, u, (i, k)) for era, u, k in self.card._right_upgrades[j]
+        ]
+
+    def __len__(self) -> int:
+        i, j = self.state
+        return len(self.card._left_upgrades[i]) + len(self.card._right_upgrades[j])
+
+    @typ.overload
+    def __getitem__(self, index: int) -> tuple[Era | None, Collection[Upgrade], Face]:
+        ...
+
+    @typ.overload
+    def __getitem__(self, index: slice) -> Sequence[tuple[Era | None, Collection[Upgrade], Face]]:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        era, u, state = self._upgrades()[index]
+        return era, u, self.card.state(*state)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
 @typ.final
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class KtDualCard(StartingCard):
+    """Two half cards side by side, each upgrading independently.
+
+    A state is a face of each half; its face has the halves' features merged pairwise, and
+    upgrades to the states one half's upgrade away. front is the state of both halves' fronts.
+    States are merged when first reached and memoized, so nothing is built for upgrade paths that
+    are never walked.
+    """
+
+    left: Face
+    right: Face
+    front: Face = dataclasses.field(init=False, repr=False, compare=False)
+
+    _left_faces: Sequence[Face] = dataclasses.field(init=False, repr=False, compare=False)
+    _right_faces: Sequence[Face] = dataclasses.field(init=False, repr=False, compare=False)
+    _left_upgrades: _HalfUpgrades = dataclasses.field(init=False, repr=False, compare=False)
+    _right_upgrades: _HalfUpgrades = dataclasses.field(init=False, repr=False, compare=False)
+    _states: dict[tuple[int, int], Face] = dataclasses.field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        left_faces = self.left.reachable_faces
+        right_faces = self.right.reachable_faces
+        object.__setattr__(self, "_left_faces", left_faces)
+        object.__setattr__(self, "_right_faces", right_faces)
+        object.__setattr__(self, "_left_upgrades", _half_upgrades(left_faces))
+        object.__setattr__(self, "_right_upgrades", _half_upgrades(right_faces))
+        object.__setattr__(self, "front", self.state(0, 0))
+
     @classmethod
     def from_rows(cls, left_row: Row, right_row: Row) -> KtDualCard:
         left_card = super().from_row(left_row)
         right_card = super().from_row(right_row)
         return KtDualCard(
-            front=cls._merged_face(
-                left_card.front,
-                right_card.front,
-            ),
+            left=left_card.front,
+            right=right_card.front,
             species=KtZrKtRtl,
             faction=left_card.faction,
         )
 
-    @staticmethod
-    def _merged_face(left_face: Face, right_face: Face) -> Face:
-        return Face(
-            name=f"{left_face.name} {right_face.name}",
-            features=KtDualCard._merged_features(left_face.features, right_face.features),
-            upgrades=KtDualCard._merged_upgrades(
-                left_face, right_face, left_face.upgrades, right_face.upgrades
-            ),
-        )
+    def state(self, i: int, j: int) -> Face:
+        """Returns the face of the state with the left half's i-th face and the right half's
+        j-th, in reachable_faces order."""
+        if (i, j) not in self._states:
+            left_face, right_face = self._left_faces[i], self._right_faces[j]
+            self._states[(i, j)] = Face(
+                name=f"{left_face.name} {right_face.name}",
+                features=KtDualCard._merged_features(left_face.features, right_face.features),
+                upgrades=_KtUpgrades(self, (i, j)),
+            )
+        return self._states[(i, j)]
+
+    def states(self, keep: Callable[[Face, Face], bool] | None = None) -> Iterator[Face]:
+        """Yields the face of every state, or of those whose left and right faces keep is true
+        for. States keep rejects are never merged, so keep can prune with bounds on each half."""
+        for i, left_face in enumerate(self._left_faces):
+            for j, right_face in enumerate(self._right_faces):
+                if keep is None or keep(left_face, right_face):
+                    yield self.state(i, j)
 
     @staticmethod
     def _merged_features(
@@ -409,24 +591,6 @@ class KtDualCard(StartingCard):
             merged.append(mf)
         return merged
 
-    @staticmethod
-    def _merged_upgrades(
-        left_face: Face,
-        right_face: Face,
-        left_upgrades: Sequence[tuple[Era | None, Collection[Upgrade], Face]],
-        right_upgrades: Sequence[tuple[Era | None, Collection[Upgrade], Face]],
-    ) -> list[tuple[Era | None, Collection[Upgrade], Face]]:
-        merged_upgrades = []
-        for (left_era, left_upgrade, left_upgraded_face) in left_upgrades:
-            merged_upgrades.append(
-                (left_era, left_upgrade, KtDualCard._merged_face(left_upgraded_face, right_face))
-            )
-        for (right_era, right_upgrade, right_upgraded_face) in right_upgrades:
-            merged_upgrades.append(
-                (right_era, right_upgrade, KtDualCard._merged_face(left_face, right_upgraded_face))
-            )
-        return merged_upgrades
-
 
 @typ.final
 @dataclasses.dataclass(frozen=True, kw_only=True)
@@ -472,3 +636,10 @@ class RelicWorldCard(CreatedCard):
             faction=c.faction,
             cost=c.cost,
         )
+
+
+class_name_to_card_type: Mapping[str, type[Card]] = {
+    c.__name__: c
+    for name, c in inspect.getmembers(sys.modules[__name__])
+    if inspect.isclass(c) and issubclass(c, Card)
+}
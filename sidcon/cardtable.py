@@ -0,0 +1,446 @@
+import argparse
+import logging
+import mmap
+import pickle
+import struct
+import time
+import typing as typ
+from collections.abc import Sequence
+from multiprocessing import shared_memory
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.card
+import sidcon.donation
+import sidcon.parse
+import sidcon.unit
+from sidcon.card import Card
+from sidcon.converter import Converter, UniqueOutput, alternatives
+from sidcon.face import Face
+from sidcon.unit import Unit
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# File layout
+# -----------
+# A fixed header, followed by sections each aligned to _ALIGNMENT bytes:
+#
+#   strings        UTF-8 bytes; every string field is an (offset, length) pair into this section
+#   cards          one _card_dtype record per card
+#   faces          one _face_dtype record per Face reachable from a card, in card order, each
+#                  card's faces in depth-first order starting with its front
+#   converters     one _converter_dtype record per Converter on those faces
+#   counts         int16[n_alternatives, 2, n_units]; owned then donated units of each input and
+#                  output alternative, indexed by converter.first_alternative
+#   pickles        each card pickled on its own, so a reader unpickles only the cards it touches
+#
+# Every section is read through numpy views of the underlying buffer, so opening a table copies
+# nothing and every process mapping the same file or shared memory block shares one copy.
+
+default_path = "sidcon.cards"
+
+_MAGIC = b"SIDCONCT"
+_VERSION = 2
+_ALIGNMENT = 64
+_SECTIONS = ["strings", "cards", "faces", "converters", "counts", "pickles"]
+
+# magic, version, n_units, then (offset, size) for each section
+_header = struct.Struct("<8sII" + "QQ" * len(_SECTIONS))
+
+_string_ref = [("offset", "<u4"), ("length", "<u4")]
+
+_card_dtype = np.dtype(
+    [
+        ("name", _string_ref),
+        ("card_type", "<u2"),
+        ("era", "u1"),
+        ("first_face", "<u4"),
+        ("n_faces", "<u4"),
+        ("pickle_offset", "<u8"),
+        ("pickle_length", "<u4"),
+    ],
+    align=True,
+)
+
+_face_dtype = np.dtype(
+    [
+        ("name", _string_ref),
+        ("card", "<u4"),
+        ("parent", "<i4"),
+        ("depth", "u1"),
+        ("first_converter", "<u4"),
+        ("n_converters", "<u2"),
+        ("min_input_value", "<f8"),
+        ("max_input_value", "<f8"),
+        ("min_output_value", "<f8"),
+        ("max_output_value", "<f8"),
+    ],
+    align=True,
+)
+
+_converter_dtype = np.dtype(
+    [
+        ("face", "<u4"),
+        ("position", "<u2"),
+        ("converter", "u1"),
+        ("unique_output", "i1"),
+        ("first_alternative", "<u4"),
+        ("n_inputs", "<u2"),
+        ("n_outputs", "<u2"),
+        ("min_input_value", "<f8"),
+        ("max_input_value", "<f8"),
+        ("min_output_value", "<f8"),
+        ("max_output_value", "<f8"),
+    ],
+    align=True,
+)
+
+OWNED = sidcon.donation.OWNED
+DONATED = sidcon.donation.DONATED
+
+# Donation units are counted in the column of the unit they are a donation of.
+units: Sequence[type[Unit]] = sidcon.donation.units
+card_types: Sequence[type[Card]] = sorted(
+    sidcon.card.class_name_to_card_type.values(), key=lambda t: t.__name__
+)
+converter_types: Sequence[type[Converter]] = sorted(
+    Converter.__subclasses__(), key=lambda t: t.__name__
+)
+unique_outputs: Sequence[UniqueOutput] = list(UniqueOutput)
+
+
+@typ.final
+class CardTableFormatError(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(f"not a valid card table: {message}")
+
+
+def _align(n: int) -> int:
+    return -(-n // _ALIGNMENT) * _ALIGNMENT
+
+
+def _converter_value(c: Converter, attribute: str) -> float:
+    # Faces with alternative outputs have no single output value.
+    try:
+        return float(getattr(c, attribute))
+    except ValueError:
+        return np.nan
+
+
+class _Strings(object):
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.refs: dict[str, tuple[int, int]] = dict()
+
+    def ref(self, s: str) -> tuple[int, int]:
+        if s not in self.refs:
+            encoded = s.encode()
+            self.refs[s] = (len(self.data), len(encoded))
+            self.data.extend(encoded)
+        return self.refs[s]
+
+
+def to_bytes(cards: Sequence[Card]) -> bytes:
+    """Serializes cards into the card table format."""
+    strings = _Strings()
+    pickles = bytearray()
+
+    card_records: list[tuple] = []
+    face_records: list[tuple] = []
+    converter_records: list[tuple] = []
+    counts: list[npt.NDArray] = []
+
+    for card_index, card in enumerate(cards):
+        pickled = pickle.dumps(card, protocol=pickle.HIGHEST_PROTOCOL)
+        first_face = len(face_records)
+        for face, depth, parent in card.front.reachable_tree:
+            first_converter = len(converter_records)
+            for position, feature in enumerate(face.features):
+                if not isinstance(feature, Converter):
+                    continue
+                inputs = alternatives(feature.inputs)
+                outputs = alternatives(feature.outputs)
+                unique_output = -1
+                first_alternative = len(counts)
+                for alternative in [*inputs, *outputs]:
+                    row = np.zeros((2, len(units)), dtype=np.int16)
+                    if isinstance(alternative, UniqueOutput):
+                        unique_output = unique_outputs.index(alternative)
+                    else:
+                        for unit, n in alternative.items():
+                            row[sidcon.donation.unit_index[unit]] += n
+                    counts.append(row)
+                converter_records.append(
+                    (
+                        len(face_records),
+                        position,
+                        converter_types.index(type(feature)),
+                        unique_output,
+                        first_alternative,
+                        len(inputs),
+                        len(outputs),
+                        _converter_value(feature, "min_input_value"),
+                        _converter_value(feature, "max_input_value"),
+                        _converter_value(feature, "min_output_value"),
+                        _converter_value(feature, "max_output_value"),
+                    )
+                )
+            face_records.append(
+                (
+                    strings.ref(face.name),
+                    card_index,
+                    parent + first_face if parent >= 0 else -1,
+                    depth,
+                    first_converter,
+                    len(converter_records) - first_converter,
+                    face.converter_value("min_input_value"),
+                    face.converter_value("max_input_value"),
+                    face.converter_value("min_output_value"),
+                    face.converter_value("max_output_value"),
+                )
+            )
+        card_records.append(
+            (
+                strings.ref(card.name),
+                card_types.index(type(card)),
+                int(card.era_or_none or 0),
+                first_face,
+                len(face_records) - first_face,
+                len(pickles),
+                len(pickled),
+            )
+        )
+        pickles.extend(pickled)
+
+    counts_array = np.stack(counts) if counts else np.zeros((0, 2, len(units)), dtype=np.int16)
+    sections = [
+        bytes(strings.data),
+        np.array(card_records, dtype=_card_dtype).tobytes(),
+        np.array(face_records, dtype=_face_dtype).tobytes(),
+        np.array(converter_records, dtype=_converter_dtype).tobytes(),
+        counts_array.astype("<i2").tobytes(),
+        bytes(pickles),
+    ]
+
+    out = bytearray(_align(_header.size))
+    layout = []
+    for section in sections:
+        layout.extend([len(out), len(section)])
+        out.extend(section)
+        out.extend(bytes(_align(len(out)) - len(out)))
+    _header.pack_into(out, 0, _MAGIC, _VERSION, len(units), *layout)
+    return bytes(out)
+
+
+def write(cards: Sequence[Card], path: str = default_path) -> None:
+    with open(path, "wb") as f:
+        f.write(to_bytes(cards))
+
+
+@typ.final
+class CardTable(Sequence[Card]):
+    """A read-only card table over any buffer: bytes, an mmap, or a SharedMemory block.
+
+    The record arrays (cards, faces, converters, counts) are numpy views of the buffer. Card and
+    Face objects are built on demand and cached per CardTable.
+
+    Cards are stored pickled, so reading one runs whatever the table's author put there: only
+    ever open tables this code wrote, never untrusted ones.
+
+    Usage:
+        with CardTable.open("sidcon.cards") as table:
+            table.faces["max_output_value"].max()
+            table.card(table.index("Antimatter Power"))
+    """
+
+    cards: typ.Final[npt.NDArray]
+    faces: typ.Final[npt.NDArray]
+    converters: typ.Final[npt.NDArray]
+    counts: typ.Final[npt.NDArray]
+
+    _buffer: memoryview
+    _strings: memoryview
+    _pickles: memoryview
+    _closers: list[typ.Callable[[], None]]
+    _name_to_index: dict[str, int] | None
+    _card_cache: dict[int, Card]
+
+    def __init__(self, buffer: typ.Any, closers: Sequence[typ.Callable[[], None]] = ()) -> None:
+        self._buffer = memoryview(buffer)
+        self._closers = list(closers)
+        if len(self._buffer) < _header.size:
+            raise CardTableFormatError("truncated header")
+        magic, version, n_units, *layout = _header.unpack_from(self._buffer, 0)
+        if magic != _MAGIC:
+            raise CardTableFormatError(f"bad magic {magic!r}")
+        if version != _VERSION:
+            raise CardTableFormatError(f"unsupported version {version}")
+        if n_units != len(units):
+            raise CardTableFormatError(f"written with {n_units} units, expected {len(units)}")
+
+        section = {
+            name: self._buffer[offset : offset + size]  # noqa: E203
+            for name, offset, size in zip(_SECTIONS, layout[::2], layout[1::2])
+        }
+        self._strings = section["strings"]
+        self._pickles = section["pickles"]
+        self.cards = np.frombuffer(section["cards"], dtype=_card_dtype)
+        self.faces = np.frombuffer(section["faces"], dtype=_face_dtype)
+        self.converters = np.frombuffer(section["converters"], dtype=_converter_dtype)
+        self.counts = np.frombuffer(section["counts"], dtype="<i2").reshape(-1, 2, len(units))
+        self._name_to_index = None
+        self._card_cache = dict()
+
+    @classmethod
+    def open(cls, path: str = default_path) -> "CardTable":
+        """Memory-maps a card table file read-only."""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, closers=[mapped.close])
+
+    @classmethod
+    def attach(cls, name: str) -> "CardTable":
+        """Attaches to a card table in a SharedMemory block created by share."""
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm.buf, closers=[shm.close])
+
+    def close(self) -> None:
+        # Views into the buffer must be gone before it can be released, so arrays taken from this
+        # table mustn't outlive it.
+        for attribute in ("cards", "faces", "converters", "counts"):
+            self.__dict__.pop(attribute, None)
+        self._strings.release()
+        self._pickles.release()
+        self._buffer.release()
+        self._card_cache.clear()
+        for closer in self._closers:
+            closer()
+        self._closers = []
+
+    def __enter__(self) -> "CardTable":
+        return self
+
+    def __exit__(self, *_: typ.Any) -> None:
+        self.close()
+
+    def string(self, ref: typ.Any) -> str:
+        offset, length = int(ref["offset"]), int(ref["length"])
+        return bytes(self._strings[offset : offset + length]).decode()  # noqa: E203
+
+    def name(self, i: int) -> str:
+        return self.string(self.cards[i]["name"])
+
+    def index(self, name: str) -> int:  # type: ignore[override]
+        """Returns the index of the first card named name."""
+        if self._name_to_index is None:
+            self._name_to_index = dict()
+            for i in reversed(range(len(self.cards))):
+                self._name_to_index[self.name(i)] = i
+        return self._name_to_index[name]
+
+    def card(self, i: int) -> Card:
+        """Unpickles card i; see the class docstring on untrusted tables."""
+        if i not in self._card_cache:
+            record = self.cards[i]
+            offset, length = int(record["pickle_offset"]), int(record["pickle_length"])
+            pickled = self._pickles[offset : offset + length]  # noqa: E203
+            self._card_cache[i] = pickle.loads(pickled)
+        return self._card_cache[i]
+
+    def face(self, i: int) -> Face:
+        record = self.faces[i]
+        card_index = int(record["card"])
+        local = i - int(self.cards[card_index]["first_face"])
+        for j, (f, _, _) in enumerate(self.card(card_index).front.reachable_tree):
+            if j == local:
+                return f
+        raise IndexError(f"face {i} not found on card {card_index}")
+
+    def card_type(self, i: int) -> type[Card]:
+        return card_types[self.cards[i]["card_type"]]
+
+    def converter_counts(self, i: int) -> tuple[npt.NDArray, npt.NDArray]:
+        """Returns converter i's (inputs, outputs) count arrays, each [alternative, owned/donated,
+        unit]."""
+        record = self.converters[i]
+        first = int(record["first_alternative"])
+        n_inputs, n_outputs = int(record["n_inputs"]), int(record["n_outputs"])
+        return (
+            self.counts[first : first + n_inputs],  # noqa: E203
+            self.counts[first + n_inputs : first + n_inputs + n_outputs],  # noqa: E203
+        )
+
+    @typ.overload
+    def __getitem__(self, i: int) -> Card:
+        ...
+
+    @typ.overload
+    def __getitem__(self, i: slice) -> Sequence[Card]:
+        ...
+
+    def __getitem__(self, i: int | slice) -> Card | Sequence[Card]:
+        if isinstance(i, slice):
+            return [self.card(j) for j in range(len(self))[i]]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"card index {i} out of range")
+        return self.card(i)
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+
+@typ.final
+class SharedCardTable(object):
+    """Owns a SharedMemory block holding a card table, for handing to worker processes by name.
+
+    Workers unpickle cards from the block, so its name must only ever be handed to them.
+
+    Usage:
+        with SharedCardTable(sidcon.parse.all_cards()) as shared:
+            pool.map(work, [shared.name] * n)  # each worker calls CardTable.attach(name)
+    """
+
+    shm: typ.Final[shared_memory.SharedMemory]
+
+    def __init__(self, cards: Sequence[Card]) -> None:
+        data = to_bytes(cards)
+        self.shm = shared_memory.SharedMemory(create=True, size=len(data))
+        buf = self.shm.buf
+        assert buf is not None
+        buf[: len(data)] = data
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedCardTable":
+        return self
+
+    def __exit__(self, *_: typ.Any) -> None:
+        self.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?", default=default_path)
+    args = parser.parse_args()
+
+    write(sidcon.parse.all_cards(), args.path)
+    start = time.perf_counter()
+    with CardTable.open(args.path) as table:
+        elapsed = time.perf_counter() - start
+        print(f"Wrote {len(table)} cards, {len(table.faces)} faces to {args.path}")
+        print(f"Opened in {elapsed * 1e6:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import dataclasses
+import logging
+import typing as typ
+from collections import defaultdict
+from collections.abc import Collection, Iterable, Mapping, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.technology
+from sidcon.card import Card
+from sidcon.converter import PurpleConverter
+from sidcon.face import Face
+from sidcon.tech_upgrade_value import face_value
+from sidcon.upgrade import FactionSpecificUpgradeCondition, Upgrade
+from sidcon.upgrade_index import UpgradeKey, canonical
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# A set of technologies and conditions is a bitset: one bit per technology, where a donated
+# technology shares its original's bit, then one per faction-specific condition.
+Mask = int
+
+requirement_keys: Sequence[UpgradeKey] = [
+    *sorted(
+        (
+            t
+            for t in sidcon.technology.name_to_technology.values()
+            if t not in sidcon.technology.donation_to_technology
+        ),
+        key=lambda t: (t.era, t.name),
+    ),
+    *FactionSpecificUpgradeCondition,
+]
+_bits: Mapping[UpgradeKey, Mask] = {k: 1 << i for i, k in enumerate(requirement_keys)}
+
+
+def mask(keys: Iterable[UpgradeKey]) -> Mask:
+    """Returns the bitset of keys; donated technologies are their originals."""
+    m = 0
+    for k in keys:
+        m |= _bits[canonical(k)]
+    return m
+
+
+def keys(m: Mask) -> list[UpgradeKey]:
+    return [k for i, k in enumerate(requirement_keys) if m >> i & 1]
+
+
+def popcount(a: npt.NDArray) -> npt.NDArray:
+    """Returns how many bits each mask in a sets, for masks of at most 32 bits."""
+    a = a - ((a >> 1) & 0x55555555)
+    a = (a & 0x33333333) + ((a >> 2) & 0x33333333)
+    a = (a + (a >> 4)) & 0x0F0F0F0F
+    return (a * 0x01010101 & 0xFFFFFFFF) >> 24
+
+
+def _requirement(requirements: Collection[Upgrade]) -> tuple[Mask, float]:
+    """Returns the technologies and conditions an upgrade needs, and the value it pays."""
+    m = 0
+    cost = 0.0
+    for u in requirements:
+        if isinstance(u, PurpleConverter):
+            cost += u.min_input_value
+        else:
+            m |= _bits[canonical(u)]
+    return m, cost
+
+
+def _minimal(options: Iterable[tuple[Mask, float]]) -> list[tuple[Mask, float]]:
+    """Drops every option another needs no more than and costs no more than."""
+    options = sorted(set(options), key=lambda o: (bin(o[0]).count("1"), o[1]))
+    kept: list[tuple[Mask, float]] = []
+    for m, cost in options:
+        if not any(k & ~m == 0 and c <= cost for k, c in kept):
+            kept.append((m, cost))
+    return kept
+
+
+def _faces_and_options(front: Face) -> tuple[list[Face], list[list[tuple[Mask, float]]]]:
+    """Returns front and every distinct face reachable from it, in topological order, with the
+    minimal ways to reach each."""
+    faces: dict[int, Face] = dict()
+    children: defaultdict[int, list[tuple[Mask, float, int]]] = defaultdict(list)
+    parents: defaultdict[int, int] = defaultdict(int)
+    stack = [front]
+    while stack:
+        f = stack.pop()
+        if id(f) in faces:
+            continue
+        faces[id(f)] = f
+        for _, requirements, upgraded in f.upgrades:
+            children[id(f)].append((*_requirement(requirements), id(upgraded)))
+            parents[id(upgraded)] += 1
+            stack.append(upgraded)
+
+    options: defaultdict[int, list[tuple[Mask, float]]] = defaultdict(list)
+    options[id(front)] = [(0, 0.0)]
+    order = []
+    ready = [id(front)]
+    while ready:
+        i = ready.pop()
+        order.append(i)
+        options[i] = _minimal(options[i])
+        for m, cost, child in children[i]:
+            options[child].extend((pm | m, pc + cost) for pm, pc in options[i])
+            parents[child] -= 1
+            if parents[child] == 0:
+                ready.append(child)
+    return [faces[i] for i in order], [options[i] for i in order]
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Reachable(object):
+    face: Face
+    value: float
+    requirements: Sequence[UpgradeKey]
+    "The technologies and conditions needed on the cheapest allowed way to the face."
+    cost: float
+    "The value paid in upgrade costs on that way."
+
+
+@typ.final
+class UpgradeClosure(object):
+    """Every face every card in a pool can upgrade to, with what reaching it takes.
+
+    Faces are stored once per card, even when several upgrade orders reach them (as with
+    Kt'Zr'Kt'Rtl dual cards), in flat arrays: card i's faces are face_offsets[i] up to
+    face_offsets[i + 1], its front first. Each face has one or more options, the minimal
+    (requirement mask, cost) pairs over the ways to reach it; a requirement mask is a bitset over
+    requirement_keys, so "is this face reachable knowing k" is (option_mask & ~k) == 0.
+    """
+
+    cards: typ.Final[Sequence[Card]]
+    faces: typ.Final[Sequence[Face]]
+    face_offsets: typ.Final[npt.NDArray]
+    face_card: typ.Final[npt.NDArray]
+    value: typ.Final[npt.NDArray]
+    option_offsets: typ.Final[npt.NDArray]
+    option_face: typ.Final[npt.NDArray]
+    option_mask: typ.Final[npt.NDArray]
+    option_cost: typ.Final[npt.NDArray]
+
+    _positions: Mapping[int, int]
+
+    def __init__(self, cards: Sequence[Card]) -> None:
+        self.cards = cards
+        faces: list[Face] = []
+        face_offsets = [0]
+        options: list[tuple[int, Mask, float]] = []
+        option_offsets = [0]
+        for c in cards:
+            card_faces, card_options = _faces_and_options(c.front)
+            for f, face_options in zip(card_faces, card_options):
+                options.extend((len(faces), m, cost) for m, cost in face_options)
+                faces.append(f)
+            face_offsets.append(len(faces))
+            option_offsets.append(len(options))
+
+        self.faces = faces
+        self.face_offsets = np.array(face_offsets, dtype=np.intp)
+        self.face_card = np.repeat(np.arange(len(cards)), np.diff(self.face_offsets))
+        self.value = np.array([face_value(f) for f in faces], dtype=np.float64)
+        self.option_offsets = np.array(option_offsets, dtype=np.intp)
+        self.option_face = np.array([o[0] for o in options], dtype=np.intp)
+        self.option_mask = np.array([o[1] for o in options], dtype=np.int64)
+        self.option_cost = np.array([o[2] for o in options], dtype=np.float64)
+        self._positions = {id(c): i for i, c in enumerate(cards)}
+
+    def position(self, card: Card) -> int:
+        return self._positions[id(card)]
+
+    def _costs(self, known: Mask, faces: slice, options: slice) -> npt.NDArray:
+        """Returns the least cost to reach each of faces knowing known, or inf where it can't be
+        reached; options must be the options of exactly those faces."""
+        met = (self.option_mask[options] & ~known) == 0
+        cost = np.full(faces.stop - faces.start, np.inf)
+        np.minimum.at(
+            cost, self.option_face[options][met] - faces.start, self.option_cost[options][met]
+        )
+        return cost
+
+    def _card_costs(self, card: Card, known: Mask) -> tuple[slice, npt.NDArray]:
+        i = self.position(card)
+        faces = slice(int(self.face_offsets[i]), int(self.face_offsets[i + 1]))
+        options = slice(int(self.option_offsets[i]), int(self.option_offsets[i + 1]))
+        return faces, self._costs(known, faces, options)
+
+    def _reachable(self, f: int, known: Mask) -> Reachable:
+        i = self.face_card[f]
+        start, stop = int(self.option_offsets[i]), int(self.option_offsets[i + 1])
+        card_options = slice(start, stop)
+        options = start + np.flatnonzero(
+            (self.option_face[card_options] == f)
+            & ((self.option_mask[card_options] & ~known) == 0)
+        )
+        o = options[np.argmin(self.option_cost[options])]
+        return Reachable(
+            face=self.faces[f],
+            value=float(self.value[f]),
+            requirements=keys(int(self.option_mask[o])),
+            cost=float(self.option_cost[o]),
+        )
+
+    def reachable(self, card: Card, known: Mask = 0) -> list[Reachable]:
+        """Returns the faces card can be upgraded to knowing known, its front first."""
+        faces, cost = self._card_costs(card, known)
+        return [self._reachable(f + faces.start, known) for f in np.flatnonzero(np.isfinite(cost))]
+
+    def best(self, card: Card, known: Mask = 0) -> Reachable:
+        """Returns card's most valuable face reachable knowing known, the cheaper to reach on
+        ties."""
+        faces, cost = self._card_costs(card, known)
+        value = np.where(np.isfinite(cost), -self.value[faces], np.inf)
+        return self._reachable(int(np.lexsort((cost, value))[0]) + faces.start, known)
+
+    def best_faces(self, known: Mask = 0) -> npt.NDArray:
+        """Returns best for every card at once, as indices into faces."""
+        everything = slice(0, len(self.faces))
+        cost = self._costs(known, everything, slice(0, len(self.option_face)))
+        value = np.where(np.isfinite(cost), -self.value, np.inf)
+        # Sorted by card, then best first, the first face of each card is its best.
+        order = np.lexsort((cost, value, self.face_card))
+        _, first = np.unique(self.face_card[order], return_index=True)
+        return order[first]
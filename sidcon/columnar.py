@@ -0,0 +1,290 @@
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import typing as typ
+from collections.abc import Iterator, Mapping, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.donation
+import sidcon.parse
+import sidcon.unit
+from sidcon.card import Card
+from sidcon.converter import Converter, UniqueOutput, alternatives
+from sidcon.countedunits import CountedUnits
+from sidcon.donation import DONATED, OWNED
+from sidcon.face import Face
+from sidcon.unit import Unit, ValuableUnit
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# Column layout
+# -------------
+# "face.*" columns have one entry per Face reachable from any card (fronts and every upgraded
+# face). "alternative.*" columns have one entry per input or output alternative of every converter
+# on those faces; face.alternative_offsets[i]:face.alternative_offsets[i + 1] are face i's rows,
+# like an Arrow list column. "unit.*" columns describe the unit axis of the count matrices.
+#
+# Strings are stored Arrow-style as a UTF-8 byte buffer ("<name>.data") plus int64 offsets
+# ("<name>.offsets"), so they can be memory-mapped too. Low-cardinality strings are dictionary
+# encoded as int16 codes ("<name>") into a string column ("<name>.vocabulary"), with -1 for none.
+
+default_directory = "sidcon-columns"
+
+INPUT_SIDE = 0
+OUTPUT_SIDE = 1
+
+_MANIFEST = "manifest.json"
+
+# Donation units are counted in the column of the unit they are a donation of.
+units: Sequence[type[Unit]] = sidcon.donation.units
+
+_converter_keys: Sequence[str] = sorted(c.key for c in Converter.__subclasses__())
+_unique_outputs: Sequence[UniqueOutput] = list(UniqueOutput)
+
+
+def _encode_strings(strings: Sequence[str]) -> tuple[npt.NDArray, npt.NDArray]:
+    encoded = [s.encode() for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return data, offsets
+
+
+def _dictionary_encode(values: Sequence[str | None]) -> tuple[npt.NDArray, list[str]]:
+    vocabulary = sorted({v for v in values if v is not None})
+    codes = {v: i for i, v in enumerate(vocabulary)}
+    return (
+        np.array([codes[v] if v is not None else -1 for v in values], dtype=np.int16),
+        vocabulary,
+    )
+
+
+def build(cards: Sequence[Card]) -> dict[str, npt.NDArray]:
+    """Flattens cards into named columns."""
+    faces: list[tuple[Face, int, int]] = []
+    face_cards: list[int] = []
+    for card_index, card in enumerate(cards):
+        start = len(faces)
+        # Parents are local to the card's tree; make them global.
+        faces.extend(
+            (face, depth, parent + start if parent >= 0 else -1)
+            for face, depth, parent in card.front.reachable_tree
+        )
+        face_cards.extend([card_index] * (len(faces) - start))
+
+    n_units = len(units)
+    alternative_offsets = [0]
+    alt_face: list[int] = []
+    alt_feature: list[int] = []
+    alt_converter: list[int] = []
+    alt_side: list[int] = []
+    alt_index: list[int] = []
+    alt_unique_output: list[int] = []
+    alt_counts: list[npt.NDArray] = []
+    alt_donation_counts: list[npt.NDArray] = []
+    alt_value: list[float] = []
+    alt_donation_value: list[float] = []
+
+    for face_index, (face, _, _) in enumerate(faces):
+        for position, feature in enumerate(face.features):
+            if not isinstance(feature, Converter):
+                continue
+            for side, side_units in ((INPUT_SIDE, feature.inputs), (OUTPUT_SIDE, feature.outputs)):
+                for index, alternative in enumerate(alternatives(side_units)):
+                    counts = np.zeros(n_units, dtype=np.int16)
+                    donation_counts = np.zeros(n_units, dtype=np.int16)
+                    value = donation_value = 0.0
+                    unique_output = -1
+                    if isinstance(alternative, UniqueOutput):
+                        unique_output = _unique_outputs.index(alternative)
+                    else:
+                        value, donation_value = _fill_counts(alternative, counts, donation_counts)
+                    alt_face.append(face_index)
+                    alt_feature.append(position)
+                    alt_converter.append(_converter_keys.index(feature.key))
+                    alt_side.append(side)
+                    alt_index.append(index)
+                    alt_unique_output.append(unique_output)
+                    alt_counts.append(counts)
+                    alt_donation_counts.append(donation_counts)
+                    alt_value.append(value)
+                    alt_donation_value.append(donation_value)
+        alternative_offsets.append(len(alt_face))
+
+    card_type_codes, card_type_vocabulary = _dictionary_encode(
+        [type(cards[i]).__name__ for i in face_cards]
+    )
+    faction_codes, faction_vocabulary = _dictionary_encode(
+        [_faction_name(cards[i]) for i in face_cards]
+    )
+    species_codes, species_vocabulary = _dictionary_encode(
+        [_species_name(cards[i]) for i in face_cards]
+    )
+
+    columns: dict[str, npt.NDArray] = {
+        "face.card_index": np.array(face_cards, dtype=np.int32),
+        "face.depth": np.array([d for _, d, _ in faces], dtype=np.int8),
+        "face.parent": np.array([p for _, _, p in faces], dtype=np.int32),
+        "face.era": np.array([int(cards[i].era_or_none or 0) for i in face_cards], dtype=np.int8),
+        "face.card_type": card_type_codes,
+        "face.faction": faction_codes,
+        "face.species": species_codes,
+        "face.min_input_value": np.array(
+            [f.converter_value("min_input_value") for f, _, _ in faces], dtype=np.float64
+        ),
+        "face.max_input_value": np.array(
+            [f.converter_value("max_input_value") for f, _, _ in faces], dtype=np.float64
+        ),
+        "face.min_output_value": np.array(
+            [f.converter_value("min_output_value") for f, _, _ in faces], dtype=np.float64
+        ),
+        "face.max_output_value": np.array(
+            [f.converter_value("max_output_value") for f, _, _ in faces], dtype=np.float64
+        ),
+        "face.alternative_offsets": np.array(alternative_offsets, dtype=np.int64),
+        "alternative.face": np.array(alt_face, dtype=np.int32),
+        "alternative.feature": np.array(alt_feature, dtype=np.int16),
+        "alternative.converter": np.array(alt_converter, dtype=np.int8),
+        "alternative.side": np.array(alt_side, dtype=np.int8),
+        "alternative.index": np.array(alt_index, dtype=np.int16),
+        "alternative.unique_output": np.array(alt_unique_output, dtype=np.int8),
+        "alternative.counts": _stack(alt_counts, n_units),
+        "alternative.donation_counts": _stack(alt_donation_counts, n_units),
+        "alternative.value": np.array(alt_value, dtype=np.float64),
+        "alternative.donation_value": np.array(alt_donation_value, dtype=np.float64),
+        "unit.value": np.array(
+            [u.value if issubclass(u, ValuableUnit) else np.nan for u in units], dtype=np.float64
+        ),
+    }
+    string_columns: dict[str, Sequence[str]] = {
+        "face.card_name": [cards[i].name for i in face_cards],
+        "face.face_name": [f.name for f, _, _ in faces],
+        "face.card_type.vocabulary": card_type_vocabulary,
+        "face.faction.vocabulary": faction_vocabulary,
+        "face.species.vocabulary": species_vocabulary,
+        "alternative.converter.vocabulary": _converter_keys,
+        "alternative.unique_output.vocabulary": [u.value for u in _unique_outputs],
+        "unit.name": [u.__name__ for u in units],
+    }
+    for name, strings in string_columns.items():
+        columns[f"{name}.data"], columns[f"{name}.offsets"] = _encode_strings(strings)
+    return columns
+
+
+def _fill_counts(
+    alternative: CountedUnits, counts: npt.NDArray, donation_counts: npt.NDArray
+) -> tuple[float, float]:
+    rows = (counts, donation_counts)
+    values = [0.0, 0.0]
+    for unit, n in alternative.items():
+        row, column = sidcon.donation.unit_index[unit]
+        rows[row][column] += n
+        values[row] += n * sidcon.donation.unit_values[column]
+    return values[OWNED], values[DONATED]
+
+
+def _stack(rows: Sequence[npt.NDArray], width: int) -> npt.NDArray:
+    if not rows:
+        return np.zeros((0, width), dtype=np.int16)
+    return np.stack(rows)
+
+
+def _faction_name(c: Card) -> str | None:
+    faction = getattr(c, "faction", None)
+    return faction.faction_name if faction is not None else None
+
+
+def _species_name(c: Card) -> str | None:
+    species = getattr(c, "species", None)
+    return species.species_name if species is not None else None
+
+
+@typ.final
+@dataclasses.dataclass(frozen=True)
+class Columns(Mapping[str, npt.NDArray]):
+    """Named columns, possibly backed by memory-mapped files."""
+
+    arrays: Mapping[str, npt.NDArray]
+
+    def __getitem__(self, name: str) -> npt.NDArray:
+        return self.arrays[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.arrays)
+
+    def __len__(self) -> int:
+        return len(self.arrays)
+
+    def string(self, name: str, i: int) -> str:
+        offsets = self.arrays[f"{name}.offsets"]
+        start, end = offsets[i], offsets[i + 1]
+        return bytes(self.arrays[f"{name}.data"][start:end]).decode()
+
+    def strings(self, name: str) -> list[str]:
+        offsets = self.arrays[f"{name}.offsets"]
+        data = bytes(self.arrays[f"{name}.data"])
+        return [data[start:end].decode() for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def decoded(self, name: str) -> list[str | None]:
+        "Decodes a dictionary encoded column."
+        vocabulary = self.strings(f"{name}.vocabulary")
+        return [vocabulary[c] if c >= 0 else None for c in self.arrays[name]]
+
+
+def export(cards: Sequence[Card], directory: str = default_directory) -> None:
+    """Writes one .npy file per column to directory, for memory-mapped loading."""
+    os.makedirs(directory, exist_ok=True)
+    columns = build(cards)
+    for name, array in columns.items():
+        np.save(os.path.join(directory, f"{name}.npy"), array)
+    with open(os.path.join(directory, _MANIFEST), "w") as f:
+        json.dump(sorted(columns), f, indent=1)
+
+
+def export_npz(cards: Sequence[Card], path: str) -> None:
+    """Writes every column to a single compressed .npz archive.
+
+    .npz archives are zip files and can't be memory-mapped; use export for that.
+    """
+    columns: dict[str, typ.Any] = build(cards)
+    np.savez_compressed(path, **columns)
+
+
+def load(path: str = default_directory, mmap: bool = True) -> Columns:
+    """Loads columns written by export (a directory) or export_npz (a .npz file).
+
+    Columns loaded from a directory with mmap are read-only views of the files, so opening them
+    costs no copying regardless of the pool's size.
+    """
+    if os.path.isdir(path):
+        with open(os.path.join(path, _MANIFEST)) as f:
+            names = json.load(f)
+        mmap_mode: typ.Literal["r"] | None = "r" if mmap else None
+        return Columns(
+            {n: np.load(os.path.join(path, f"{n}.npy"), mmap_mode=mmap_mode) for n in names}
+        )
+    with np.load(path) as npz:
+        return Columns({n: npz[n] for n in npz.files})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?", default=default_directory)
+    args = parser.parse_args()
+
+    cards = sidcon.parse.all_cards()
+    if args.path.endswith(".npz"):
+        export_npz(cards, args.path)
+    else:
+        export(cards, args.path)
+    print(f"Wrote {len(cards)} cards to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -77,6 +77,22 @@ Output = typ.Union[CountedUnits, "UniqueOutput"]
 Outputs = Output | Sequence[Output]
 
 
+@typ.overload
+def alternatives(side: Inputs) -> Sequence[Input]:
+    ...
+
+
+@typ.overload
+def alternatives(side: Outputs) -> Sequence[Output]:
+    ...
+
+
+def alternatives(side: Outputs) -> Sequence[Output]:
+    """Returns the alternatives of a converter's inputs or outputs, which are a list of them only
+    when there's a choice."""
+    return side if isinstance(side, Sequence) else [side]
+
+
 def outputs_from_string(s: str) -> Outputs:
     unique_output_error: ValueError
     try:
@@ -1,7 +1,25 @@
-from collections.abc import Mapping, MutableMapping
+from collections.abc import Collection, Mapping, MutableMapping, Sequence
 
 import sidcon.unit
-from sidcon.unit import Unit, ValuableUnit
+from sidcon.unit import (
+    AnyColony,
+    AnyLarge,
+    AnySmall,
+    Black,
+    Blue,
+    Brown,
+    DesertColony,
+    Green,
+    IceColony,
+    JungleColony,
+    LargeWild,
+    OceanColony,
+    SmallWild,
+    Unit,
+    ValuableUnit,
+    White,
+    Yellow,
+)
 
 # All units after _DONATION_KEY in a string are donation units.
 _DONATION_KEY = "+"
@@ -11,6 +29,14 @@ _STRIPPED_SUBSTRINGS = [" §"]
 CountedUnits = Mapping[type[Unit], int]
 _MutableCountedUnits = MutableMapping[type[Unit], int]
 
+# Each class of units a wildcard stands for: its concrete units, then its wildcards. As an input,
+# a wildcard is one unit of the class; held, it can be paid as any unit of the class.
+_wildcard_classes: Sequence[tuple[Collection[type[Unit]], Collection[type[Unit]]]] = [
+    ((White, Brown, Green), (AnySmall, SmallWild)),
+    ((Yellow, Blue, Black), (AnyLarge, LargeWild)),
+    ((DesertColony, IceColony, JungleColony, OceanColony), (AnyColony,)),
+]
+
 
 def value(units: CountedUnits) -> float:
     total = 0.0
@@ -100,3 +126,99 @@ def subtract(left: CountedUnits, right: CountedUnits) -> CountedUnits:
         if v < 0:
             raise ValueError("CountedUnits subtraction resulted in negative count for key '{k}'")
     return {k: v for k, v in difference.items() if v != 0}
+
+
+_values: Mapping[type[Unit], float] = {
+    u: u.value if issubclass(u, ValuableUnit) else 0.0
+    for u in sidcon.unit.class_name_to_unit.values()
+}
+
+
+def _pay_class(
+    held: CountedUnits,
+    need: CountedUnits,
+    members: Collection[type[Unit]],
+    wildcards: Collection[type[Unit]],
+    values: Mapping[type[Unit], float],
+) -> CountedUnits | None:
+    """Returns the cheapest payment from held of need's units of one class, or None if held
+    can't pay them.
+
+    Each count y of held wildcards to pay with is tried. The other units paid are then y fewer
+    than the units needed, and all but y of the concrete units needed must be paid with their own
+    kind: so the cheapest payment given y is the cheapest that many of held's units that could
+    pay for their own kind, then the cheapest of held's units left for the rest.
+    """
+    wilds = sum(need.get(u, 0) for u in wildcards)
+    needed = sum(need.get(u, 0) for u in members)
+    if needed + wilds == 0:
+        return dict()
+    if wilds == 0 and not any(held.get(u, 0) for u in wildcards):
+        # Only concrete units, so only they can pay for themselves.
+        if any(held.get(u, 0) < need.get(u, 0) for u in members):
+            return None
+        return {u: need[u] for u in members if need.get(u, 0)}
+
+    def key(u: type[Unit]) -> tuple[float, int]:
+        return values.get(u, 0.0), -held.get(u, 0)
+
+    own: list[type[Unit]] = []
+    spare: list[type[Unit]] = []
+    for u in sorted(members, key=key):
+        n = min(need.get(u, 0), held.get(u, 0))
+        own.extend([u] * n)
+        spare.extend([u] * (held.get(u, 0) - n))
+    tokens = sorted((u for u in wildcards for _ in range(held.get(u, 0))), key=key)
+
+    best: list[type[Unit]] | None = None
+    best_cost = 0.0
+    for y in range(max(needed - len(own), 0), min(len(tokens), needed + wilds) + 1):
+        kept = max(needed - y, 0)
+        rest = sorted([*own[kept:], *spare], key=key)
+        extra = needed + wilds - y - kept
+        if len(rest) < extra:
+            continue
+        paid = [*own[:kept], *rest[:extra], *tokens[:y]]
+        cost = sum(values.get(u, 0.0) for u in paid)
+        if best is None or cost < best_cost:
+            best, best_cost = paid, cost
+    if best is None:
+        return None
+    payment: _MutableCountedUnits = dict()
+    for u in best:
+        payment[u] = payment.get(u, 0) + 1
+    return payment
+
+
+def payment(
+    held: CountedUnits, inputs: CountedUnits, values: Mapping[type[Unit], float] | None = None
+) -> CountedUnits | None:
+    """Returns the units of held to pay inputs with that are worth least, by values (by default,
+    ValuableUnit.value); or None if held can't pay inputs.
+
+    inputs may mix concrete units with wildcards (AnySmall, SmallWild, AnyLarge, LargeWild,
+    AnyColony), each of which is paid with any one unit of its class. Wildcards held can be paid
+    as any unit of their class. Among equally cheap payments, the one using the fewest held
+    wildcards, then the most plentiful units, is returned.
+    """
+    if values is None:
+        values = _values
+    paid: _MutableCountedUnits = dict()
+    classed: set[type[Unit]] = set()
+    for members, wildcards in _wildcard_classes:
+        classed.update(members, wildcards)
+        solved = _pay_class(held, inputs, members, wildcards, values)
+        if solved is None:
+            return None
+        paid.update(solved)
+    for u, n in inputs.items():
+        if u not in classed:
+            if held.get(u, 0) < n:
+                return None
+            paid[u] = n
+    return paid
+
+
+def satisfies(held: CountedUnits, inputs: CountedUnits) -> bool:
+    """Returns whether held can pay inputs; see payment."""
+    return payment(held, inputs) is not None
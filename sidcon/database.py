@@ -0,0 +1,630 @@
+import argparse
+import dataclasses
+import logging
+import sqlite3
+import typing as typ
+from collections import defaultdict
+from collections.abc import Collection, Mapping, Sequence
+
+import sidcon.card
+import sidcon.faction
+import sidcon.parse
+import sidcon.technology
+import sidcon.unit
+from sidcon.card import Card, KtDualCard
+from sidcon.converter import (
+    Converter,
+    Inputs,
+    Output,
+    Outputs,
+    UniqueOutput,
+    alternatives,
+)
+from sidcon.cost import Cost, FactionSpecificCost
+from sidcon.countedunits import CountedUnits
+from sidcon.face import Face
+from sidcon.faction import Faction, Species
+from sidcon.feature import Feature, UniqueFeature
+from sidcon.technology import DonationTechnology, Era, Technology
+from sidcon.unit import Colony, DonationUnit, Unit, ValuableUnit
+from sidcon.upgrade import FactionSpecificUpgradeCondition, Upgrade
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+default_path = "sidcon.db"
+
+_SCHEMA = """
+CREATE TABLE factions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    species TEXT NOT NULL,
+    colony_support REAL NOT NULL,
+    tiebreaker REAL NOT NULL,
+    impact INTEGER NOT NULL
+);
+
+CREATE TABLE technologies (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    era INTEGER NOT NULL,
+    is_donation INTEGER NOT NULL
+);
+
+CREATE TABLE units (
+    id INTEGER PRIMARY KEY,
+    class_name TEXT NOT NULL UNIQUE,
+    key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    is_donation INTEGER NOT NULL
+);
+
+-- A converter, counted units, or unique feature. Features with a NULL face_id are the
+-- PurpleConverters used as upgrade requirements and costs.
+CREATE TABLE features (
+    id INTEGER PRIMARY KEY,
+    face_id INTEGER REFERENCES faces(id),
+    position INTEGER NOT NULL,
+    kind TEXT NOT NULL CHECK (kind IN ('converter', 'units', 'unique')),
+    converter_key TEXT,
+    unique_feature TEXT,
+    inputs_are_alternatives INTEGER NOT NULL DEFAULT 0,
+    outputs_are_alternatives INTEGER NOT NULL DEFAULT 0
+);
+
+-- One input or output alternative of a converter, or the units of a counted units feature.
+CREATE TABLE alternatives (
+    id INTEGER PRIMARY KEY,
+    feature_id INTEGER NOT NULL REFERENCES features(id),
+    side TEXT NOT NULL CHECK (side IN ('inputs', 'outputs', 'units')),
+    position INTEGER NOT NULL,
+    unique_output TEXT
+);
+
+CREATE TABLE alternative_units (
+    alternative_id INTEGER NOT NULL REFERENCES alternatives(id),
+    unit_id INTEGER NOT NULL REFERENCES units(id),
+    count INTEGER NOT NULL,
+    PRIMARY KEY (alternative_id, unit_id)
+);
+
+CREATE TABLE faces (
+    id INTEGER PRIMARY KEY,
+    card_id INTEGER NOT NULL REFERENCES cards(id),
+    name TEXT NOT NULL,
+    depth INTEGER NOT NULL
+);
+
+CREATE TABLE upgrades (
+    id INTEGER PRIMARY KEY,
+    face_id INTEGER NOT NULL REFERENCES faces(id),
+    position INTEGER NOT NULL,
+    era INTEGER,
+    to_face_id INTEGER NOT NULL REFERENCES faces(id)
+);
+
+CREATE TABLE upgrade_requirements (
+    upgrade_id INTEGER NOT NULL REFERENCES upgrades(id),
+    position INTEGER NOT NULL,
+    kind TEXT NOT NULL CHECK (kind IN ('technology', 'converter', 'condition')),
+    technology_id INTEGER REFERENCES technologies(id),
+    converter_feature_id INTEGER REFERENCES features(id),
+    condition TEXT,
+    PRIMARY KEY (upgrade_id, position)
+);
+
+CREATE TABLE costs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL CHECK (kind IN ('technologies', 'converter', 'faction_specific')),
+    converter_feature_id INTEGER REFERENCES features(id),
+    faction_specific TEXT
+);
+
+CREATE TABLE cost_technologies (
+    cost_id INTEGER NOT NULL REFERENCES costs(id),
+    position INTEGER NOT NULL,
+    technology_id INTEGER NOT NULL REFERENCES technologies(id),
+    PRIMARY KEY (cost_id, position)
+);
+
+CREATE TABLE cards (
+    id INTEGER PRIMARY KEY,
+    card_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    era INTEGER,
+    front_face_id INTEGER REFERENCES faces(id),
+    species TEXT,
+    faction_id INTEGER REFERENCES factions(id),
+    technology_id INTEGER REFERENCES technologies(id),
+    front_colony TEXT,
+    back_colony TEXT,
+    cost_id INTEGER REFERENCES costs(id),
+    back_cost_id INTEGER REFERENCES costs(id),
+    -- A KtDualCard's halves; its front is derived from them, so front_face_id is NULL.
+    left_face_id INTEGER REFERENCES faces(id),
+    right_face_id INTEGER REFERENCES faces(id),
+    -- A SetupCard's starting colonies, as unit keys, and how many research teams it draws.
+    colonies TEXT,
+    research_teams INTEGER
+);
+
+CREATE INDEX cards_faction ON cards(faction_id);
+CREATE INDEX cards_era ON cards(era);
+CREATE INDEX cards_technology ON cards(technology_id);
+CREATE INDEX cards_species ON cards(species);
+CREATE INDEX faces_card ON faces(card_id);
+CREATE INDEX features_face ON features(face_id);
+CREATE INDEX alternatives_feature ON alternatives(feature_id);
+CREATE INDEX alternative_units_unit ON alternative_units(unit_id);
+CREATE INDEX upgrades_face ON upgrades(face_id);
+CREATE INDEX upgrades_era ON upgrades(era);
+CREATE INDEX upgrade_requirements_technology ON upgrade_requirements(technology_id);
+CREATE INDEX cost_technologies_technology ON cost_technologies(technology_id);
+"""
+
+_TABLES = [
+    "cards",
+    "cost_technologies",
+    "costs",
+    "upgrade_requirements",
+    "upgrades",
+    "faces",
+    "alternative_units",
+    "alternatives",
+    "features",
+    "units",
+    "technologies",
+    "factions",
+]
+
+_converter_types: Mapping[str, type[Converter]] = {
+    c.key: c for c in Converter.__subclasses__()  # type: ignore[type-abstract]
+}
+
+
+@typ.final
+class _Writer(object):
+    conn: typ.Final[sqlite3.Connection]
+    unit_ids: dict[type[Unit], int]
+    technology_ids: dict[type[Technology], int]
+    faction_ids: dict[type[Faction], int]
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.unit_ids = dict()
+        self.technology_ids = dict()
+        self.faction_ids = dict()
+
+    def write_reference_tables(self) -> None:
+        for i, unit in enumerate(sorted(sidcon.unit.class_name_to_unit.values(), key=str)):
+            value = unit.value if issubclass(unit, ValuableUnit) else None
+            self.conn.execute(
+                "INSERT INTO units VALUES (?, ?, ?, ?, ?, ?)",
+                (i, unit.__name__, unit.key, unit.name, value, issubclass(unit, DonationUnit)),
+            )
+            self.unit_ids[unit] = i
+        technologies = sorted(sidcon.technology.name_to_technology.values(), key=lambda t: t.name)
+        for i, tech in enumerate(technologies):
+            self.conn.execute(
+                "INSERT INTO technologies VALUES (?, ?, ?, ?)",
+                (i, tech.name, int(tech.era), issubclass(tech, DonationTechnology)),
+            )
+            self.technology_ids[tech] = i
+        for i, faction in enumerate(sidcon.faction.name_to_faction.values()):
+            self.conn.execute(
+                "INSERT INTO factions VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    i,
+                    faction.faction_name,
+                    sidcon.faction.to_species[faction].species_name,
+                    faction.colony_support,
+                    faction.tiebreaker,
+                    faction.impact,
+                ),
+            )
+            self.faction_ids[faction] = i
+
+    def write_card(self, card_id: int, card: Card) -> None:
+        fields = {f.name: getattr(card, f.name) for f in dataclasses.fields(card)}
+        species: type[Species] | None = fields.get("species")
+        faction: type[Faction] | None = fields.get("faction")
+        technology: type[Technology] | None = fields.get("technology")
+        front_type: type[Colony] | None = fields.get("front_type")
+        back_type: type[Colony] | None = fields.get("back_type")
+        colonies: Sequence[type[Colony]] | None = fields.get("colonies")
+        era = card.era_or_none
+        self.conn.execute(
+            "INSERT INTO cards VALUES (?, ?, ?, ?, NULL, ?, ?, ?, ?, ?, ?, ?, NULL, NULL, ?, ?)",
+            (
+                card_id,
+                type(card).__name__,
+                card.name,
+                int(era) if era is not None else None,
+                species.species_name if species is not None else None,
+                self.faction_ids[faction] if faction is not None else None,
+                self.technology_ids[technology] if technology is not None else None,
+                front_type.key if front_type is not None else None,
+                back_type.key if back_type is not None else None,
+                self._write_cost(fields["cost"]) if "cost" in fields else None,
+                self._write_cost(fields["back_cost"]) if "back_cost" in fields else None,
+                "".join(u.key for u in colonies) if colonies is not None else None,
+                fields.get("research_teams"),
+            ),
+        )
+        if isinstance(card, KtDualCard):
+            self.conn.execute(
+                "UPDATE cards SET left_face_id = ?, right_face_id = ? WHERE id = ?",
+                (
+                    self._write_face(card_id, card.left, 0),
+                    self._write_face(card_id, card.right, 0),
+                    card_id,
+                ),
+            )
+            return
+        front_face_id = self._write_face(card_id, card.front, 0)
+        self.conn.execute(
+            "UPDATE cards SET front_face_id = ? WHERE id = ?", (front_face_id, card_id)
+        )
+
+    def _write_face(self, card_id: int, face: Face, depth: int) -> int:
+        cur = self.conn.execute(
+            "INSERT INTO faces (card_id, name, depth) VALUES (?, ?, ?)",
+            (card_id, face.name, depth),
+        )
+        face_id = typ.cast(int, cur.lastrowid)
+        for position, feature in enumerate(face.features):
+            self._write_feature(feature, face_id, position)
+        for position, (era, requirements, to_face) in enumerate(face.upgrades):
+            to_face_id = self._write_face(card_id, to_face, depth + 1)
+            cur = self.conn.execute(
+                "INSERT INTO upgrades (face_id, position, era, to_face_id) VALUES (?, ?, ?, ?)",
+                (face_id, position, int(era) if era is not None else None, to_face_id),
+            )
+            upgrade_id = cur.lastrowid
+            for rposition, requirement in enumerate(requirements):
+                self._write_requirement(typ.cast(int, upgrade_id), rposition, requirement)
+        return face_id
+
+    def _write_requirement(self, upgrade_id: int, position: int, u: Upgrade) -> None:
+        technology_id = converter_feature_id = condition = None
+        if isinstance(u, Converter):
+            kind = "converter"
+            converter_feature_id = self._write_feature(u, None, 0)
+        elif isinstance(u, FactionSpecificUpgradeCondition):
+            kind = "condition"
+            condition = u.value
+        else:
+            kind = "technology"
+            technology_id = self.technology_ids[u]
+        self.conn.execute(
+            "INSERT INTO upgrade_requirements VALUES (?, ?, ?, ?, ?, ?)",
+            (upgrade_id, position, kind, technology_id, converter_feature_id, condition),
+        )
+
+    def _write_cost(self, cost: Cost) -> int:
+        if isinstance(cost, Converter):
+            feature_id = self._write_feature(cost, None, 0)
+            cur = self.conn.execute(
+                "INSERT INTO costs (kind, converter_feature_id) VALUES ('converter', ?)",
+                (feature_id,),
+            )
+        elif isinstance(cost, FactionSpecificCost):
+            cur = self.conn.execute(
+                "INSERT INTO costs (kind, faction_specific) VALUES ('faction_specific', ?)",
+                (cost.value,),
+            )
+        else:
+            cur = self.conn.execute("INSERT INTO costs (kind) VALUES ('technologies')")
+            for position, tech in enumerate(cost):
+                self.conn.execute(
+                    "INSERT INTO cost_technologies VALUES (?, ?, ?)",
+                    (cur.lastrowid, position, self.technology_ids[tech]),
+                )
+        return typ.cast(int, cur.lastrowid)
+
+    def _write_feature(self, feature: Feature, face_id: int | None, position: int) -> int:
+        if isinstance(feature, Converter):
+            cur = self.conn.execute(
+                "INSERT INTO features (face_id, position, kind, converter_key, "
+                "inputs_are_alternatives, outputs_are_alternatives) "
+                "VALUES (?, ?, 'converter', ?, ?, ?)",
+                (
+                    face_id,
+                    position,
+                    feature.key,
+                    isinstance(feature.inputs, Sequence),
+                    isinstance(feature.outputs, Sequence),
+                ),
+            )
+            feature_id = typ.cast(int, cur.lastrowid)
+            self._write_alternatives(feature_id, "inputs", feature.inputs)
+            self._write_alternatives(feature_id, "outputs", feature.outputs)
+        elif isinstance(feature, UniqueFeature):
+            cur = self.conn.execute(
+                "INSERT INTO features (face_id, position, kind, unique_feature) "
+                "VALUES (?, ?, 'unique', ?)",
+                (face_id, position, feature.value),
+            )
+            feature_id = typ.cast(int, cur.lastrowid)
+        else:
+            cur = self.conn.execute(
+                "INSERT INTO features (face_id, position, kind) VALUES (?, ?, 'units')",
+                (face_id, position),
+            )
+            feature_id = typ.cast(int, cur.lastrowid)
+            self._write_alternatives(feature_id, "units", feature)
+        return feature_id
+
+    def _write_alternatives(self, feature_id: int, side: str, units: Inputs | Outputs) -> None:
+        for position, alternative in enumerate(alternatives(units)):
+            unique_output = alternative.value if isinstance(alternative, UniqueOutput) else None
+            cur = self.conn.execute(
+                "INSERT INTO alternatives (feature_id, side, position, unique_output) "
+                "VALUES (?, ?, ?, ?)",
+                (feature_id, side, position, unique_output),
+            )
+            if isinstance(alternative, UniqueOutput):
+                continue
+            self.conn.executemany(
+                "INSERT INTO alternative_units VALUES (?, ?, ?)",
+                [(cur.lastrowid, self.unit_ids[u], n) for u, n in alternative.items()],
+            )
+
+
+def export(cards: Sequence[Card], path: str = default_path) -> None:
+    """Writes cards to a SQLite database at path, replacing any card pool already there."""
+    with sqlite3.connect(path) as conn:
+        for table in _TABLES:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.executescript(_SCHEMA)
+        w = _Writer(conn)
+        w.write_reference_tables()
+        for card_id, card in enumerate(cards):
+            w.write_card(card_id, card)
+    conn.close()
+
+
+# Temporary tables of the ids of the selected cards and of every row they reference, so that a
+# filtered load reads only those rows.
+_SELECTIONS: Sequence[str] = [
+    "CREATE TEMP TABLE selected_faces AS "
+    "SELECT id FROM faces WHERE card_id IN (SELECT id FROM selected_cards)",
+    "CREATE TEMP TABLE selected_upgrades AS "
+    "SELECT id FROM upgrades WHERE face_id IN (SELECT id FROM selected_faces)",
+    "CREATE TEMP TABLE selected_costs AS "
+    "SELECT cost_id AS id FROM selected_cards WHERE cost_id IS NOT NULL "
+    "UNION SELECT back_cost_id FROM selected_cards WHERE back_cost_id IS NOT NULL",
+    "CREATE TEMP TABLE selected_features AS "
+    "SELECT id FROM features WHERE face_id IN (SELECT id FROM selected_faces) "
+    "UNION SELECT converter_feature_id FROM upgrade_requirements "
+    "WHERE upgrade_id IN (SELECT id FROM selected_upgrades) AND converter_feature_id IS NOT NULL "
+    "UNION SELECT converter_feature_id FROM costs "
+    "WHERE id IN (SELECT id FROM selected_costs) AND converter_feature_id IS NOT NULL",
+    "CREATE TEMP TABLE selected_alternatives AS "
+    "SELECT id FROM alternatives WHERE feature_id IN (SELECT id FROM selected_features)",
+]
+
+
+@typ.final
+class _Reader(object):
+    """Rebuilds the Cards matching a WHERE clause from a database, reading each table once and
+    only the rows those cards reference."""
+
+    units: dict[int, type[Unit]]
+    technologies: dict[int, type[Technology]]
+    factions: dict[int, type[Faction]]
+    features: dict[int, Feature]
+    faces: dict[int, Face]
+    costs: dict[int, Cost]
+
+    def __init__(self, conn: sqlite3.Connection, where: str, params: Collection) -> None:
+        conn.execute(
+            "CREATE TEMP TABLE selected_cards AS "
+            f"SELECT id, cost_id, back_cost_id FROM cards {where}",
+            tuple(params),
+        )
+        for selection in _SELECTIONS:
+            conn.execute(selection)
+        self.units = {
+            i: sidcon.unit.class_name_to_unit[name]
+            for i, name in conn.execute("SELECT id, class_name FROM units")
+        }
+        self.technologies = {
+            i: Technology.from_string(name)
+            for i, name in conn.execute("SELECT id, name FROM technologies")
+        }
+        self.factions = {
+            i: sidcon.faction.name_to_faction[name]
+            for i, name in conn.execute("SELECT id, name FROM factions")
+        }
+        self._read_features(conn)
+        self._read_faces(conn)
+        self._read_costs(conn)
+
+    def _read_features(self, conn: sqlite3.Connection) -> None:
+        units_by_alternative: defaultdict[int, dict[type[Unit], int]] = defaultdict(dict)
+        for alternative_id, unit_id, count in conn.execute(
+            "SELECT alternative_id, unit_id, count FROM alternative_units "
+            "WHERE alternative_id IN (SELECT id FROM selected_alternatives) ORDER BY rowid"
+        ):
+            units_by_alternative[alternative_id][self.units[unit_id]] = count
+
+        alternatives: defaultdict[tuple[int, str], list[Output]] = defaultdict(list)
+        for alternative_id, feature_id, side, unique_output in conn.execute(
+            "SELECT id, feature_id, side, unique_output FROM alternatives "
+            "WHERE id IN (SELECT id FROM selected_alternatives) ORDER BY position"
+        ):
+            alternative: Output
+            if unique_output is not None:
+                alternative = UniqueOutput(unique_output)
+            else:
+                alternative = units_by_alternative[alternative_id]
+            alternatives[(feature_id, side)].append(alternative)
+
+        self.features = dict()
+        for (
+            feature_id,
+            kind,
+            converter_key,
+            unique_feature,
+            inputs_are_alternatives,
+            outputs_are_alternatives,
+        ) in conn.execute(
+            "SELECT id, kind, converter_key, unique_feature, inputs_are_alternatives, "
+            "outputs_are_alternatives FROM features WHERE id IN (SELECT id FROM selected_features)"
+        ):
+            feature: Feature
+            if kind == "converter":
+                inputs = alternatives[(feature_id, "inputs")]
+                outputs = alternatives[(feature_id, "outputs")]
+                feature = _converter_types[converter_key](
+                    inputs=typ.cast(Inputs, inputs if inputs_are_alternatives else inputs[0]),
+                    outputs=outputs if outputs_are_alternatives else outputs[0],
+                )
+            elif kind == "unique":
+                feature = UniqueFeature(unique_feature)
+            else:
+                feature = typ.cast(CountedUnits, alternatives[(feature_id, "units")][0])
+            self.features[feature_id] = feature
+
+    def _read_faces(self, conn: sqlite3.Connection) -> None:
+        features_by_face: defaultdict[int, list[Feature]] = defaultdict(list)
+        for face_id, feature_id in conn.execute(
+            "SELECT face_id, id FROM features WHERE face_id IN (SELECT id FROM selected_faces) "
+            "ORDER BY position"
+        ):
+            features_by_face[face_id].append(self.features[feature_id])
+
+        requirements: defaultdict[int, list[Upgrade]] = defaultdict(list)
+        for upgrade_id, kind, technology_id, converter_feature_id, condition in conn.execute(
+            "SELECT upgrade_id, kind, technology_id, converter_feature_id, condition "
+            "FROM upgrade_requirements WHERE upgrade_id IN (SELECT id FROM selected_upgrades) "
+            "ORDER BY position"
+        ):
+            requirement: Upgrade
+            if kind == "converter":
+                requirement = typ.cast(Upgrade, self.features[converter_feature_id])
+            elif kind == "condition":
+                requirement = FactionSpecificUpgradeCondition(condition)
+            else:
+                requirement = self.technologies[technology_id]
+            requirements[upgrade_id].append(requirement)
+
+        upgrades_by_face: defaultdict[int, list[tuple[int, int | None, int]]] = defaultdict(list)
+        for upgrade_id, face_id, era, to_face_id in conn.execute(
+            "SELECT id, face_id, era, to_face_id FROM upgrades "
+            "WHERE id IN (SELECT id FROM selected_upgrades) ORDER BY position"
+        ):
+            upgrades_by_face[face_id].append((upgrade_id, era, to_face_id))
+
+        # Upgraded faces are always deeper than the faces that upgrade to them, so building the
+        # deepest faces first means every face's upgrades already exist.
+        self.faces = dict()
+        for face_id, name in conn.execute(
+            "SELECT id, name FROM faces WHERE id IN (SELECT id FROM selected_faces) "
+            "ORDER BY depth DESC"
+        ):
+            self.faces[face_id] = Face(
+                name=name,
+                features=features_by_face[face_id],
+                upgrades=[
+                    (
+                        Era(era) if era is not None else None,
+                        requirements[upgrade_id],
+                        self.faces[to_face_id],
+                    )
+                    for upgrade_id, era, to_face_id in upgrades_by_face[face_id]
+                ],
+            )
+
+    def _read_costs(self, conn: sqlite3.Connection) -> None:
+        technologies: defaultdict[int, list[type[Technology]]] = defaultdict(list)
+        for cost_id, technology_id in conn.execute(
+            "SELECT cost_id, technology_id FROM cost_technologies "
+            "WHERE cost_id IN (SELECT id FROM selected_costs) ORDER BY position"
+        ):
+            technologies[cost_id].append(self.technologies[technology_id])
+
+        self.costs = dict()
+        for cost_id, kind, converter_feature_id, faction_specific in conn.execute(
+            "SELECT id, kind, converter_feature_id, faction_specific FROM costs "
+            "WHERE id IN (SELECT id FROM selected_costs)"
+        ):
+            cost: Cost
+            if kind == "converter":
+                cost = typ.cast(Cost, self.features[converter_feature_id])
+            elif kind == "faction_specific":
+                cost = FactionSpecificCost(faction_specific)
+            else:
+                cost = technologies[cost_id]
+            self.costs[cost_id] = cost
+
+    def read_cards(self, conn: sqlite3.Connection) -> list[Card]:
+        cards = []
+        for (
+            card_type,
+            front_face_id,
+            species,
+            faction_id,
+            technology_id,
+            front_colony,
+            back_colony,
+            cost_id,
+            back_cost_id,
+            left_face_id,
+            right_face_id,
+            colonies,
+            research_teams,
+        ) in conn.execute(
+            "SELECT card_type, front_face_id, species, faction_id, technology_id, front_colony, "
+            "back_colony, cost_id, back_cost_id, left_face_id, right_face_id, colonies, "
+            "research_teams "
+            "FROM cards WHERE id IN (SELECT id FROM selected_cards) ORDER BY id"
+        ):
+            cls = sidcon.card.class_name_to_card_type[card_type]
+            values: dict[str, typ.Any] = {
+                "front": self.faces.get(front_face_id),
+                "left": self.faces.get(left_face_id),
+                "right": self.faces.get(right_face_id),
+                "species": Species.from_string(species) if species is not None else None,
+                "faction": self.factions.get(faction_id),
+                "technology": self.technologies.get(technology_id),
+                "front_type": Colony.from_key(front_colony) if front_colony else None,
+                "back_type": Colony.from_key(back_colony) if back_colony else None,
+                "cost": self.costs.get(cost_id),
+                "back_cost": self.costs.get(back_cost_id),
+                "colonies": [Colony.from_key(k) for k in colonies or ""],
+                "research_teams": research_teams,
+            }
+            cards.append(
+                cls(**{f.name: values[f.name] for f in dataclasses.fields(cls) if f.init})
+            )
+        return cards
+
+
+def load(path: str = default_path, where: str = "", params: Collection = ()) -> list[Card]:
+    """Rebuilds the Cards stored at path without re-parsing any card notation.
+
+    where is an optional SQL WHERE clause over the cards table, e.g.
+    load(where="WHERE faction_id = (SELECT id FROM factions WHERE name = ?)", params=["Unity"]).
+    """
+    with sqlite3.connect(path) as conn:
+        cards = _Reader(conn, where, params).read_cards(conn)
+    conn.close()
+    return cards
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?", default=default_path)
+    args = parser.parse_args()
+
+    cards = sidcon.parse.all_cards()
+    export(cards, args.path)
+    print(f"Wrote {len(cards)} cards to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import argparse
+import dataclasses
+import functools
+import itertools
+import logging
+import math
+import typing as typ
+from collections.abc import Iterable, Mapping
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.parse
+from sidcon.card import Card, CreatedCard
+from sidcon.cost import FactionSpecificCost
+from sidcon.feature import Feature, UniqueFeature
+from sidcon.upgrade import FactionSpecificUpgradeCondition
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# Deep Unity's dice are eight-sided, numbered 0 to 7, and it starts with three of them. A "+1 to a
+# die" or "-1 to a die" may be applied once per round, to any die, and can't take it past 0 or 7.
+faces = 8
+starting_dice = 3
+
+DiceCondition = FactionSpecificCost | FactionSpecificUpgradeCondition
+
+# The dice a condition needs: a number of dice showing the same face, and which face (None for
+# any). NOT_TRIPLES is special-cased: it needs three dice that aren't all the same.
+_needs: Mapping[DiceCondition, tuple[int, int | None]] = {
+    **{FactionSpecificCost(f"Die {n}"): (1, n) for n in range(faces)},
+    **{FactionSpecificUpgradeCondition(f"Die double {n}s"): (2, n) for n in range(faces)},
+    FactionSpecificUpgradeCondition.TRIPLES: (3, None),
+    FactionSpecificCost.DEEP_UNITY_NOT_TRIPLES: (3, None),
+}
+
+dice_conditions: typ.Final[tuple[DiceCondition, ...]] = tuple(_needs)
+
+
+def is_dice_condition(x: typ.Any) -> bool:
+    return isinstance(x, (FactionSpecificCost, FactionSpecificUpgradeCondition)) and x in _needs
+
+
+@functools.cache
+def _rolls(dice: int) -> tuple[npt.NDArray, npt.NDArray]:
+    """Returns every distinct roll of dice dice, as face counts [roll, face], and its probability.
+
+    Conditions only depend on how many dice show each face, so rolls are enumerated as multisets
+    (C(dice + 7, 7) of them, rather than 8**dice sequences) and weighted by their multinomial
+    coefficient.
+    """
+    counts = np.zeros((math.comb(dice + faces - 1, faces - 1), faces), dtype=np.int64)
+    for i, roll in enumerate(itertools.combinations_with_replacement(range(faces), dice)):
+        for f in roll:
+            counts[i, f] += 1
+    ways = [math.factorial(dice) // math.prod(math.factorial(c) for c in row) for row in counts]
+    probabilities = np.array(ways, dtype=np.float64) / faces**dice
+    counts.setflags(write=False)
+    probabilities.setflags(write=False)
+    return counts, probabilities
+
+
+def _showable(counts: npt.NDArray, face: int, plus: int, minus: int) -> npt.NDArray:
+    """Returns, per roll, the most dice that can be made to show face.
+
+    Pluses only help dice below face and minuses dice above, so each budget is spent
+    independently, greedily on the nearest dice first.
+    """
+    showable = counts[:, face].copy()
+    for budget, direction in ((plus, -1), (minus, 1)):
+        remaining = np.full(len(counts), budget)
+        for distance in range(1, budget + 1):
+            f = face + direction * distance
+            if not 0 <= f < faces:
+                break
+            moved = np.minimum(counts[:, f], remaining // distance)
+            showable += moved
+            remaining -= moved * distance
+    return showable
+
+
+@functools.cache
+def _probabilities(dice: int, plus: int, minus: int) -> Mapping[DiceCondition, float]:
+    counts, probabilities = _rolls(dice)
+    showable = np.stack([_showable(counts, f, plus, minus) for f in range(faces)], axis=1)
+
+    met: dict[DiceCondition, npt.NDArray] = dict()
+    for condition, (n, face) in _needs.items():
+        if face is not None:
+            met[condition] = showable[:, face] >= n
+        else:
+            met[condition] = showable.max(axis=1) >= n
+
+    # Three dice not all the same can be picked from any roll with two different faces, or from
+    # one with every die the same if a modifier can move one of them.
+    same = counts.max(axis=1) == dice
+    top = counts.argmax(axis=1)
+    movable = ((plus > 0) & (top < faces - 1)) | ((minus > 0) & (top > 0))
+    met[FactionSpecificCost.DEEP_UNITY_NOT_TRIPLES] = (dice >= 3) & (~same | movable)
+
+    return {c: float(probabilities[m].sum()) for c, m in met.items()}
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Roll(object):
+    """A round's roll: the dice Deep Unity has and the die modifiers it can apply.
+
+    Every probability is exact, and each (dice, plus, minus) is computed once, for every condition
+    together.
+    """
+
+    dice: int = starting_dice
+    plus: int = 0
+    minus: int = 0
+
+    @classmethod
+    def from_features(cls, features: Iterable[Feature], dice: int = starting_dice) -> "Roll":
+        """Returns the roll of a tableau with features, counting its die modifiers."""
+        features = list(features)
+        return cls(
+            dice=dice,
+            plus=features.count(UniqueFeature.PLUS_ONE_TO_A_DIE),
+            minus=features.count(UniqueFeature.MINUS_ONE_TO_A_DIE),
+        )
+
+    def probability(self, condition: DiceCondition) -> float:
+        """Returns the probability condition is met in a single round."""
+        if not is_dice_condition(condition):
+            raise ValueError(f"'{condition}' isn't a dice condition")
+        return _probabilities(self.dice, self.plus, self.minus)[condition]
+
+    def expected_rounds(self, condition: DiceCondition) -> float:
+        """Returns the expected number of rounds until condition is first met, counting that
+        round, or inf if it never can be."""
+        p = self.probability(condition)
+        return 1 / p if p > 0 else math.inf
+
+    def expected_rounds_held(self, condition: DiceCondition, rounds: int) -> float:
+        """Returns the expected number of rounds, out of rounds, from the one condition is first
+        met onwards.
+
+        Something worth v per round once condition is met is worth v times this.
+        """
+        q = 1 - self.probability(condition)
+        return float(np.sum(1 - q ** np.arange(1, rounds + 1)))
+
+    def expected_value(self, value: float, condition: DiceCondition, rounds: int) -> float:
+        return value * self.expected_rounds_held(condition, rounds)
+
+
+def dice_costs(cards: Iterable[Card]) -> list[tuple[Card, DiceCondition]]:
+    """Returns each card bought with dice, with its cost."""
+    costs: list[tuple[Card, DiceCondition]] = []
+    for c in cards:
+        if isinstance(c, CreatedCard) and isinstance(c.cost, FactionSpecificCost):
+            if is_dice_condition(c.cost):
+                costs.append((c, c.cost))
+    return costs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--dice", type=int, default=starting_dice)
+    parser.add_argument("-p", "--plus", type=int, default=0, help="+1 to a die modifiers")
+    parser.add_argument("-m", "--minus", type=int, default=0, help="-1 to a die modifiers")
+    args = parser.parse_args()
+
+    roll = Roll(dice=args.dice, plus=args.plus, minus=args.minus)
+    for card, cost in dice_costs(sidcon.parse.all_cards()):
+        print(
+            f"{card.name}: {cost.value} {roll.probability(cost):.3f} per round, "
+            f"{roll.expected_rounds(cost):.2f} rounds expected"
+        )
+        for _, upgrades, _ in card.front.upgrades:
+            for u in upgrades:
+                if isinstance(u, FactionSpecificUpgradeCondition) and is_dice_condition(u):
+                    print(f"  upgrade on {u.value}: {roll.probability(u):.3f} per round")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import dataclasses
+import json
+import logging
+import typing as typ
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.countedunits
+import sidcon.parse
+import sidcon.unit
+from sidcon.card import Card
+from sidcon.converter import Converter, alternatives
+from sidcon.countedunits import CountedUnits
+from sidcon.tech_upgrade_value import owner
+from sidcon.technology import Era
+from sidcon.unit import Unit, ValuableUnit
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# Units are counted over two aligned rows, what's kept then what's given away, each over the
+# non-donation units: a donation unit is counted given in the column of the unit it's a donation
+# of.
+OWNED = 0
+DONATED = 1
+
+units: Sequence[type[Unit]] = sorted(
+    sidcon.unit.key_to_non_donation_unit.values(), key=lambda u: u.__name__
+)
+unit_values: npt.NDArray = np.array(
+    [u.value if issubclass(u, ValuableUnit) else 0.0 for u in units], dtype=np.float64
+)
+# The row and column of every unit, donation or not, so that splitting units takes no subclass
+# tests.
+unit_index: Mapping[type[Unit], tuple[int, int]] = {
+    **{u: (OWNED, i) for i, u in enumerate(units)},
+    **{
+        d: (DONATED, units.index(sidcon.unit.key_to_non_donation_unit[d.key]))
+        for d in sidcon.unit.key_to_donation_unit.values()
+    },
+}
+_donation_of: Mapping[type[Unit], type[Unit]] = {
+    sidcon.unit.key_to_non_donation_unit[d.key]: d
+    for d in sidcon.unit.key_to_donation_unit.values()
+    if d.key in sidcon.unit.key_to_non_donation_unit
+}
+
+
+def counts(counted: CountedUnits) -> npt.NDArray:
+    """Returns counted as kept and given counts [row, unit]."""
+    split = np.zeros((2, len(units)), dtype=np.int32)
+    for u, n in counted.items():
+        split[unit_index[u]] += n
+    return split
+
+
+def from_counts(split: npt.NDArray) -> CountedUnits:
+    """Returns the units counted by split [row, unit], given units as donation units."""
+    counted: dict[type[Unit], int] = dict()
+    for u, n in zip(units, split[OWNED].tolist()):
+        if n:
+            counted[u] = n
+    for u, n in zip(units, split[DONATED].tolist()):
+        if n:
+            counted[_donation_of[u]] = n
+    return counted
+
+
+def kept(split: npt.NDArray) -> npt.NDArray:
+    """Returns what's kept [..., unit] of split [..., row, unit]."""
+    return split[..., OWNED, :]
+
+
+def given(split: npt.NDArray) -> npt.NDArray:
+    """Returns what must be given away [..., unit] of split [..., row, unit]."""
+    return split[..., DONATED, :]
+
+
+def value(split: npt.NDArray) -> npt.NDArray:
+    """Returns the value kept and given [..., row] of split [..., row, unit]."""
+    return split @ unit_values
+
+
+def _best_output(x: Converter) -> CountedUnits | None:
+    """Returns x's most valuable output alternative that's units, given units and all."""
+    outputs = [a for a in alternatives(x.outputs) if isinstance(a, Mapping)]
+    if not outputs:
+        return None
+    return max(outputs, key=sidcon.countedunits.value)
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Flows(object):
+    """What the converters on a card pool's faces give away, per owner and era [owner, era,
+    unit]: each converter on each face any card can reach, counted once, with its most valuable
+    output."""
+
+    owners: tuple[str, ...]
+    eras: tuple[Era | None, ...]
+    given: npt.NDArray
+
+    @classmethod
+    def from_cards(cls, cards: Sequence[Card]) -> "Flows":
+        keys = [(owner(c) or "", c.era_or_none) for c in cards]
+        owners = tuple(sorted({o for o, _ in keys}))
+        eras = tuple(sorted({e for _, e in keys}, key=lambda e: (e is not None, e)))
+        flows = np.zeros((len(owners), len(eras), len(units)), dtype=np.int64)
+        for c, (o, e) in zip(cards, keys):
+            for face in c.faces:
+                for x in face.features:
+                    if not isinstance(x, Converter):
+                        continue
+                    output = _best_output(x)
+                    if output is not None:
+                        flows[owners.index(o), eras.index(e)] += given(counts(output))
+        return cls(owners=owners, eras=eras, given=flows)
+
+    def by_owner(self) -> dict[str, npt.NDArray]:
+        """Returns what each owner gives away [unit], over every era."""
+        return dict(zip(self.owners, self.given.sum(axis=1)))
+
+    def by_era(self) -> dict[Era | None, npt.NDArray]:
+        """Returns what's given away in each era [unit], over every owner."""
+        return dict(zip(self.eras, self.given.sum(axis=0)))
+
+    def to_json(self) -> dict[str, typ.Any]:
+        def row(given: npt.NDArray) -> dict[str, typ.Any]:
+            return {
+                "value": float(given @ unit_values),
+                "units": {u.key: n for u, n in zip(units, given.tolist()) if n},
+            }
+
+        return {
+            "owners": {o or "none": row(g) for o, g in self.by_owner().items() if g.any()},
+            "eras": {
+                str(int(e)) if e is not None else "none": row(g) for e, g in self.by_era().items()
+            },
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.parse_args()
+    print(json.dumps(Flows.from_cards(sidcon.parse.all_cards()).to_json(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
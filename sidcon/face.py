@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import dataclasses
 import logging
+import math
 import typing as typ
 from collections.abc import Collection, Mapping, Sequence
 
@@ -39,6 +40,24 @@ class Face(object):
             raise ValueError(f"Face '{self.name}' has no unambiguous single Upgrade")
         return self.upgrades[0][0]
 
+    @property
+    def reachable_faces(self) -> list[Face]:
+        """This face and every face reachable from it by upgrading, depth-first."""
+        return [f for f, _, _ in self.reachable_tree]
+
+    @property
+    def reachable_tree(self) -> list[tuple[Face, int, int]]:
+        """Each of reachable_faces with its depth and the index of the face it's upgraded from,
+        or -1 for this face."""
+        tree: list[tuple[Face, int, int]] = []
+        stack = [(self, 0, -1)]
+        while stack:
+            f, depth, parent = stack.pop()
+            index = len(tree)
+            tree.append((f, depth, parent))
+            stack.extend((u, depth + 1, index) for _, _, u in reversed(f.upgrades))
+        return tree
+
     @property
     def converter(self) -> Converter:
         if len(self.features) != 1 or not isinstance(self.features[0], Converter):
@@ -69,6 +88,16 @@ class Face(object):
     def max_output_value(self) -> float:
         return max(c.output_value for c in self.features if isinstance(c, Converter))
 
+    def converter_value(self, attribute: str) -> float:
+        """Returns attribute, such as "max_output_value", or NaN if the face has no converter or
+        no single such value."""
+        if not any(isinstance(f, Converter) for f in self.features):
+            return math.nan
+        try:
+            return float(getattr(self, attribute))
+        except ValueError:
+            return math.nan
+
     @classmethod
     def from_strings(
         cls,
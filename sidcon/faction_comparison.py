@@ -0,0 +1,181 @@
+import argparse
+import csv
+import logging
+import sys
+import typing as typ
+from collections.abc import Collection, Mapping, Sequence
+
+import numpy as np
+
+import sidcon.closure
+import sidcon.faction
+import sidcon.parse
+import sidcon.starting_economy_value
+from sidcon.card import UndesirableCard
+from sidcon.faction import Faction
+from sidcon.index import CardIndex
+from sidcon.tech_upgrade_value import UpgradeLandscape
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+base_game = "Base"
+bifurcation_game = "Bifurcation"
+
+# In output order.
+metrics: Sequence[str] = [
+    "starting_economy",
+    "upgrade_potential",
+    "tech_gain",
+    "tech_gain_per_cost",
+    "undesirable_sensitivity",
+]
+
+header: Sequence[str] = [
+    "species",
+    "metric",
+    "base_faction",
+    "base",
+    "bifurcation_faction",
+    "bifurcation",
+    "difference",
+]
+
+
+def alternates(games: Mapping[type[Faction], str]) -> list[tuple[type[Faction], type[Faction]]]:
+    """Returns each base faction with the Bifurcation faction of its species, in games' order."""
+    bifurcation = {
+        sidcon.faction.to_species[f]: f for f, game in games.items() if game == bifurcation_game
+    }
+    return [
+        (f, bifurcation[sidcon.faction.to_species[f]])
+        for f, game in games.items()
+        if game == base_game and sidcon.faction.to_species[f] in bifurcation
+    ]
+
+
+@typ.final
+class FactionComparison(object):
+    """Measures factions from aggregates shared by every faction and scenario: one CardIndex,
+    whose per-scenario faction cards and converters are cached, the best face of every card with
+    every technology known, and one UpgradeLandscape.
+
+    For each faction, at an undesirable limit:
+
+    starting_economy         the most its starting cards, merged, net in a turn
+    upgrade_potential        what upgrading each starting card to its best face adds, in total
+    tech_gain                what every upgrade of its own cards adds, in total
+    tech_gain_per_cost       that over the total cost of the upgrades that can be priced
+    undesirable_sensitivity  how much starting_economy rises per undesirable card allowed, from
+                             none to every one
+
+    A faction with no starting cards in the data has NaN starting metrics.
+    """
+
+    index: typ.Final[CardIndex]
+    landscape: typ.Final[UpgradeLandscape]
+    undesirable_count: typ.Final[int]
+
+    _best_gain: Mapping[int, float]
+
+    def __init__(self, index: CardIndex, landscape: UpgradeLandscape | None = None) -> None:
+        self.index = index
+        self.landscape = (
+            landscape if landscape is not None else UpgradeLandscape.from_cards(index.cards)
+        )
+        self.undesirable_count = sum(isinstance(c, UndesirableCard) for c in index.cards)
+
+        closure = index.closure
+        best = closure.best_faces(sidcon.closure.mask(sidcon.closure.requirement_keys))
+        gain = closure.value[best] - closure.value[closure.face_offsets[:-1]]
+        self._best_gain = {id(c): float(g) for c, g in zip(closure.cards, gain)}
+
+    def starting_economy(
+        self,
+        faction: type[Faction],
+        undesirable_limit: int,
+        species_in_play: Collection[str] = sidcon.starting_economy_value.ALL_SPECIES.keys(),
+    ) -> float:
+        converters = self.index.converter_by_faction(undesirable_limit, species_in_play)
+        if faction not in converters:
+            return np.nan
+        return converters[faction].max_net_value
+
+    def measure(
+        self,
+        faction: type[Faction],
+        undesirable_limit: int,
+        species_in_play: Collection[str] = sidcon.starting_economy_value.ALL_SPECIES.keys(),
+    ) -> dict[str, float]:
+        """Returns faction's metrics, by name."""
+        cards = self.index.cards_by_faction(undesirable_limit, species_in_play).get(faction, [])
+        edges = self.landscape.by_owner(faction.faction_name)
+        priced = edges[np.isfinite(self.landscape.cost[edges])]
+        cost = self.landscape.cost[priced].sum()
+        economy = [
+            self.starting_economy(faction, limit, species_in_play)
+            for limit in (0, self.undesirable_count)
+        ]
+        return {
+            "starting_economy": self.starting_economy(faction, undesirable_limit, species_in_play),
+            "upgrade_potential": (
+                sum(self._best_gain.get(id(c), 0.0) for c in cards) if cards else np.nan
+            ),
+            "tech_gain": float(self.landscape.gain[edges].sum()),
+            "tech_gain_per_cost": (
+                float(self.landscape.gain[priced].sum() / cost) if cost > 0 else np.nan
+            ),
+            "undesirable_sensitivity": (
+                (economy[1] - economy[0]) / self.undesirable_count
+                if self.undesirable_count
+                else 0.0
+            ),
+        }
+
+    def rows(
+        self,
+        pairs: Sequence[tuple[type[Faction], type[Faction]]],
+        undesirable_limit: int,
+        species_in_play: Collection[str] = sidcon.starting_economy_value.ALL_SPECIES.keys(),
+    ) -> list[list[str]]:
+        """Returns a row of header for every pair and metric, pair by pair."""
+
+        def number(x: float) -> str:
+            return f"{x:.3f}" if np.isfinite(x) else "nan"
+
+        rows = []
+        for base, alternate in pairs:
+            a = self.measure(base, undesirable_limit, species_in_play)
+            b = self.measure(alternate, undesirable_limit, species_in_play)
+            for m in metrics:
+                rows.append(
+                    [
+                        sidcon.faction.to_species[base].species_name,
+                        m,
+                        base.faction_name,
+                        number(a[m]),
+                        alternate.faction_name,
+                        number(b[m]),
+                        number(b[m] - a[m]),
+                    ]
+                )
+        return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compares every base faction with its Bifurcation alternate, as TSV."
+    )
+    parser.add_argument("-u", "--undesirable-limit", type=int, default=0)
+    args = parser.parse_args()
+
+    comparison = FactionComparison(CardIndex(sidcon.parse.all_cards()))
+    pairs = alternates(sidcon.parse.faction_games_from_filepath())
+    writer = csv.writer(sys.stdout, delimiter="\t", lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(comparison.rows(pairs, args.undesirable_limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import argparse
+import logging
+import time
+import typing as typ
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.faction
+import sidcon.parse
+from sidcon.game import Catalogue, Table, groups, resource_count
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# An inventory's levels are how many it holds of each resource, then of each group's resources
+# together. A converter input alternative is affordable exactly when every level is at least its
+# threshold: the units it needs of the resource, or of the group's resources and "any of the
+# group" units together.
+level_count = resource_count + len(groups)
+
+
+def levels(inventory: npt.NDArray) -> npt.NDArray:
+    """Returns inventory's levels [..., level] for inventory [..., resource]."""
+    return np.concatenate(
+        [inventory, *(inventory[..., members].sum(axis=-1, keepdims=True) for members in groups)],
+        axis=-1,
+    )
+
+
+def thresholds(need: npt.NDArray) -> npt.NDArray:
+    """Returns the levels [..., level] paying need [..., column] takes; see Table._affordable."""
+    exact = need[..., :resource_count]
+    return np.concatenate(
+        [
+            exact,
+            *(
+                exact[..., members].sum(axis=-1, keepdims=True)
+                + need[..., resource_count + g, None]
+                for g, members in enumerate(groups)
+            ),
+        ],
+        axis=-1,
+    )
+
+
+@typ.final
+class FeasibilityIndex(object):
+    """Every converter input alternative in a catalogue as thresholds on inventory levels, so
+    that which converters on a whole tableau can run is one comparison.
+
+    Only the levels some alternative needs are compared. Wildcard inputs (AnySmall, SmallWild,
+    ...) are thresholds on their group's level, and "/" alternatives are compared separately,
+    a converter running if any of its alternatives can be paid.
+    """
+
+    catalogue: typ.Final[Catalogue]
+    thresholds: typ.Final[npt.NDArray]  # [face, converter, alternative, needed level]
+    needed: typ.Final[npt.NDArray]  # [level]
+    "The levels some input alternative needs."
+
+    def __init__(self, catalogue: Catalogue) -> None:
+        self.catalogue = catalogue
+        full = thresholds(catalogue.inputs)
+        self.needed = np.flatnonzero((full > 0).any(axis=(0, 1, 2)))
+        self.thresholds = np.ascontiguousarray(full[..., self.needed])
+
+    def short(self, inventory: npt.NDArray, tableau: npt.NDArray) -> npt.NDArray:
+        """Returns which needed levels inventory [..., resource] falls short of for each input
+        alternative on tableau [..., slot] [..., slot, converter, alternative, level]."""
+        have = levels(inventory)[..., self.needed]
+        return have[..., None, None, None, :] < self.thresholds[tableau]
+
+    def feasible(self, inventory: npt.NDArray, tableau: npt.NDArray) -> npt.NDArray:
+        """Returns whether inventory [..., resource] can pay each input alternative on tableau
+        [..., slot] [..., slot, converter, alternative]."""
+        return self.catalogue.input_ok[tableau] & ~self.short(inventory, tableau).any(axis=-1)
+
+    def runnable(self, inventory: npt.NDArray, tableau: npt.NDArray) -> npt.NDArray:
+        """Returns whether inventory [..., resource] can run each converter on tableau [...,
+        slot] [..., slot, converter]."""
+        return np.asarray(self.feasible(inventory, tableau).any(axis=-1))
+
+    def track(self, inventory: npt.NDArray, tableau: npt.NDArray) -> "Feasibility":
+        return Feasibility(self, inventory, tableau)
+
+
+@typ.final
+class Feasibility(object):
+    """Which input alternatives on tableaus [..., slot] their inventories [..., resource] can
+    pay, kept up to date as both change.
+
+    An update compares again only the tableaus whose inventory or faces changed, and for an
+    inventory change only the levels that changed.
+    """
+
+    index: typ.Final[FeasibilityIndex]
+    inventory: npt.NDArray
+    tableau: npt.NDArray
+
+    _levels: npt.NDArray  # [..., needed level]
+    _short: npt.NDArray  # [..., slot, converter, alternative, needed level]
+    _unmet: npt.NDArray  # [..., slot, converter, alternative]
+
+    def __init__(
+        self, index: FeasibilityIndex, inventory: npt.NDArray, tableau: npt.NDArray
+    ) -> None:
+        self.index = index
+        self.inventory = inventory.copy()
+        self.tableau = tableau.copy()
+        self._levels = levels(inventory)[..., index.needed]
+        self._short = index.short(inventory, tableau)
+        self._unmet = self._short.sum(axis=-1)
+
+    @property
+    def feasible(self) -> npt.NDArray:
+        """Returns whether each input alternative can be paid [..., slot, converter,
+        alternative]."""
+        return self.index.catalogue.input_ok[self.tableau] & (self._unmet == 0)
+
+    @property
+    def runnable(self) -> npt.NDArray:
+        """Returns whether each converter can run [..., slot, converter]."""
+        return np.asarray(self.feasible.any(axis=-1))
+
+    def update(self, inventory: npt.NDArray, tableau: npt.NDArray | None = None) -> None:
+        """Brings the state up to date with inventory [..., resource], and tableau [..., slot]
+        if given, which must have as many slots as before."""
+        new_levels = levels(inventory)[..., self.index.needed]
+        if tableau is not None:
+            changed = (tableau != self.tableau).any(axis=-1)
+            rows = np.nonzero(changed)
+            self.tableau[rows] = tableau[rows]
+            self.inventory[rows] = inventory[rows]
+            self._levels[rows] = new_levels[rows]
+            self._short[rows] = self.index.short(inventory[rows], tableau[rows])
+            self._unmet[rows] = self._short[rows].sum(axis=-1)
+
+        moved = new_levels != self._levels
+        rows = np.nonzero(moved.any(axis=-1))
+        if not rows[0].size:
+            return
+        columns = np.flatnonzero(moved[rows].any(axis=0))
+        was = self._short[rows][..., columns]
+        now = (
+            new_levels[rows][:, None, None, None, columns]
+            < self.index.thresholds[self.tableau[rows]][..., columns]
+        )
+        self._unmet[rows] += now.sum(axis=-1) - was.sum(axis=-1)
+        short = self._short[rows]
+        short[..., columns] = now
+        self._short[rows] = short
+        self._levels[rows] = new_levels[rows]
+        self.inventory[rows] = inventory[rows]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("factions", nargs="+", help="faction names, one per player")
+    parser.add_argument("-g", "--games", type=int, default=1000)
+    parser.add_argument("-t", "--turns", type=int, default=3)
+    args = parser.parse_args()
+
+    factions = [sidcon.faction.name_to_faction[f] for f in args.factions]
+    catalogue = Catalogue(sidcon.parse.all_cards())
+    index = FeasibilityIndex(catalogue)
+    table = Table(catalogue, factions, games=args.games)
+    for _ in range(args.turns):
+        table.step()
+
+    start = time.perf_counter()
+    runnable = index.runnable(table.inventory, table.tableau)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{runnable.sum():,} of {catalogue.input_ok[table.tableau].any(axis=-1).sum():,} "
+        f"converters runnable, checked in {elapsed * 1000:.1f} ms"
+    )
+
+    feasibility = index.track(table.inventory, table.tableau)
+    table.step()
+    start = time.perf_counter()
+    feasibility.update(table.inventory, table.tableau)
+    elapsed = time.perf_counter() - start
+    print(f"updated after a turn in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import dataclasses
+import hashlib
+import logging
+import os
+import threading
+import time
+import typing as typ
+from collections.abc import Callable, Iterator, Sequence
+
+import sidcon.parse
+from sidcon.card import Card
+from sidcon.row import Row
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+RowHash = str
+
+# A card is keyed by the hashes of the rows it was built from, so a Kt'Zr'Kt'Rtl dual card is
+# rebuilt whenever either of its halves changes.
+CardKey = tuple[RowHash, ...]
+
+_FIELD_SEPARATOR = "\x1f"
+
+
+def row_hash(r: Row) -> RowHash:
+    """Returns a content hash of r that is stable across processes."""
+    content = _FIELD_SEPARATOR.join(dataclasses.astuple(r))
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class LoadStats(object):
+    reused: int
+    rebuilt: int
+    seconds: float
+
+
+@typ.final
+class IncrementalLoader(object):
+    """Parses the card data files, rebuilding only the cards whose rows changed since last load.
+
+    Unchanged files are not even re-read: a file is reloaded only when its modification time or
+    size changes.
+    """
+
+    filenames: typ.Final[Sequence[str]]
+    last_stats: LoadStats | None
+
+    _cards_by_key: dict[CardKey, Card | None]
+    _keys_by_file: dict[str, list[CardKey]]
+    _stamps: dict[str, tuple[int, int]]
+
+    def __init__(self, filenames: Sequence[str] = sidcon.parse.filenames) -> None:
+        self.filenames = filenames
+        self.last_stats = None
+        self._cards_by_key = dict()
+        self._keys_by_file = dict()
+        self._stamps = dict()
+
+    def all_cards(self) -> list[Card]:
+        """Returns the full card pool, equivalent to sidcon.parse.all_cards()."""
+        self.reload()
+        return self.cards()
+
+    def cards(self) -> list[Card]:
+        """Returns the card pool as of the last load, without checking the files."""
+        cards = []
+        for fname in self.filenames:
+            for key in self._keys_by_file.get(fname, []):
+                card = self._cards_by_key[key]
+                if card is not None:
+                    cards.append(card)
+        return cards
+
+    def changed_files(self) -> list[str]:
+        return [fname for fname in self.filenames if self._stamps.get(fname) != _stamp(fname)]
+
+    def reload(self) -> bool:
+        """Reloads every changed file. Returns whether anything changed."""
+        changed = self.changed_files()
+        if not changed:
+            return False
+
+        start = time.perf_counter()
+        reused = rebuilt = 0
+        for fname in changed:
+            stamp = _stamp(fname)
+            keys = []
+            for rows in sidcon.parse.card_row_groups(sidcon.parse.rows_from_filepath(fname)):
+                key = tuple(row_hash(r) for r in rows)
+                if key in self._cards_by_key:
+                    reused += 1
+                else:
+                    self._cards_by_key[key] = sidcon.parse.logged_card_from_rows(rows)
+                    rebuilt += 1
+                keys.append(key)
+            self._keys_by_file[fname] = keys
+            self._stamps[fname] = stamp
+
+        # Drop cards whose rows no longer exist in any file.
+        live_keys = {k for keys in self._keys_by_file.values() for k in keys}
+        self._cards_by_key = {k: c for k, c in self._cards_by_key.items() if k in live_keys}
+
+        self.last_stats = LoadStats(
+            reused=reused, rebuilt=rebuilt, seconds=time.perf_counter() - start
+        )
+        logger.info(f"Reloaded {changed}: {self.last_stats}")
+        return True
+
+    def watch(self, interval: float = 0.25) -> Iterator[list[Card]]:
+        """Yields the card pool now, and again every time a data file changes."""
+        self.reload()
+        yield self.cards()
+        while True:
+            time.sleep(interval)
+            if self.reload():
+                yield self.cards()
+
+
+def _stamp(fname: str) -> tuple[int, int]:
+    st = os.stat(fname)
+    return (st.st_mtime_ns, st.st_size)
+
+
+@typ.final
+class LiveCards(object):
+    """Keeps an all_cards() result in sync with the data files from a background thread.
+
+    Usage:
+        with LiveCards() as live:
+            ...
+            cards = live.all_cards()
+    """
+
+    loader: typ.Final[IncrementalLoader]
+    interval: typ.Final[float]
+    on_change: typ.Final[Callable[[list[Card]], None] | None]
+
+    _cards: list[Card]
+    _stopped: threading.Event
+    _thread: threading.Thread | None
+
+    def __init__(
+        self,
+        loader: IncrementalLoader | None = None,
+        interval: float = 0.25,
+        on_change: Callable[[list[Card]], None] | None = None,
+    ) -> None:
+        self.loader = loader if loader is not None else IncrementalLoader()
+        self.interval = interval
+        self.on_change = on_change
+        self._cards = self.loader.all_cards()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def all_cards(self) -> list[Card]:
+        return self._cards
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="sidcon-live-cards", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "LiveCards":
+        self.start()
+        return self
+
+    def __exit__(self, *_: typ.Any) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                changed = self.loader.reload()
+            except Exception:
+                # Mid-edit files are often briefly unparseable; keep serving the last good pool.
+                logger.exception("couldn't reload card data; keeping previous cards")
+                continue
+            if changed:
+                self._cards = self.loader.cards()
+                if self.on_change is not None:
+                    self.on_change(self._cards)
+
+
+def main() -> None:
+    loader = IncrementalLoader()
+    for cards in loader.watch():
+        print(f"{len(cards)} cards: {loader.last_stats}")
+
+
+if __name__ == "__main__":
+    main()
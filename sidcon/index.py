@@ -0,0 +1,123 @@
+import logging
+import typing as typ
+from collections import defaultdict
+from collections.abc import Collection, Mapping, Sequence
+
+import sidcon.closure
+import sidcon.faction
+import sidcon.parse
+import sidcon.starting_economy_value
+from sidcon.card import Card, FactionCard, Starting
+from sidcon.closure import Reachable, UpgradeClosure
+from sidcon.converter import Converter
+from sidcon.faction import Faction, Species
+from sidcon.technology import Technology
+from sidcon.upgrade_index import UpgradeIndex, UpgradeKey
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# An undesirable limit and the species in play.
+Scenario = tuple[int, frozenset[str]]
+
+
+@typ.final
+class CardIndex(object):
+    """Lookup tables over a card pool, built once so that queries don't rescan it.
+
+    Per-scenario faction aggregates are computed on first use and cached.
+    """
+
+    cards: typ.Final[Sequence[Card]]
+    by_name: typ.Final[Mapping[str, Sequence[Card]]]
+    by_folded_name: typ.Final[Mapping[str, Sequence[Card]]]
+    by_faction: typ.Final[Mapping[type[Faction], Sequence[Card]]]
+    by_species: typ.Final[Mapping[type[Species], Sequence[Card]]]
+    upgrades: typ.Final[UpgradeIndex]
+    closure: typ.Final[UpgradeClosure]
+
+    _cards_by_faction: dict[Scenario, dict[type[Faction], list]]
+    _converter_by_faction: dict[Scenario, dict[type[Faction], Converter]]
+
+    def __init__(self, cards: Sequence[Card]) -> None:
+        self.cards = cards
+
+        by_name: defaultdict[str, list[Card]] = defaultdict(list)
+        by_folded_name: defaultdict[str, list[Card]] = defaultdict(list)
+        by_faction: defaultdict[type[Faction], list[Card]] = defaultdict(list)
+        by_species: defaultdict[type[Species], list[Card]] = defaultdict(list)
+        for c in cards:
+            by_name[c.name].append(c)
+            by_folded_name[c.name.casefold()].append(c)
+            if isinstance(c, FactionCard) and isinstance(c, Starting):
+                by_faction[c.faction].append(c)
+            species = getattr(c, "species", None)
+            if species is not None:
+                by_species[species].append(c)
+
+        self.by_name = dict(by_name)
+        self.by_folded_name = dict(by_folded_name)
+        self.by_faction = dict(by_faction)
+        self.by_species = dict(by_species)
+        self.upgrades = UpgradeIndex(cards)
+        self.closure = UpgradeClosure(cards)
+        self._cards_by_faction = dict()
+        self._converter_by_faction = dict()
+
+    @classmethod
+    def from_files(cls) -> "CardIndex":
+        return cls(sidcon.parse.all_cards())
+
+    def named(self, name: str) -> Sequence[Card]:
+        """Returns the cards named name, falling back to a case-insensitive match."""
+        return self.by_name.get(name) or self.by_folded_name.get(name.casefold(), [])
+
+    def tableau(self, faction: type[Faction]) -> Sequence[Card]:
+        """Returns the starting cards of faction."""
+        return self.by_faction.get(faction, [])
+
+    def upgrade_targets(self, technology: type[Technology]) -> Sequence[Card]:
+        """Returns the cards with an upgrade that requires technology, donated or not."""
+        return self.upgrades.cards(technology)
+
+    def best_reachable(self, card: Card, known: Collection[UpgradeKey] = ()) -> Reachable:
+        """Returns card's most valuable face reachable with the known technologies and met
+        conditions."""
+        return self.closure.best(card, sidcon.closure.mask(known))
+
+    def cards_by_faction(
+        self,
+        undesirable_limit: int,
+        species_in_play: Collection[str] = sidcon.starting_economy_value.ALL_SPECIES.keys(),
+    ) -> Mapping[type[Faction], Sequence[Card]]:
+        scenario = (undesirable_limit, frozenset(species_in_play))
+        if scenario not in self._cards_by_faction:
+            self._cards_by_faction[scenario] = sidcon.starting_economy_value.get_cards_by_faction(
+                self.cards, undesirable_limit, species_in_play
+            )
+        return self._cards_by_faction[scenario]
+
+    def converter_by_faction(
+        self,
+        undesirable_limit: int,
+        species_in_play: Collection[str] = sidcon.starting_economy_value.ALL_SPECIES.keys(),
+    ) -> Mapping[type[Faction], Converter]:
+        """Returns each faction's starting cards merged into one Converter."""
+        scenario = (undesirable_limit, frozenset(species_in_play))
+        if scenario not in self._converter_by_faction:
+            self._converter_by_faction[
+                scenario
+            ] = sidcon.starting_economy_value.get_overall_converter_by_faction(
+                self.cards_by_faction(undesirable_limit, species_in_play)
+            )
+        return self._converter_by_faction[scenario]
+
+
+def faction_from_string(s: str) -> type[Faction]:
+    if s in sidcon.faction.name_to_faction:
+        return sidcon.faction.name_to_faction[s]
+    folded = {name.casefold(): f for name, f in sidcon.faction.name_to_faction.items()}
+    if s.casefold() in folded:
+        return folded[s.casefold()]
+    raise ValueError(f"couldn't parse Faction from string '{s}'")
@@ -1,9 +1,11 @@
-import collections
 import csv
 import logging
 import pprint
+from collections.abc import Iterable, Iterator, Sequence
 
 import sidcon.card
+import sidcon.faction
+import sidcon.validate
 from sidcon.card import (
     Card,
     CreatedCard,
@@ -17,8 +19,9 @@ from sidcon.card import (
     TechnologyCard,
     UndesirableCard,
 )
-from sidcon.faction import KtZrKtRtl
+from sidcon.faction import Faction, KtZrKtRtl
 from sidcon.row import Row
+from sidcon.validate import ValidationError, Validator
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
@@ -60,62 +63,95 @@ skipped_front_names = [
 
 
 filenames = ["data/cards.csv", "data/bifurcation-cards.csv"]
+factions_filename = "data/factions.csv"
 
 
-def cards_from_filepath(filepath: str) -> list[Card]:
-    cards = []
+def rows_from_filepath(filepath: str) -> list[Row]:
+    rows = []
     with open(filepath) as csvfile:
-        pp = pprint.PrettyPrinter(sort_dicts=False)
         dr = csv.DictReader(csvfile)
-        kt_rows: dict[str, Row] = dict()
         for d in dr:
             r = Row.from_dict(d)
             if r.faction_name in skipped_card_factions:
                 continue
             if r.front_name in skipped_front_names:
                 continue
-            if r.front_name in sidcon.card.kt_card_name_mapping:
-                kt_rows[r.front_name] = r
-                if sidcon.card.kt_card_name_mapping[r.front_name] not in kt_rows:
-                    continue
-            try:
-                source = Source.from_string(r.cost)
-                card: Card
-                if source == Source.CREATED:
-                    if r.front_name in sidcon.card.project_card_front_names:
-                        card = ProjectCard.from_row(r)
-                    elif r.front_name in sidcon.card.kt_colony_card_front_names:
-                        card = KtColonyCard.from_row(r)
-                    else:
-                        card = CreatedCard.from_row(r)
-                elif source == Source.RESEARCH:
-                    card = TechnologyCard.from_row(r)
-                elif source == Source.STARTING:
-                    if r.front_name in sidcon.card.kt_card_name_mapping:
-                        if r.front_name in sidcon.card.kt_left_card_names:
-                            left_row = kt_rows[r.front_name]
-                            right_row = kt_rows[sidcon.card.kt_card_name_mapping[r.front_name]]
-                        else:
-                            left_row = kt_rows[sidcon.card.kt_card_name_mapping[r.front_name]]
-                            right_row = kt_rows[r.front_name]
-                        card = KtDualCard.from_rows(left_row, right_row)
-                    elif r.front_name == sidcon.card.starting_race_card_front_name:
-                        card = SetupCard.from_row(r)
-                    else:
-                        card = StartingCard.from_row(r)
-                elif source == Source.UNDESIRABLE:
-                    card = UndesirableCard.from_row(r)
-                elif source == Source.BID:
-                    # TODO: Implement research teams and colonies.
-                    if r.faction_name == "Colonies":
-                        card = DualFacedColonyCard.from_row(r)
-                else:
-                    pass
-                cards.append(card)
-                logger.info(f"Parsed card number {r.card_number}.\n")
-            except Exception as e:
-                logger.fatal(f"couldn't parse row dict:\n{pp.pformat(r)}\n")
-                raise e
+            rows.append(r)
+    return rows
+
+
+def card_row_groups(rows: Iterable[Row]) -> Iterator[tuple[Row, ...]]:
+    """Yields the rows that make up each card, in file order.
+
+    Every card is made from a single row, except for Kt'Zr'Kt'Rtl dual cards, which are made from
+    a (left, right) pair of rows and are yielded once both halves have been seen.
+    """
+    kt_rows: dict[str, Row] = dict()
+    for r in rows:
+        if r.front_name in sidcon.card.kt_card_name_mapping:
+            kt_rows[r.front_name] = r
+            partner_name = sidcon.card.kt_card_name_mapping[r.front_name]
+            if partner_name not in kt_rows:
+                continue
+            if r.front_name in sidcon.card.kt_left_card_names:
+                yield (r, kt_rows[partner_name])
+            else:
+                yield (kt_rows[partner_name], r)
+            continue
+        yield (r,)
+
+
+def card_from_rows(rows: Sequence[Row]) -> Card | None:
+    """Builds the card made from rows, as grouped by card_row_groups.
+
+    Returns None for rows that describe cards which aren't implemented yet.
+    """
+    if len(rows) == 2:
+        left_row, right_row = rows
+        return KtDualCard.from_rows(left_row, right_row)
+
+    (r,) = rows
+    source = Source.from_string(r.cost)
+    if source == Source.CREATED:
+        if r.front_name in sidcon.card.project_card_front_names:
+            return ProjectCard.from_row(r)
+        elif r.front_name in sidcon.card.kt_colony_card_front_names:
+            return KtColonyCard.from_row(r)
+        else:
+            return CreatedCard.from_row(r)
+    elif source == Source.RESEARCH:
+        return TechnologyCard.from_row(r)
+    elif source == Source.STARTING:
+        if r.front_name == sidcon.card.starting_race_card_front_name:
+            return SetupCard.from_row(r)
+        else:
+            return StartingCard.from_row(r)
+    elif source == Source.UNDESIRABLE:
+        return UndesirableCard.from_row(r)
+    elif source == Source.BID:
+        # TODO: Implement research teams and colonies.
+        if r.faction_name == "Colonies":
+            return DualFacedColonyCard.from_row(r)
+    return None
+
+
+def logged_card_from_rows(rows: Sequence[Row]) -> Card | None:
+    try:
+        card = card_from_rows(rows)
+    except Exception as e:
+        pp = pprint.PrettyPrinter(sort_dicts=False)
+        logger.fatal(f"couldn't parse row dict:\n{pp.pformat(rows[-1])}\n")
+        raise e
+    logger.info(f"Parsed card number {rows[-1].card_number}.\n")
+    return card
+
+
+def cards_from_filepath(filepath: str) -> list[Card]:
+    cards = []
+    for rows in card_row_groups(rows_from_filepath(filepath)):
+        card = logged_card_from_rows(rows)
+        if card is not None:
+            cards.append(card)
     return cards
 
 
@@ -126,58 +162,39 @@ def all_cards() -> list[Card]:
     return cards
 
 
-def validate_tech_cards():
-    cards = [c for c in all_cards() if isinstance(c, TechnologyCard)]
+def setup_cards_from_filepath(filepath: str) -> list[SetupCard]:
+    """Returns the Starting Race Cards in filepath, which rows_from_filepath skips, since no
+    player holds them."""
+    with open(filepath) as csvfile:
+        return [
+            SetupCard.from_row(r)
+            for r in map(Row.from_dict, csv.DictReader(csvfile))
+            if r.front_name == sidcon.card.starting_race_card_front_name
+        ]
 
-    fronts = [c.front for c in cards]
-    assert all(len(f.features) == 1 for f in fronts)
-    assert len(set([f.name for f in fronts])) == 21
 
-    fronts_by_name = collections.defaultdict(list)
-    for front in fronts:
-        fronts_by_name[front.name].append(front)
+def all_setup_cards() -> list[SetupCard]:
+    cards = []
+    for fname in filenames:
+        cards.extend(setup_cards_from_filepath(fname))
+    return cards
 
-    for front_name, like_fronts in fronts_by_name.items():
-        assert len(set([f.input_value for f in like_fronts])) == 1
-        upgrade_pairs = [
-            tuple(sorted(f.upgrades[0][1], key=lambda t: str(t))) for f in like_fronts
-        ]
-        assert len(set(upgrade_pairs)) == 1
-
-    backs = [c.front.upgrades[0][2] for c in cards]
-    assert all(len(f.features) == 1 for f in backs)
-
-    back_names = set([f.name for f in backs])
-    assert len(back_names) == 22
-    # Imdril has Galactic Reunion instead of Galactic Colonization........
-
-    backs_by_name = collections.defaultdict(list)
-    for back in backs:
-        backs_by_name[back.name].append(back)
-
-    # Some of the unity upgrades produce the same output value as others, but most do not.
-    unity_same_back_names = [
-        "Multispecies Hybrid Cultures",
-        "Full Interspecies Integration",
-        "Living Infrastructure",
-        "Galactic Domination",
-        "Stasis Field",
-        "Macroscale Teleportation",
-        "Dyson Swarms",
-        "Galactic Colonization",
-    ]
 
-    for back_name, like_backs in backs_by_name.items():
-        # Imdril has Galactic Reunion instead of Galactic Colonization........
-        if back_name == "Galactic Reunion":
-            back_name = "Galactic Colonization"
-        unique_output_values = set([f.output_value for f in like_backs])
-        if back_name in unity_same_back_names:
-            assert len(unique_output_values) == 1
-        else:
-            assert len(unique_output_values) == 2
-            output1, output2 = unique_output_values
-            assert abs(output1 - output2) == 0.5
+def faction_games_from_filepath(filepath: str = factions_filename) -> dict[type[Faction], str]:
+    """Returns the game each faction in filepath is from, in file order: "Base" or
+    "Bifurcation"."""
+    with open(filepath) as csvfile:
+        return {
+            sidcon.faction.name_to_faction[r["Faction"].replace("’", "'")]: r["Game"]
+            for r in csv.DictReader(csvfile)
+        }
+
+
+def validate_tech_cards():
+    validator = Validator(sidcon.validate.tech_card_rules)
+    violations = validator.validate(all_cards())
+    if violations:
+        raise ValidationError(violations)
 
 
 def pprint_species_cards(species):
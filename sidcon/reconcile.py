@@ -0,0 +1,227 @@
+import csv
+import dataclasses
+import logging
+import math
+import re
+from collections.abc import Collection, Sequence
+
+import sidcon.parse
+from sidcon.card import KtDualCard
+from sidcon.converter import Converter
+from sidcon.face import Face
+from sidcon.row import Column, Row, SheetValues
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# A face whose converter string carries this marker can only be fed to one of its converters, so
+# its input value is the largest single converter input rather than the total.
+_MAX_INPUT_MARKER = "§"
+
+# The sheet writes 1000 as the efficiency of converters that take no input.
+_ZERO_INPUT_EFFICIENCY = 1000.0
+
+# The sheet rounds to three decimal places.
+_TOLERANCE = 1e-3
+
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+
+reconciled_columns: Sequence[Column] = [
+    Column.INPUT_VALUE,
+    Column.FRONT_OUTPUT_VALUE,
+    Column.FRONT_EFFICIENCY,
+    Column.BACK_OUTPUT_VALUE,
+    Column.BACK_EFFICIENCY,
+    Column.UPGRADES,
+]
+
+# Each computed cell is the set of values the sheet may legitimately have written, since faces
+# with alternative inputs or outputs have no single value.
+Candidates = frozenset[float]
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Discrepancy(object):
+    filepath: str
+    card_number: str
+    front_name: str
+    column: Column
+    sheet: str
+    computed: Candidates
+
+    def __str__(self) -> str:
+        computed = " or ".join(f"{c:g}" for c in sorted(self.computed))
+        return (
+            f"{self.filepath}:{self.card_number} '{self.front_name}' {self.column.value}: "
+            f"sheet has {self.sheet}, parsed faces compute {computed}"
+        )
+
+
+def sheet_candidates(cell: str) -> Candidates:
+    """Parses a sheet cell such as "4.5", "(1.5 or 4)", or "([0] / 1.5 /2)"."""
+    return frozenset(float(n) for n in _NUMBER_PATTERN.findall(cell))
+
+
+def _input_candidates(face: Face, max_input: bool) -> Candidates:
+    converters = [f for f in face.features if isinstance(f, Converter)]
+    if not converters:
+        return frozenset()
+    combine = max if max_input else sum
+    return frozenset(
+        [
+            float(combine(c.min_input_value for c in converters)),
+            float(combine(c.max_input_value for c in converters)),
+        ]
+    )
+
+
+def _output_candidates(face: Face) -> Candidates:
+    converters = [f for f in face.features if isinstance(f, Converter)]
+    if not converters:
+        return frozenset()
+    return frozenset(
+        [
+            float(sum(c.min_output_value for c in converters)),
+            float(sum(c.max_output_value for c in converters)),
+        ]
+    )
+
+
+def _ratio_candidates(
+    numerators: Candidates, denominators: Candidates, zero_value: float | None
+) -> Candidates:
+    ratios: set[float] = set()
+    for n in numerators:
+        for d in denominators:
+            if d != 0:
+                ratios.add(n / d)
+            elif zero_value is not None:
+                ratios.add(zero_value)
+    return frozenset(ratios)
+
+
+def _matches(sheet: Candidates, computed: Candidates) -> bool:
+    return any(math.isclose(s, c, abs_tol=_TOLERANCE) for s in sheet for c in computed)
+
+
+def _reconciled_rows(filepath: str) -> list[tuple[Row, SheetValues]]:
+    rows = []
+    with open(filepath) as csvfile:
+        for d in csv.DictReader(csvfile):
+            r = Row.from_dict(d)
+            if r.faction_name in sidcon.parse.skipped_card_factions:
+                continue
+            if r.front_name in sidcon.parse.skipped_front_names:
+                continue
+            rows.append((r, SheetValues.from_dict(d)))
+    return rows
+
+
+def _row_faces(rows: Sequence[Row]) -> list[tuple[Face, Face | None, bool, bool]]:
+    """Returns each row's front and back faces, and whether each has the max input marker.
+
+    The sheet values a Kt'Zr'Kt'Rtl dual card as a whole on one of its halves' rows, so both
+    halves get the dual card's fronts and backs merged.
+    """
+    faces: dict[int, tuple[Face, Face | None, bool, bool]] = dict()
+    for group in sidcon.parse.card_row_groups(rows):
+        front_max = any(_MAX_INPUT_MARKER in r.front_converter for r in group)
+        back_max = any(_MAX_INPUT_MARKER in r.back_converter for r in group)
+        if len(group) == 2:
+            kt = KtDualCard.from_rows(*group)
+            (back,) = kt.states(lambda left, right: left is not kt.left and right is not kt.right)
+            for r in group:
+                faces[id(r)] = (kt.front, back, front_max, back_max)
+            continue
+        (r,) = group
+        faces[id(r)] = (
+            Face.from_strings(r.front_name, r.front_feature_strings),
+            (
+                Face.from_strings(r.back_name, r.back_feature_strings)
+                if r.back_name and r.back_feature_strings
+                else None
+            ),
+            front_max,
+            back_max,
+        )
+    return [faces[id(r)] for r in rows]
+
+
+def _computed_columns(rows: Sequence[Row]) -> dict[Column, list[Candidates]]:
+    """Computes every reconciled column for every row, column by column."""
+    faces = _row_faces(rows)
+    front_inputs = [_input_candidates(f, front_max) for f, _, front_max, _ in faces]
+    back_inputs = [
+        _input_candidates(b, back_max) if b else frozenset() for _, b, _, back_max in faces
+    ]
+    fronts = [f for f, _, _, _ in faces]
+    backs = [b for _, b, _, _ in faces]
+    front_outputs = [_output_candidates(f) for f in fronts]
+    back_outputs = [_output_candidates(b) if b else frozenset() for b in backs]
+
+    return {
+        Column.INPUT_VALUE: front_inputs,
+        Column.FRONT_OUTPUT_VALUE: front_outputs,
+        Column.FRONT_EFFICIENCY: [
+            _ratio_candidates(o, i, _ZERO_INPUT_EFFICIENCY)
+            for o, i in zip(front_outputs, front_inputs)
+        ],
+        Column.BACK_OUTPUT_VALUE: back_outputs,
+        Column.BACK_EFFICIENCY: [
+            _ratio_candidates(o, i, _ZERO_INPUT_EFFICIENCY)
+            for o, i in zip(back_outputs, back_inputs)
+        ],
+        Column.UPGRADES: [
+            _ratio_candidates(bo, fo, None) for bo, fo in zip(back_outputs, front_outputs)
+        ],
+    }
+
+
+def reconcile(
+    filepath: str, columns: Collection[Column] = reconciled_columns
+) -> list[Discrepancy]:
+    """Returns every cell in columns whose sheet value disagrees with the parsed Faces.
+
+    Empty sheet cells are treated as "not precomputed" and never reported.
+    """
+    pairs = _reconciled_rows(filepath)
+    rows = [r for r, _ in pairs]
+    computed = _computed_columns(rows)
+
+    discrepancies: list[Discrepancy] = []
+    for column in columns:
+        sheet_cells = [sv.get(column) for _, sv in pairs]
+        for r, cell, candidates in zip(rows, sheet_cells, computed[column]):
+            sheet = sheet_candidates(cell)
+            if not sheet or _matches(sheet, candidates):
+                continue
+            discrepancies.append(
+                Discrepancy(
+                    filepath=filepath,
+                    card_number=r.card_number,
+                    front_name=r.front_name,
+                    column=column,
+                    sheet=cell,
+                    computed=candidates,
+                )
+            )
+    return discrepancies
+
+
+def reconcile_all(columns: Collection[Column] = reconciled_columns) -> list[Discrepancy]:
+    discrepancies = []
+    for fname in sidcon.parse.filenames:
+        discrepancies.extend(reconcile(fname, columns))
+    return discrepancies
+
+
+def main() -> None:
+    discrepancies = reconcile_all()
+    for d in discrepancies:
+        print(d)
+    print(f"{len(discrepancies)} discrepancies")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import csv
+import functools
+import logging
+from collections.abc import Mapping, Sequence
+
+import sidcon.parse
+import sidcon.technology
+from sidcon.card import ResearchTeam
+from sidcon.converter import PurpleConverter
+from sidcon.row import Row
+from sidcon.technology import Technology
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# Research teams are listed in the card data as cards of this pseudo-faction. all_cards() skips
+# them, since no player holds them.
+research_faction_name = "Research"
+
+
+def research_teams_from_filepath(filepath: str) -> list[ResearchTeam]:
+    teams = []
+    with open(filepath) as csvfile:
+        for d in csv.DictReader(csvfile):
+            r = Row.from_dict(d)
+            if r.faction_name == research_faction_name:
+                teams.append(ResearchTeam.from_row(r))
+    return teams
+
+
+@functools.cache
+def all_research_teams() -> Sequence[ResearchTeam]:
+    teams = []
+    for fname in sidcon.parse.filenames:
+        teams.extend(research_teams_from_filepath(fname))
+    return tuple(teams)
+
+
+def research_costs(
+    teams: Sequence[ResearchTeam] | None = None,
+) -> Mapping[type[Technology], PurpleConverter]:
+    """Returns the cost of researching each technology, including donated technologies."""
+    if teams is None:
+        teams = all_research_teams()
+    costs = {t.technology: t.cost for t in teams if t.technology is not None}
+    for donation, technology in sidcon.technology.donation_to_technology.items():
+        if technology in costs:
+            costs[donation] = costs[technology]
+    return costs
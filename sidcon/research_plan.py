@@ -0,0 +1,293 @@
+import argparse
+import dataclasses
+import logging
+import time
+import typing as typ
+from collections.abc import Collection, Mapping, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.closure
+import sidcon.faction
+import sidcon.parse
+import sidcon.research
+import sidcon.technology
+from sidcon.card import Card, TechnologyCard
+from sidcon.faction import Faction
+from sidcon.tech_upgrade_value import face_value, owner, upgrade_edges
+from sidcon.technology import Era, Technology
+from sidcon.upgrade import FactionSpecificUpgradeCondition
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# A set of technologies is a bitset: bit i is set when technologies[i] is known.
+Known = int
+
+# The era in play at each research step: a game has six rounds, two per era, and plans research at
+# most one technology per step.
+default_schedule: Sequence[Era] = (Era.I, Era.I, Era.II, Era.II, Era.III, Era.III)
+
+
+def even_schedule(steps: int, eras: Sequence[Era] = (Era.I, Era.II, Era.III)) -> list[Era]:
+    """Returns a schedule of steps research steps split as evenly as possible across eras."""
+    return [eras[s * len(eras) // steps] for s in range(steps)]
+
+
+def _subset_sums(a: npt.NDArray) -> npt.NDArray:
+    """Returns, for every bitset k, the sum of a over the subsets of k."""
+    a = a.copy()
+    n = a.size.bit_length() - 1
+    for i in range(n):
+        pairs = a.reshape(-1, 2, 1 << i)
+        pairs[:, 1, :] += pairs[:, 0, :]
+    return a
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Plan(object):
+    technologies: Sequence[type[Technology]]
+    "Technologies in the order to research them."
+
+    score: float
+    "Higher is better: value gained over the schedule less costs for best, -cost for cheapest."
+
+    cost: float
+    value_per_turn: float
+    "The value per turn of everything unlocked once the plan is complete."
+
+
+@typ.final
+class ResearchPlanner(object):
+    """Plans research for a set of owners (factions and species) who share every technology.
+
+    Value is counted per turn: a technology card's front is worth its value for as long as its
+    technology is known, and an upgrade is worth its value gain once every technology it requires
+    is known. Upgrades needing anything other than technologies aren't counted. Planning with
+    several factions' owners models a table, where everyone gets every researched technology.
+
+    values[k] is the value per turn of known set k, for every bitset k over technologies, so any
+    "what is this set worth" query is an array lookup.
+    """
+
+    technologies: typ.Final[Sequence[type[Technology]]]
+    costs: typ.Final[npt.NDArray]
+    values: typ.Final[npt.NDArray]
+
+    _eras: npt.NDArray
+    _top_era_mask: npt.NDArray
+    _popcounts: npt.NDArray
+
+    def __init__(
+        self,
+        cards: Sequence[Card],
+        owners: Collection[str],
+        technologies: Sequence[type[Technology]] | None = None,
+        research_costs: Mapping[type[Technology], typ.Any] | None = None,
+    ) -> None:
+        if research_costs is None:
+            research_costs = sidcon.research.research_costs()
+        if technologies is None:
+            technologies = [
+                t
+                for t in sidcon.technology.name_to_technology.values()
+                if t not in sidcon.technology.donation_to_technology
+            ]
+        self.technologies = sorted(technologies, key=lambda t: (t.era, t.name))
+        if len(self.technologies) > 24:
+            raise ValueError(f"too many technologies to plan over: {len(self.technologies)}")
+        bit = {t: 1 << i for i, t in enumerate(self.technologies)}
+        for donation, technology in sidcon.technology.donation_to_technology.items():
+            if technology in bit:
+                bit[donation] = bit[technology]
+
+        self.costs = np.array(
+            [research_costs[t].min_input_value for t in self.technologies], dtype=np.float64
+        )
+
+        # Each valued thing is a (required technologies, value per turn) pair.
+        weights: dict[Known, float] = dict()
+        for c in cards:
+            if isinstance(c, TechnologyCard) and owner(c) in owners and c.technology in bit:
+                mask = bit[c.technology]
+                weights[mask] = weights.get(mask, 0.0) + face_value(c.front)
+        for e in upgrade_edges(cards):
+            if owner(e.card) not in owners:
+                continue
+            mask = 0
+            if isinstance(e.card, TechnologyCard):
+                # A technology card is only held once its technology is known.
+                mask |= bit.get(e.card.technology, 0)
+            gated = False
+            for u in e.requirements:
+                if isinstance(u, FactionSpecificUpgradeCondition):
+                    gated = True
+                elif isinstance(u, type) and issubclass(u, Technology):
+                    if u not in bit:
+                        gated = True
+                    else:
+                        mask |= bit[u]
+            if gated or mask == 0:
+                continue
+            gain = face_value(e.upgraded) - face_value(e.front)
+            weights[mask] = weights.get(mask, 0.0) + gain
+
+        n = len(self.technologies)
+        states = np.arange(1 << n, dtype=np.int64)
+        point_weights = np.zeros(1 << n, dtype=np.float64)
+        for mask, weight in weights.items():
+            point_weights[mask] += weight
+        self.values = _subset_sums(point_weights)
+
+        self._eras = np.array([int(t.era) for t in self.technologies])
+        # The bits of the latest era present in each state; only those may have been researched
+        # last, since plans research in era order.
+        self._top_era_mask = np.zeros(1 << n, dtype=np.int64)
+        for era in sorted(set(self._eras)):
+            era_mask = sum(1 << i for i in np.flatnonzero(self._eras == era))
+            self._top_era_mask = np.where(states & era_mask, era_mask, self._top_era_mask)
+        self._popcounts = sidcon.closure.popcount(states)
+
+    @classmethod
+    def for_factions(
+        cls, cards: Sequence[Card], factions: Collection[type[Faction]], **kwargs: typ.Any
+    ) -> "ResearchPlanner":
+        owners = {f.faction_name for f in factions} | {
+            sidcon.faction.to_species[f].species_name for f in factions
+        }
+        return cls(cards, owners, **kwargs)
+
+    def known(self, technologies: Collection[type[Technology]]) -> Known:
+        k = 0
+        for t in technologies:
+            t = sidcon.technology.donation_to_technology.get(t, t)
+            k |= 1 << self.technologies.index(t)
+        return k
+
+    def value(self, technologies: Collection[type[Technology]]) -> float:
+        return float(self.values[self.known(technologies)])
+
+    def best(self, schedule: Sequence[Era] = default_schedule, known: Known = 0) -> Plan:
+        """Returns the research order maximizing value over the schedule, net of research costs.
+
+        A technology researched at step s yields its value gain for the len(schedule) - s
+        remaining steps, counting its own. It can only be researched once its era is in play,
+        and plans research in era order. Plans may stop early when nothing left is worth its cost.
+
+        score(K) is the best score of any order researching exactly K, computed for sets in
+        increasing size from score(K) = max over t of score(K - t) + gain(t) - cost(t); each size
+        is one vectorized step over every set of that size.
+        """
+        n = len(self.technologies)
+        turns = len(schedule)
+        steps = min(turns, n - bin(known).count("1"))
+        score = np.full(1 << n, -np.inf)
+        score[known] = 0.0
+        last = np.full(1 << n, -1, dtype=np.int8)
+
+        # Only supersets of known are reachable.
+        candidates = np.flatnonzero((np.arange(1 << n) & known) == known)
+        base = bin(known).count("1")
+        popcounts = self._popcounts[candidates]
+        for step in range(1, steps + 1):
+            layer = candidates[popcounts == base + step]
+            remaining_turns = turns - step + 1
+            best = np.full(len(layer), -np.inf)
+            best_last = np.full(len(layer), -1, dtype=np.int8)
+            # Known technologies weren't researched in the plan, so they don't bound its eras.
+            top = self._top_era_mask[layer & ~known]
+            for i in range(n):
+                if self._eras[i] > schedule[step - 1]:
+                    continue
+                b = 1 << i
+                # The last technology researched must be new and of the latest era researched.
+                positions = np.flatnonzero((layer & b & top) != 0)
+                if len(positions) == 0:
+                    continue
+                states = layer[positions]
+                previous = states ^ b
+                gain = (self.values[states] - self.values[previous]) * remaining_turns
+                candidate = score[previous] + gain - self.costs[i]
+                better = candidate > best[positions]
+                best[positions[better]] = candidate[better]
+                best_last[positions[better]] = i
+            score[layer] = best
+            last[layer] = best_last
+
+        end = int(np.argmax(score))
+        order: list[type[Technology]] = []
+        k = end
+        while k != known:
+            i = int(last[k])
+            order.append(self.technologies[i])
+            k ^= 1 << i
+        order.reverse()
+        return Plan(
+            technologies=order,
+            score=float(score[end]),
+            cost=float(sum(self.costs[self.technologies.index(t)] for t in order)),
+            value_per_turn=float(self.values[end]),
+        )
+
+    def cheapest(self, value_per_turn: float, known: Known = 0) -> Plan | None:
+        """Returns the cheapest set of technologies reaching value_per_turn, in era order, or
+        None if no set does."""
+        n = len(self.technologies)
+        states = np.arange(1 << n)
+        point_costs = np.zeros(1 << n)
+        for i in range(n):
+            if not known >> i & 1:
+                point_costs[1 << i] = self.costs[i]
+        costs = _subset_sums(point_costs)
+        reachable = ((states & known) == known) & (self.values >= value_per_turn)
+        if not reachable.any():
+            return None
+        costs[~reachable] = np.inf
+        # Break ties between equally cheap sets by value.
+        cheapest = np.flatnonzero(costs == costs.min())
+        end = int(cheapest[np.argmax(self.values[cheapest])])
+        technologies = [
+            t for i, t in enumerate(self.technologies) if end >> i & 1 and not known >> i & 1
+        ]
+        return Plan(
+            technologies=technologies,
+            score=-float(costs[end]),
+            cost=float(costs[end]),
+            value_per_turn=float(self.values[end]),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "factions",
+        nargs="+",
+        help="faction names; several factions plan together, sharing technologies",
+    )
+    parser.add_argument(
+        "-t",
+        "--steps",
+        type=int,
+        help="research steps, spread evenly across eras; default two per era",
+    )
+    args = parser.parse_args()
+
+    factions = [sidcon.faction.name_to_faction[f] for f in args.factions]
+    start = time.perf_counter()
+    planner = ResearchPlanner.for_factions(sidcon.parse.all_cards(), factions)
+    schedule = default_schedule if args.steps is None else even_schedule(args.steps)
+    plan = planner.best(schedule)
+    elapsed = time.perf_counter() - start
+
+    for t in plan.technologies:
+        print(f"  {t.name} (era {int(t.era)})")
+    print(
+        f"score {plan.score:g}, cost {plan.cost:g}, {plan.value_per_turn:g} per turn after; "
+        f"planned in {elapsed:.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
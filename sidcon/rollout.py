@@ -0,0 +1,246 @@
+import argparse
+import concurrent.futures
+import dataclasses
+import json
+import logging
+import sys
+import typing as typ
+from collections.abc import Iterator, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.closure
+import sidcon.faction
+import sidcon.parse
+from sidcon.card import Card, DualFacedColonyCard, TechnologyCard
+from sidcon.faction import Faction
+from sidcon.game import Catalogue, Table, resources
+from sidcon.unit import VictoryPoint
+from sidcon.upgrade import FactionSpecificUpgradeCondition
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+default_turns = 6
+default_chunk = 500
+
+technology_bits: npt.NDArray = np.array(
+    [
+        sidcon.closure.mask([k])
+        for k in sidcon.closure.requirement_keys
+        if not isinstance(k, FactionSpecificUpgradeCondition)
+    ],
+    dtype=np.int64,
+)
+
+
+def market(cards: Sequence[Card], factions: Sequence[type[Faction]]) -> list[Card]:
+    """Returns the cards players can come by in a game: the technology cards of the species in
+    play, and the colonies."""
+    return [
+        c
+        for c in cards
+        if isinstance(c, DualFacedColonyCard)
+        or (isinstance(c, TechnologyCard) and any(issubclass(f, c.species) for f in factions))
+    ]
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Outcomes(object):
+    """Totals over played games, per seat: victory points (and their squares, for variances),
+    technologies known, value traded away by donation outputs, and wins."""
+
+    factions: tuple[type[Faction], ...]
+    games: int
+    victory_points: npt.NDArray
+    victory_points_squared: npt.NDArray
+    technologies: npt.NDArray
+    traded: npt.NDArray
+    wins: npt.NDArray
+
+    @classmethod
+    def from_table(cls, table: Table) -> "Outcomes":
+        vp = table.inventory[..., resources.index(VictoryPoint)].astype(np.float64)
+        return cls(
+            factions=tuple(table.factions),
+            games=table.games,
+            victory_points=vp.sum(axis=0),
+            victory_points_squared=(vp**2).sum(axis=0),
+            technologies=sidcon.closure.popcount(table.known).sum(axis=0).astype(np.float64),
+            traded=table.donated.sum(axis=0),
+            wins=np.bincount(table.standings()[:, 0], minlength=table.players),
+        )
+
+    def __add__(self, other: "Outcomes") -> "Outcomes":
+        if self.factions != other.factions:
+            raise ValueError("can't add outcomes of different tables")
+        return Outcomes(
+            factions=self.factions,
+            games=self.games + other.games,
+            victory_points=self.victory_points + other.victory_points,
+            victory_points_squared=self.victory_points_squared + other.victory_points_squared,
+            technologies=self.technologies + other.technologies,
+            traded=self.traded + other.traded,
+            wins=self.wins + other.wins,
+        )
+
+    def to_json(self) -> dict[str, typ.Any]:
+        mean = self.victory_points / self.games
+        return {
+            "games": self.games,
+            "factions": [
+                {
+                    "faction": f.faction_name,
+                    "victory_points": float(mean[p]),
+                    "victory_points_std": float(
+                        np.sqrt(max(self.victory_points_squared[p] / self.games - mean[p] ** 2, 0))
+                    ),
+                    "technologies": float(self.technologies[p] / self.games),
+                    "traded": float(self.traded[p] / self.games),
+                    "win_rate": float(self.wins[p] / self.games),
+                }
+                for p, f in enumerate(self.factions)
+            ],
+        }
+
+
+def play_table(
+    catalogue: Catalogue,
+    factions: Sequence[type[Faction]],
+    games: int,
+    turns: int,
+    rng: np.random.Generator,
+) -> Table:
+    """Plays games randomized games at once and returns the table: every turn, each player
+    learns a random technology and takes a random card from the market, then upgrades and runs
+    their economy."""
+    fronts = np.array([catalogue.front(c) for c in market(catalogue.cards, factions)])
+    table = Table(catalogue, factions, games=games)
+    for _ in range(turns):
+        shape = (games, len(factions))
+        table.known |= technology_bits[rng.integers(len(technology_bits), size=shape)]
+        table.deal(fronts[rng.integers(len(fronts), size=shape)])
+        table.step()
+    return table
+
+
+def play(
+    catalogue: Catalogue,
+    factions: Sequence[type[Faction]],
+    games: int,
+    turns: int,
+    rng: np.random.Generator,
+) -> Outcomes:
+    """Plays games randomized games at once, as play_table does, and returns their outcomes."""
+    return Outcomes.from_table(play_table(catalogue, factions, games, turns, rng))
+
+
+# Set in each worker by _initialize; with the fork start method the catalogue is inherited, not
+# copied, so every worker reads the parent's.
+_catalogue: Catalogue | None = None
+
+
+def _initialize(catalogue: Catalogue) -> None:
+    global _catalogue
+    _catalogue = catalogue
+
+
+def _play_chunk(
+    factions: Sequence[type[Faction]], games: int, turns: int, seed: np.random.SeedSequence
+) -> Outcomes:
+    assert _catalogue is not None
+    return play(_catalogue, factions, games, turns, np.random.default_rng(seed))
+
+
+@typ.final
+class RolloutRunner(object):
+    """Plays games in chunks across a process pool.
+
+    Each chunk's seed is spawned from seed by its position, so results don't depend on which
+    worker plays which chunk, or on how many workers there are.
+    """
+
+    catalogue: typ.Final[Catalogue]
+    factions: typ.Final[Sequence[type[Faction]]]
+    turns: typ.Final[int]
+    chunk: typ.Final[int]
+    seed: typ.Final[int]
+    workers: typ.Final[int | None]
+
+    def __init__(
+        self,
+        catalogue: Catalogue,
+        factions: Sequence[type[Faction]],
+        turns: int = default_turns,
+        chunk: int = default_chunk,
+        seed: int = 0,
+        workers: int | None = None,
+    ) -> None:
+        self.catalogue = catalogue
+        self.factions = factions
+        self.turns = turns
+        self.chunk = chunk
+        self.seed = seed
+        self.workers = workers
+
+    def _chunks(self, games: int) -> list[tuple[int, np.random.SeedSequence]]:
+        sizes = [min(self.chunk, games - start) for start in range(0, games, self.chunk)]
+        return list(zip(sizes, np.random.SeedSequence(self.seed).spawn(len(sizes))))
+
+    def run(self, games: int) -> Iterator[Outcomes]:
+        """Yields the outcomes of every game played so far, each time a chunk finishes; the last
+        covers all games."""
+        total: Outcomes | None = None
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_initialize, initargs=(self.catalogue,)
+        ) as executor:
+            futures = [
+                executor.submit(_play_chunk, self.factions, size, self.turns, seed)
+                for size, seed in self._chunks(games)
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                outcomes = future.result()
+                total = outcomes if total is None else total + outcomes
+                yield total
+
+    def run_serially(self, games: int) -> Outcomes:
+        """Returns what the last outcomes run yields, playing every chunk in this process."""
+        total: Outcomes | None = None
+        for size, seed in self._chunks(games):
+            outcomes = play(
+                self.catalogue, self.factions, size, self.turns, np.random.default_rng(seed)
+            )
+            total = outcomes if total is None else total + outcomes
+        assert total is not None
+        return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("factions", nargs="+", help="faction names, one per player")
+    parser.add_argument("-g", "--games", type=int, default=10000)
+    parser.add_argument("-t", "--turns", type=int, default=default_turns)
+    parser.add_argument("-c", "--chunk", type=int, default=default_chunk)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    runner = RolloutRunner(
+        Catalogue(sidcon.parse.all_cards()),
+        [sidcon.faction.name_to_faction[f] for f in args.factions],
+        turns=args.turns,
+        chunk=args.chunk,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    outcomes = None
+    for outcomes in runner.run(args.games):
+        print(f"{outcomes.games} games played", file=sys.stderr)
+    if outcomes is not None:
+        print(json.dumps(outcomes.to_json(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
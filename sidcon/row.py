@@ -20,12 +20,12 @@ class Column(enum.Enum):
     UPGRADE3 = "Upgrade3"  # bifurcation only
     BACK_NAME = "Back Name"
     BACK_CONVERTER = "Back Factory"
-    INPUT_VALUE = "Input"  # unused
-    FRONT_OUTPUT_VALUE = "Front Output"  # unused
-    FRONT_EFFICIENCY = "Front Efficiency"  # unused
-    BACK_OUTPUT_VALUE = "Back Output"  # unused
-    BACK_EFFICIENCY = "Back Efficiency"  # unused
-    UPGRADES = "Upgrades"  # unused
+    INPUT_VALUE = "Input"  # precomputed; see SheetValues
+    FRONT_OUTPUT_VALUE = "Front Output"  # precomputed; see SheetValues
+    FRONT_EFFICIENCY = "Front Efficiency"  # precomputed; see SheetValues
+    BACK_OUTPUT_VALUE = "Back Output"  # precomputed; see SheetValues
+    BACK_EFFICIENCY = "Back Efficiency"  # precomputed; see SheetValues
+    UPGRADES = "Upgrades"  # precomputed; see SheetValues
 
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
@@ -112,3 +112,43 @@ class Row(object):
     def _strings_from_string(s: str) -> list[str]:
         strings = s.split(",")
         return list(filter(lambda s: s != "", strings))
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class SheetValues(object):
+    """The spreadsheet's own precomputed values for a row, as raw cell strings.
+
+    Cells may be empty, or may list alternatives such as "(1.5 or 4)" for converters with
+    multiple inputs.
+    """
+
+    input_value: str
+    front_output_value: str
+    front_efficiency: str
+    back_output_value: str
+    back_efficiency: str
+    upgrades: str
+
+    @classmethod
+    def from_dict(cls, d: dict[str, str]) -> "SheetValues":
+        return cls(
+            input_value=d[Column.INPUT_VALUE.value],
+            front_output_value=d[Column.FRONT_OUTPUT_VALUE.value],
+            front_efficiency=d[Column.FRONT_EFFICIENCY.value],
+            back_output_value=d[Column.BACK_OUTPUT_VALUE.value],
+            back_efficiency=d[Column.BACK_EFFICIENCY.value],
+            upgrades=d[Column.UPGRADES.value],
+        )
+
+    def get(self, column: Column) -> str:
+        return getattr(self, _sheet_value_attributes[column])
+
+
+_sheet_value_attributes: dict[Column, str] = {
+    Column.INPUT_VALUE: "input_value",
+    Column.FRONT_OUTPUT_VALUE: "front_output_value",
+    Column.FRONT_EFFICIENCY: "front_efficiency",
+    Column.BACK_OUTPUT_VALUE: "back_output_value",
+    Column.BACK_EFFICIENCY: "back_efficiency",
+    Column.UPGRADES: "upgrades",
+}
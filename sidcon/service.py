@@ -0,0 +1,363 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+import typing as typ
+import urllib.parse
+from collections.abc import Callable, Collection, Mapping, Sequence
+
+import sidcon.starting_economy_value
+from sidcon.batch import JSON, QueryError, required
+from sidcon.card import Card
+from sidcon.converter import Converter, UniqueOutput
+from sidcon.face import Face
+from sidcon.feature import Feature, UniqueFeature
+from sidcon.index import CardIndex, faction_from_string
+from sidcon.technology import Technology
+from sidcon.upgrade import FactionSpecificUpgradeCondition, Upgrade
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# Queries are JSON objects with an "op" and that op's parameters, e.g.
+#
+#   {"op": "card", "name": "Antimatter Power"}
+#   {"op": "tableau", "faction": "Caylion Plutocracy"}
+#   {"op": "upgrade_targets", "technology": "Antimatter Power"}
+#   {"op": "values", "name": "Antimatter Power"}
+#   {"op": "faction_values", "undesirable_limit": 3, "species_in_play": ["Caylion", "Zeth"]}
+#
+# Over HTTP, POST a query or a JSON array of queries (a batch) to "/", or GET "/<op>?<params>";
+# repeated GET parameters become lists.
+
+default_host = "127.0.0.1"
+default_port = 8631
+
+_MAX_BODY_BYTES = 1 << 20
+
+_STATUS_REASONS: Mapping[int, str] = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+def _units_json(units: Mapping) -> JSON:
+    return {u.__name__: n for u, n in units.items()}
+
+
+def _side_json(side: typ.Any) -> JSON:
+    if isinstance(side, UniqueOutput):
+        return side.value
+    if isinstance(side, Sequence):
+        return [_side_json(s) for s in side]
+    return _units_json(side)
+
+
+def _values_json(c: Converter) -> JSON:
+    return {
+        "min_input_value": c.min_input_value,
+        "max_input_value": c.max_input_value,
+        "min_output_value": c.min_output_value,
+        "max_output_value": c.max_output_value,
+    }
+
+
+def _converter_json(c: Converter) -> JSON:
+    return {
+        "converter": type(c).__name__,
+        "inputs": _side_json(c.inputs),
+        "outputs": _side_json(c.outputs),
+        **_values_json(c),
+    }
+
+
+def _feature_json(f: Feature) -> JSON:
+    if isinstance(f, Converter):
+        return _converter_json(f)
+    if isinstance(f, UniqueFeature):
+        return f.value
+    return _units_json(f)
+
+
+def _upgrade_json(u: Upgrade) -> JSON:
+    if isinstance(u, FactionSpecificUpgradeCondition):
+        return u.value
+    if isinstance(u, Converter):
+        return _converter_json(u)
+    return u.name
+
+
+def _face_json(f: Face) -> JSON:
+    return {
+        "name": f.name,
+        "features": [_feature_json(feature) for feature in f.features],
+        "upgrades": [
+            {
+                "era": int(era) if era is not None else None,
+                "requires": [_upgrade_json(u) for u in upgrades],
+                "face": _face_json(upgraded),
+            }
+            for era, upgrades, upgraded in f.upgrades
+        ],
+    }
+
+
+def _card_json(c: Card) -> JSON:
+    species = getattr(c, "species", None)
+    faction = getattr(c, "faction", None)
+    return {
+        "name": c.name,
+        "type": type(c).__name__,
+        "species": species.species_name if species is not None else None,
+        "faction": faction.faction_name if faction is not None else None,
+        "front": _face_json(c.front),
+    }
+
+
+def _face_values_json(f: Face) -> JSON:
+    return {
+        "name": f.name,
+        "converters": [_values_json(c) for c in f.features if isinstance(c, Converter)],
+        "upgrades": [_face_values_json(upgraded) for _, _, upgraded in f.upgrades],
+    }
+
+
+def _scalar(value: JSON) -> JSON:
+    # GET parameters always arrive as lists.
+    if isinstance(value, list) and len(value) == 1:
+        return value[0]
+    return value
+
+
+def _string(query: Mapping[str, JSON], key: str) -> str:
+    value = _scalar(required(query, key))
+    if not isinstance(value, str):
+        raise QueryError(f"parameter '{key}' must be a string")
+    return value
+
+
+def _integer(query: Mapping[str, JSON], key: str) -> int:
+    value = _scalar(required(query, key))
+    # GET parameters arrive as strings.
+    if isinstance(value, str) and value.strip().lstrip("+-").isdigit():
+        return int(value)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise QueryError(f"parameter '{key}' must be an integer")
+    return value
+
+
+def _strings(query: Mapping[str, JSON], key: str, default: Collection[str]) -> Collection[str]:
+    if key not in query:
+        return default
+    value = query[key]
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise QueryError(f"parameter '{key}' must be a string or a list of strings")
+    return value
+
+
+@typ.final
+class Service(object):
+    """Answers queries against a CardIndex. Transport-independent; see serve for HTTP."""
+
+    index: typ.Final[CardIndex]
+
+    _ops: Mapping[str, Callable[[Mapping[str, JSON]], JSON]]
+
+    def __init__(self, index: CardIndex) -> None:
+        self.index = index
+        self._ops = {
+            "card": self.card,
+            "tableau": self.tableau,
+            "upgrade_targets": self.upgrade_targets,
+            "values": self.values,
+            "faction_values": self.faction_values,
+        }
+
+    def handle(self, query: JSON) -> JSON:
+        """Answers one query, reporting bad queries as {"error": ...} rather than raising.
+
+        Parameters are checked before use, so anything else raised is a bug.
+        """
+        try:
+            if not isinstance(query, Mapping):
+                raise QueryError("query must be a JSON object")
+            op = _string(query, "op")
+            if op not in self._ops:
+                raise QueryError(f"unknown op '{op}'")
+            return self._ops[op](query)
+        except (QueryError, ValueError) as e:
+            return {"error": str(e)}
+
+    def handle_batch(self, queries: Sequence[JSON]) -> list[JSON]:
+        return [self.handle(q) for q in queries]
+
+    def _named(self, query: Mapping[str, JSON]) -> Sequence[Card]:
+        name = _string(query, "name")
+        cards = self.index.named(name)
+        if not cards:
+            raise QueryError(f"no card named '{name}'")
+        return cards
+
+    def card(self, query: Mapping[str, JSON]) -> JSON:
+        return {"cards": [_card_json(c) for c in self._named(query)]}
+
+    def tableau(self, query: Mapping[str, JSON]) -> JSON:
+        faction = faction_from_string(_string(query, "faction"))
+        return {
+            "faction": faction.faction_name,
+            "cards": [_card_json(c) for c in self.index.tableau(faction)],
+        }
+
+    def upgrade_targets(self, query: Mapping[str, JSON]) -> JSON:
+        technology = Technology.from_string(_string(query, "technology"))
+        return {
+            "technology": technology.name,
+            "cards": [c.name for c in self.index.upgrade_targets(technology)],
+        }
+
+    def values(self, query: Mapping[str, JSON]) -> JSON:
+        return {"cards": [_face_values_json(c.front) for c in self._named(query)]}
+
+    def faction_values(self, query: Mapping[str, JSON]) -> JSON:
+        undesirable_limit = _integer(query, "undesirable_limit")
+        species_in_play = _strings(
+            query, "species_in_play", sidcon.starting_economy_value.ALL_SPECIES.keys()
+        )
+        converters = self.index.converter_by_faction(undesirable_limit, species_in_play)
+        return {
+            "factions": {
+                faction.faction_name: _values_json(converter)
+                for faction, converter in converters.items()
+            }
+        }
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> tuple[str, str, Mapping[str, str], bytes] | None:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    headers: dict[str, str] = dict()
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0"))
+    if length > _MAX_BODY_BYTES:
+        raise QueryError("request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, target, headers, body
+
+
+def _response(status: int, payload: JSON, keep_alive: bool) -> bytes:
+    body = json.dumps(payload).encode()
+    head = "\r\n".join(
+        [
+            f"HTTP/1.1 {status} {_STATUS_REASONS[status]}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            "",
+            "",
+        ]
+    )
+    return head.encode("latin-1") + body
+
+
+def _route(service: Service, method: str, target: str, body: bytes) -> tuple[int, JSON]:
+    url = urllib.parse.urlsplit(target)
+    if method == "POST" and url.path == "/":
+        try:
+            query = json.loads(body)
+        except ValueError as e:
+            return 400, {"error": f"invalid JSON: {e}"}
+        if isinstance(query, list):
+            return 200, service.handle_batch(query)
+        return 200, service.handle(query)
+    if method == "GET" and url.path.count("/") == 1 and url.path != "/":
+        params: dict[str, JSON] = dict(urllib.parse.parse_qs(url.query))
+        params["op"] = url.path[1:]
+        result = service.handle(params)
+        return (404 if "unknown op" in result.get("error", "") else 200), result
+    if url.path == "/" or url.path.count("/") == 1:
+        return 405, {"error": f"method {method} not allowed"}
+    return 404, {"error": f"no such path '{url.path}'"}
+
+
+async def _serve_connection(
+    service: Service, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except QueryError as e:
+                writer.write(_response(413, {"error": str(e)}, keep_alive=False))
+                break
+            except (ValueError, asyncio.IncompleteReadError):
+                writer.write(_response(400, {"error": "malformed request"}, keep_alive=False))
+                break
+            if request is None:
+                break
+            method, target, headers, body = request
+            keep_alive = headers.get("connection", "").lower() != "close"
+
+            start = time.perf_counter()
+            try:
+                status, payload = _route(service, method, target, body)
+            except Exception:
+                logger.exception(f"{method} {target} failed")
+                status, payload = 500, {"error": "internal error"}
+            logger.info(f"{method} {target} {status} {(time.perf_counter() - start) * 1e6:.0f}us")
+
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(
+    service: Service, host: str = default_host, port: int = default_port
+) -> asyncio.Server:
+    """Starts serving service over HTTP. Queries are answered on the event loop thread: each is
+    a few dictionary lookups, so there's nothing to gain from handing them to workers."""
+    return await asyncio.start_server(
+        lambda r, w: _serve_connection(service, r, w), host=host, port=port
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=default_host)
+    parser.add_argument("--port", type=int, default=default_port)
+    args = parser.parse_args()
+
+    service = Service(CardIndex.from_files())
+
+    async def run() -> None:
+        server = await serve(service, args.host, args.port)
+        print(f"Serving {len(service.index.cards)} cards on http://{args.host}:{args.port}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,12 @@ import argparse
 import functools
 import itertools
 import logging
+import typing as typ
 from collections import defaultdict
-from collections.abc import Sequence
+from collections.abc import Collection, Mapping, Sequence
 from pprint import pprint  # noqa
 
+import sidcon.batch
 import sidcon.parse
 from sidcon.card import Card, KtDualCard, Starting, StartingCard, UndesirableCard
 from sidcon.converter import Converter
@@ -42,7 +44,7 @@ ALL_SPECIES = {
 
 def main() -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument("undesirable_limit", type=int)
+    parser.add_argument("undesirable_limit", type=int, nargs="?")
     # TODO: Add num_fleets param
     parser.add_argument(
         "-s",
@@ -50,18 +52,25 @@ def main() -> None:
         nargs="+",
         default=ALL_SPECIES.keys(),
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="read JSON query objects from stdin, one per line; see batch_answerer",
+    )
     args = parser.parse_args()
+    if not args.batch and args.undesirable_limit is None:
+        parser.error("undesirable_limit is required unless --batch is given")
 
     all_cards = sidcon.parse.all_cards()
 
-    cards_by_faction = get_cards_by_faction(all_cards, args)
+    if args.batch:
+        sidcon.batch.run(batch_answerer(all_cards))
+        return
 
-    overall_converter_by_faction: dict[type[Faction], Converter] = dict()
-    for faction, cards in cards_by_faction.items():
-        features = list(itertools.chain.from_iterable(c.front.features for c in cards))
-        converters = [f for f in features if isinstance(f, Converter)]
-        converter = functools.reduce(Converter.merged, converters)
-        overall_converter_by_faction[faction] = converter
+    cards_by_faction = get_cards_by_faction(
+        all_cards, args.undesirable_limit, args.species_in_play
+    )
+    overall_converter_by_faction = get_overall_converter_by_faction(cards_by_faction)
 
     for faction, converter in overall_converter_by_faction.items():
         print(
@@ -70,9 +79,58 @@ def main() -> None:
         )
 
 
+def batch_answerer(
+    all_cards: Sequence[Card | KtDualCard],
+) -> typ.Callable[[Mapping[str, typ.Any]], dict[str, typ.Any]]:
+    """Returns a function answering batch queries against all_cards.
+
+    A query is an object like {"undesirable_limit": 3, "species_in_play": ["Caylion", "Zeth"],
+    "factions": ["Caylion Plutocracy"]}, where only undesirable_limit is required. Aggregates are
+    cached per (undesirable_limit, species_in_play), so repeated scenarios are free.
+    """
+
+    @functools.lru_cache(maxsize=None)
+    def converters(
+        undesirable_limit: int, species_in_play: frozenset[str]
+    ) -> dict[type[Faction], Converter]:
+        cards_by_faction = get_cards_by_faction(all_cards, undesirable_limit, species_in_play)
+        return get_overall_converter_by_faction(cards_by_faction)
+
+    def answer(query: Mapping[str, typ.Any]) -> dict[str, typ.Any]:
+        undesirable_limit = sidcon.batch.integer(query, "undesirable_limit")
+        species = sidcon.batch.names(query, "species_in_play", ALL_SPECIES)
+        species_in_play = frozenset(ALL_SPECIES if species is None else species)
+        factions = sidcon.batch.factions_filter(query)
+        return {
+            "factions": {
+                faction.faction_name: {
+                    "max_input_value": converter.max_input_value,
+                    "output_value": converter.output_value,
+                }
+                for faction, converter in converters(undesirable_limit, species_in_play).items()
+                if factions is None or faction in factions
+            }
+        }
+
+    return answer
+
+
+def get_overall_converter_by_faction(
+    cards_by_faction: Mapping[type[Faction], Sequence[Card]]
+) -> dict[type[Faction], Converter]:
+    overall_converter_by_faction: dict[type[Faction], Converter] = dict()
+    for faction, cards in cards_by_faction.items():
+        features = list(itertools.chain.from_iterable(c.front.features for c in cards))
+        converters = [f for f in features if isinstance(f, Converter)]
+        converter = functools.reduce(Converter.merged, converters)
+        overall_converter_by_faction[faction] = converter
+    return overall_converter_by_faction
+
+
 def get_cards_by_faction(
     all_cards: Sequence[Card | KtDualCard],
-    args: argparse.Namespace,
+    undesirable_limit: int,
+    species_in_play: Collection[str] = ALL_SPECIES.keys(),
 ) -> dict[type[Faction], list[StartingCard | UndesirableCard | KtDualCard]]:
     cards_by_faction: defaultdict[
         type[Faction], list[StartingCard | UndesirableCard | KtDualCard]
@@ -82,7 +140,9 @@ def get_cards_by_faction(
     for c in starting_cards:
         cards_by_faction[c.faction].append(c)
 
-    used_undesirable_cards = get_used_undesirable_cards(all_cards, args)
+    used_undesirable_cards = get_used_undesirable_cards(
+        all_cards, undesirable_limit, species_in_play
+    )
     cards_by_faction[CharitySyndicate].extend(used_undesirable_cards)
 
     return cards_by_faction
@@ -90,9 +150,10 @@ def get_cards_by_faction(
 
 def get_used_undesirable_cards(
     all_cards: Sequence[Card | KtDualCard],
-    args: argparse.Namespace,
+    undesirable_limit: int,
+    species_in_play: Collection[str] = ALL_SPECIES.keys(),
 ) -> list[UndesirableCard]:
-    species_in_play = [v for k, v in ALL_SPECIES.items() if k in args.species_in_play]
+    species = [v for k, v in ALL_SPECIES.items() if k in species_in_play]
 
     undesirable_cards = sorted(
         [c for c in all_cards if isinstance(c, UndesirableCard)],
@@ -101,9 +162,9 @@ def get_used_undesirable_cards(
     )
     used_undesirable_cards: list[UndesirableCard] = []
     for c in undesirable_cards:
-        if len(used_undesirable_cards) >= args.undesirable_limit:
+        if len(used_undesirable_cards) >= undesirable_limit:
             break
-        if c.species in species_in_play:
+        if c.species in species:
             used_undesirable_cards.append(c)
     return used_undesirable_cards
 
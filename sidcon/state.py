@@ -0,0 +1,228 @@
+import argparse
+import dataclasses
+import logging
+import time
+import typing as typ
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.faction
+import sidcon.parse
+from sidcon.card import Card
+from sidcon.faction import Faction
+from sidcon.game import (
+    Catalogue,
+    Table,
+    colony_group,
+    groups,
+    resource_count,
+    resource_values,
+)
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+def _frozen(a: npt.NDArray) -> npt.NDArray:
+    a.flags.writeable = False
+    return a
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class PlayerState(object):
+    """One player's part of a game, immutable.
+
+    inventory is a read-only array over sidcon.game.resources and tableau a tuple of face ids
+    into a Catalogue, so a changed PlayerState shares everything it doesn't change with the one
+    it came from.
+    """
+
+    faction: type[Faction]
+    inventory: npt.NDArray
+    tableau: tuple[int, ...]
+    known: int = 0
+    donated: float = 0.0
+
+    @property
+    def value(self) -> float:
+        return float(self.inventory @ resource_values)
+
+    def affordable(self, need: npt.NDArray) -> bool:
+        left = self.inventory - need[:resource_count]
+        if (left < 0).any():
+            return False
+        return all(
+            left[members].sum() >= need[resource_count + g] for g, members in enumerate(groups)
+        )
+
+    def paid(self, need: npt.NDArray) -> "PlayerState":
+        """Returns the state after paying need, which must be affordable; see Table._pay."""
+        inventory = self.inventory - need[:resource_count]
+        for g, members in enumerate(groups):
+            for _ in range(need[resource_count + g]):
+                inventory[members[np.argmax(inventory[members])]] -= 1
+        return dataclasses.replace(self, inventory=_frozen(inventory))
+
+    def gained(self, gain: npt.NDArray, donated: float = 0.0) -> "PlayerState":
+        """Returns the state after gaining gain; see Table._gain."""
+        inventory = self.inventory + gain[:resource_count]
+        for g, members in enumerate(groups):
+            for _ in range(gain[resource_count + g]):
+                inventory[members[np.argmin(inventory[members])]] += 1
+        colonies = groups[colony_group]
+        while inventory[colonies].sum() > self.faction.colony_support:
+            inventory[colonies[np.argmax(inventory[colonies])]] -= 1
+        return dataclasses.replace(
+            self, inventory=_frozen(inventory), donated=self.donated + donated
+        )
+
+    def with_card(self, face: int) -> "PlayerState":
+        return dataclasses.replace(self, tableau=self.tableau + (face,))
+
+    def with_face(self, slot: int, face: int) -> "PlayerState":
+        tableau = list(self.tableau)
+        tableau[slot] = face
+        return dataclasses.replace(self, tableau=tuple(tableau))
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class GameState(object):
+    """One game, immutable: a tuple of PlayerStates.
+
+    Branching replaces one player and shares the rest, so it costs what changed rather than the
+    whole game; undoing is going back to a state still held, as a search does by returning.
+    """
+
+    players: tuple[PlayerState, ...]
+    turn: int = 0
+
+    @classmethod
+    def from_table(cls, table: Table, game: int = 0) -> "GameState":
+        return cls(
+            players=tuple(
+                PlayerState(
+                    faction=f,
+                    inventory=_frozen(table.inventory[game, p].copy()),
+                    tableau=tuple(int(x) for x in table.tableau[game, p] if x != 0),
+                    known=int(table.known[game, p]),
+                    donated=float(table.donated[game, p]),
+                )
+                for p, f in enumerate(table.factions)
+            ),
+            turn=table.turn,
+        )
+
+    def replace(self, player: int, state: PlayerState) -> "GameState":
+        players = list(self.players)
+        players[player] = state
+        return dataclasses.replace(self, players=tuple(players))
+
+    def acquire(self, catalogue: Catalogue, player: int, card: Card) -> "GameState":
+        return self.replace(player, self.players[player].with_card(catalogue.front(card)))
+
+
+# An economy-phase decision: (slot, converter, input alternative), the alternative None when the
+# converter isn't run.
+Decision = tuple[int, int, int | None]
+
+
+def converters(catalogue: Catalogue, state: PlayerState) -> list[tuple[int, int]]:
+    """Returns the (slot, converter) of every converter on state's tableau that could ever run,
+    in tableau order."""
+    return [
+        (slot, j)
+        for slot, face in enumerate(state.tableau)
+        for j in range(catalogue.inputs.shape[1])
+        if catalogue.input_ok[face, j].any()
+    ]
+
+
+def run(catalogue: Catalogue, state: PlayerState, face: int, j: int, k: int) -> PlayerState:
+    """Returns state after running converter j of face with input alternative k."""
+    return state.paid(catalogue.inputs[face, j, k]).gained(
+        catalogue.outputs[face, j], float(catalogue.donated[face, j])
+    )
+
+
+@typ.final
+class EconomySearch(object):
+    """Depth-limited search over one player's economy-phase decisions: for each converter in
+    tableau order, which affordable input alternative to run it with, or not to run it.
+
+    The first depth converters are searched exhaustively; the rest run greedily, with their first
+    affordable alternative, as Table.economy runs them. States are scored by inventory value.
+    """
+
+    catalogue: typ.Final[Catalogue]
+    depth: typ.Final[int]
+    nodes: int
+
+    def __init__(self, catalogue: Catalogue, depth: int) -> None:
+        self.catalogue = catalogue
+        self.depth = depth
+        self.nodes = 0
+
+    def _greedy(self, state: PlayerState, remaining: Sequence[tuple[int, int]]) -> PlayerState:
+        c = self.catalogue
+        for slot, j in remaining:
+            face = state.tableau[slot]
+            for k in np.flatnonzero(c.input_ok[face, j]):
+                if state.affordable(c.inputs[face, j, k]):
+                    state = run(c, state, face, j, int(k))
+                    break
+        return state
+
+    def _search(
+        self, state: PlayerState, remaining: Sequence[tuple[int, int]], depth: int
+    ) -> tuple[float, list[Decision]]:
+        self.nodes += 1
+        if depth == 0 or not remaining:
+            return self._greedy(state, remaining).value, []
+
+        c = self.catalogue
+        (slot, j), rest = remaining[0], remaining[1:]
+        face = state.tableau[slot]
+        best = -np.inf
+        line: list[Decision] = []
+        decision: Decision = (slot, j, None)
+        for k in np.flatnonzero(c.input_ok[face, j]):
+            if not state.affordable(c.inputs[face, j, k]):
+                continue
+            value, after = self._search(run(c, state, face, j, int(k)), rest, depth - 1)
+            if value > best:
+                best, line, decision = value, after, (slot, j, int(k))
+        value, after = self._search(state, rest, depth - 1)
+        if value > best:
+            best, line, decision = value, after, (slot, j, None)
+        return best, [decision, *line]
+
+    def best(self, state: GameState, player: int) -> tuple[float, list[Decision]]:
+        """Returns the best inventory value player can end the economy phase with, and the
+        decisions for the searched converters that reach it."""
+        p = state.players[player]
+        return self._search(p, converters(self.catalogue, p), self.depth)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("factions", nargs="+", help="faction names, one per player")
+    parser.add_argument("-d", "--depth", type=int, default=8)
+    args = parser.parse_args()
+
+    factions = [sidcon.faction.name_to_faction[f] for f in args.factions]
+    catalogue = Catalogue(sidcon.parse.all_cards())
+    state = GameState.from_table(Table(catalogue, factions))
+
+    search = EconomySearch(catalogue, args.depth)
+    start = time.perf_counter()
+    for p, f in enumerate(factions):
+        value, line = search.best(state, p)
+        print(f"{f.faction_name}: {value:g} {line}")
+    elapsed = time.perf_counter() - start
+    print(f"{search.nodes:,} nodes, {search.nodes / elapsed:,.0f} nodes per second")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import argparse
+import dataclasses
+import functools
+import json
+import logging
+import time
+import typing as typ
+from collections.abc import Collection, Iterator, Mapping, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.donation
+import sidcon.parse
+from sidcon.card import Card, CreatedCard
+from sidcon.converter import Converter, PurpleConverter, alternatives
+from sidcon.tech_upgrade_value import owner
+from sidcon.technology import Era
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# Axes of SupplyDemand.counts, after era and owner.
+sources: Sequence[str] = ["converter", "upgrade", "created"]
+CONVERTER = 0
+UPGRADE = 1
+CREATED = 2
+
+SUPPLY = 0
+DEMAND = 1
+
+eras: Sequence[Era | None] = [None, *Era]
+
+# A row of the table: era, owner, source, then what's supplied and demanded [side, unit].
+_Row = tuple[Era | None, str, int, npt.NDArray]
+
+
+def _mean_counts(side: typ.Any) -> npt.NDArray:
+    """Returns the units of side [unit], donations with what they're donations of, averaged over
+    its alternatives that are units."""
+    units = [a for a in alternatives(side) if isinstance(a, Mapping)]
+    if not units:
+        return np.zeros(len(sidcon.donation.units))
+    return np.mean([sidcon.donation.counts(a).sum(axis=0) for a in units], axis=0)
+
+
+def _flows(x: Converter) -> npt.NDArray:
+    return np.stack([_mean_counts(x.outputs), _mean_counts(x.inputs)])
+
+
+def _rows(c: Card) -> Iterator[_Row]:
+    o = owner(c) or ""
+    era = c.era_or_none
+    for face in c.faces:
+        for x in face.features:
+            if isinstance(x, Converter):
+                yield era, o, CONVERTER, _flows(x)
+        for upgrade_era, requirements, _ in face.upgrades:
+            for u in requirements:
+                if isinstance(u, PurpleConverter):
+                    yield upgrade_era, o, UPGRADE, _flows(u)
+    if isinstance(c, CreatedCard) and isinstance(c.cost, PurpleConverter):
+        yield era, o, CREATED, _flows(c.cost)
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class SupplyDemand(object):
+    """How many of each unit a card pool's faces supply and demand, per era, owner and source
+    [era, owner, source, side, unit].
+
+    Every face any card can reach counts once: its converters supply their outputs and demand
+    their inputs, and its upgrades their PurpleConverter costs; a created card its cost. A side
+    with "/" alternatives counts each alternative equally. Upgrades count in their own era,
+    everything else in its card's. Units are sidcon.donation.units, donations counted with what
+    they're donations of.
+    """
+
+    owners: tuple[str, ...]
+    counts: npt.NDArray
+
+    @classmethod
+    def from_cards(cls, cards: Sequence[Card]) -> "SupplyDemand":
+        rows = [r for c in cards for r in _rows(c)]
+        owners = tuple(sorted({o for _, o, _, _ in rows}))
+        counts = np.zeros(
+            (len(eras), len(owners), len(sources), 2, len(sidcon.donation.units)),
+            dtype=np.float64,
+        )
+        if rows:
+            np.add.at(
+                counts,
+                (
+                    np.array([eras.index(e) for e, _, _, _ in rows]),
+                    np.array([owners.index(o) for _, o, _, _ in rows]),
+                    np.array([s for _, _, s, _ in rows]),
+                ),
+                np.stack([f for _, _, _, f in rows]),
+            )
+        return cls(owners=owners, counts=counts)
+
+    def total(self, keep: Collection[int] = ()) -> npt.NDArray:
+        """Returns counts summed over every axis before side but those in keep [..., side,
+        unit]; 0 is era, 1 owner, 2 source."""
+        return self.counts.sum(axis=tuple(a for a in range(3) if a not in keep))
+
+    def scarcity(self, keep: Collection[int] = ()) -> npt.NDArray:
+        """Returns how many of each unit are demanded per unit supplied [..., unit], summed as in
+        total; NaN where none are supplied."""
+        total = self.total(keep)
+        supply = total[..., SUPPLY, :]
+        demand = total[..., DEMAND, :]
+        return np.divide(demand, supply, out=np.full(supply.shape, np.nan), where=supply > 0)
+
+    def to_json(self) -> dict[str, typ.Any]:
+        total = self.total()
+        scarcity = self.scarcity()
+        by_era = self.scarcity(keep=[0])
+
+        def number(x: float) -> float | None:
+            return None if np.isnan(x) else float(x)
+
+        return {
+            u.key: {
+                "supply": float(total[SUPPLY, i]),
+                "demand": float(total[DEMAND, i]),
+                "scarcity": number(scarcity[i]),
+                "scarcity_by_era": {
+                    str(int(e)) if e is not None else "none": number(by_era[k, i])
+                    for k, e in enumerate(eras)
+                },
+            }
+            for i, u in enumerate(sidcon.donation.units)
+            if total[:, i].any()
+        }
+
+
+@functools.cache
+def for_all_cards() -> SupplyDemand:
+    """Returns the table for every card, built once."""
+    return SupplyDemand.from_cards(sidcon.parse.all_cards())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.parse_args()
+
+    cards = sidcon.parse.all_cards()
+    start = time.perf_counter()
+    table = SupplyDemand.from_cards(cards)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps(table.to_json(), indent=2))
+    print(f"built from {len(cards)} cards in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
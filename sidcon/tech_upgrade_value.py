@@ -1,123 +1,278 @@
 import argparse
-import functools
-import itertools
+import dataclasses
 import logging
 import typing as typ
-from collections import defaultdict
-from collections.abc import Sequence
+from collections.abc import Collection, Mapping, Sequence
 from pprint import pprint  # noqa
 
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.batch
+import sidcon.countedunits
+import sidcon.faction
 import sidcon.parse
-from sidcon.card import Card, KtDualCard, Starting, StartingCard, UndesirableCard
-from sidcon.converter import Converter
+import sidcon.research
+import sidcon.technology
+from sidcon.card import Card
+from sidcon.converter import Converter, PurpleConverter
 from sidcon.face import Face
-from sidcon.faction import (
-    Caylion,
-    CharitySyndicate,
-    EniEt,
-    Faction,
-    Faderan,
-    Imdril,
-    Kjasjavikalimm,
-    KtZrKtRtl,
-    Species,
-    Unity,
-    Yengii,
-    Zeth,
-)
-from sidcon.technology import Era
+from sidcon.starting_economy_value import ALL_SPECIES
+from sidcon.technology import Era, Technology
+from sidcon.upgrade import FactionSpecificUpgradeCondition, Upgrade
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
 
-@typ.runtime_checkable
-class StartingCardlike(typ.Protocol):
+def face_value(face: Face) -> float:
+    """Returns the most a face can produce in a turn, net of what it consumes."""
+    value = 0.0
+    for f in face.features:
+        if isinstance(f, Converter):
+            value += f.max_net_value
+        elif isinstance(f, Mapping):
+            value += sidcon.countedunits.value(f)
+    return value
+
+
+def requirement_cost(
+    u: Upgrade, research_costs: Mapping[type[Technology], PurpleConverter]
+) -> float:
+    """Returns the value paid to meet an upgrade requirement, or NaN if it can't be priced.
+
+    A technology costs what researching it costs, though the owner may have been given it.
+    """
+    if isinstance(u, PurpleConverter):
+        return u.min_input_value
+    if isinstance(u, FactionSpecificUpgradeCondition):
+        return np.nan
+    if u in research_costs:
+        return research_costs[u].min_input_value
+    return np.nan
+
+
+def owner(c: Card) -> str | None:
+    faction = getattr(c, "faction", None)
+    if faction is not None:
+        return faction.faction_name
+    species = getattr(c, "species", None)
+    return species.species_name if species is not None else None
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class UpgradeEdge(object):
+    card: Card
     front: Face
-    era: Era
-    species: type[Species]
-    faction: type[Faction]
+    upgraded: Face
+    era: Era | None
+    requirements: Collection[Upgrade]
+
+    @property
+    def technologies(self) -> list[type[Technology]]:
+        """Returns the technologies required, with donated technologies as their originals."""
+        return [
+            sidcon.technology.donation_to_technology.get(u, u)
+            for u in self.requirements
+            if isinstance(u, type) and issubclass(u, Technology)
+        ]
+
+
+def upgrade_edges(cards: Sequence[Card]) -> list[UpgradeEdge]:
+    return [
+        UpgradeEdge(card=c, front=f, upgraded=upgraded, era=era, requirements=requirements)
+        for c in cards
+        for f in c.front.reachable_faces
+        for era, requirements, upgraded in f.upgrades
+    ]
+
+
+@typ.final
+class UpgradeLandscape(object):
+    """Values every upgrade in a card pool at once.
+
+    Every array has one entry per edge. gain is the upgraded face's value less the front's, and
+    cost is the summed value of the upgrade's requirements; edges with a requirement that can't be
+    priced (a faction-specific condition) have NaN cost and sort after every priced edge.
+
+    An edge needing several technologies counts fully toward each of them in technology_value,
+    since each is necessary to unlock it.
+    """
+
+    edges: typ.Final[Sequence[UpgradeEdge]]
+    owners: typ.Final[Sequence[str | None]]
+    front_value: typ.Final[npt.NDArray]
+    upgraded_value: typ.Final[npt.NDArray]
+    gain: typ.Final[npt.NDArray]
+    cost: typ.Final[npt.NDArray]
+    gain_per_cost: typ.Final[npt.NDArray]
+    technologies: typ.Final[Sequence[type[Technology]]]
+    technology_value: typ.Final[npt.NDArray]
+
+    _edge_technology: npt.NDArray  # [pair, (edge, technology)]
+
+    def __init__(
+        self,
+        edges: Sequence[UpgradeEdge],
+        research_costs: Mapping[type[Technology], PurpleConverter] | None = None,
+    ) -> None:
+        if research_costs is None:
+            research_costs = sidcon.research.research_costs()
+        self.edges = edges
+        self.owners = [owner(e.card) for e in edges]
+        self.front_value = np.array([face_value(e.front) for e in edges], dtype=np.float64)
+        self.upgraded_value = np.array([face_value(e.upgraded) for e in edges], dtype=np.float64)
+        self.gain = self.upgraded_value - self.front_value
+
+        # Requirements are flattened into (edge, cost) pairs and summed per edge in one pass.
+        requirement_edges = np.array(
+            [i for i, e in enumerate(edges) for _ in e.requirements], dtype=np.intp
+        )
+        requirement_costs = np.array(
+            [requirement_cost(u, research_costs) for e in edges for u in e.requirements],
+            dtype=np.float64,
+        )
+        self.cost = np.bincount(requirement_edges, requirement_costs, minlength=len(edges))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.gain_per_cost = np.where(self.cost > 0, self.gain / self.cost, np.nan)
+
+        self.technologies = sorted(
+            {t for e in edges for t in e.technologies}, key=lambda t: (t.era, t.name)
+        )
+        technology_index = {t: i for i, t in enumerate(self.technologies)}
+        self._edge_technology = np.array(
+            [(i, technology_index[t]) for i, e in enumerate(edges) for t in set(e.technologies)],
+            dtype=np.intp,
+        ).reshape(-1, 2)
+        self.technology_value = np.bincount(
+            self._edge_technology[:, 1],
+            self.gain[self._edge_technology[:, 0]],
+            minlength=len(self.technologies),
+        )
+
+    @classmethod
+    def from_cards(cls, cards: Sequence[Card]) -> "UpgradeLandscape":
+        return cls(upgrade_edges(cards))
+
+    def ranked(self, edges: npt.NDArray | None = None) -> npt.NDArray:
+        """Returns edges (default: all) ordered by gain per cost, best first, then by gain."""
+        if edges is None:
+            edges = np.arange(len(self.edges))
+        # lexsort sorts by its last key first, and puts NaN last.
+        order = np.lexsort((-self.gain[edges], -self.gain_per_cost[edges]))
+        return edges[order]
+
+    def by_owner(self, name: str) -> npt.NDArray:
+        return self.ranked(np.flatnonzero([o == name for o in self.owners]))
+
+    def by_technology(self, technology: type[Technology]) -> npt.NDArray:
+        technology = sidcon.technology.donation_to_technology.get(technology, technology)
+        if technology not in self.technologies:
+            return np.array([], dtype=np.intp)
+        t = self.technologies.index(technology)
+        return self.ranked(np.unique(self._edge_technology[self._edge_technology[:, 1] == t, 0]))
+
+    def technology_totals(self) -> dict[type[Technology], float]:
+        return {t: float(v) for t, v in zip(self.technologies, self.technology_value)}
+
+    def edge_json(self, i: int) -> dict[str, typ.Any]:
+        e = self.edges[i]
+        return {
+            "card": e.card.name,
+            "owner": self.owners[i],
+            "upgraded": e.upgraded.name,
+            "gain": float(self.gain[i]),
+            "cost": None if np.isnan(self.cost[i]) else float(self.cost[i]),
+            "gain_per_cost": (
+                None if np.isnan(self.gain_per_cost[i]) else float(self.gain_per_cost[i])
+            ),
+        }
+
+
+def cards_in_play(
+    all_cards: Sequence[Card], species_in_play: Collection[str] = ALL_SPECIES.keys()
+) -> list[Card]:
+    """Returns the cards that don't belong to a species missing from the game."""
+    species = {ALL_SPECIES[s] for s in species_in_play}
+    return [c for c in all_cards if getattr(c, "species", None) in species | {None}]
+
+
+def batch_answerer(
+    all_cards: Sequence[Card],
+) -> typ.Callable[[Mapping[str, typ.Any]], dict[str, typ.Any]]:
+    """Returns a function answering batch queries against all_cards.
+
+    A query is an object like {"species_in_play": ["Caylion", "Zeth"], "technology": "Antimatter
+    Power", "limit": 5}, or with "faction" (a faction or species name) instead of "technology",
+    or with neither for the total
+    value each technology unlocks. A landscape is built once per distinct species_in_play.
+    """
+    landscapes: dict[frozenset[str], UpgradeLandscape] = dict()
 
+    def answer(query: Mapping[str, typ.Any]) -> dict[str, typ.Any]:
+        species = sidcon.batch.names(query, "species_in_play", ALL_SPECIES)
+        species_in_play = frozenset(ALL_SPECIES if species is None else species)
+        if species_in_play not in landscapes:
+            landscapes[species_in_play] = UpgradeLandscape.from_cards(
+                cards_in_play(all_cards, species_in_play)
+            )
+        landscape = landscapes[species_in_play]
+        limit = sidcon.batch.integer(query, "limit") if "limit" in query else None
+        if "technology" in query:
+            edges = landscape.by_technology(Technology.from_string(query["technology"]))
+        elif "faction" in query:
+            name = query["faction"]
+            species_names = {s.species_name for s in ALL_SPECIES.values()}
+            if name not in sidcon.faction.name_to_faction and name not in species_names:
+                raise sidcon.batch.QueryError(f"unknown faction or species '{name}'")
+            edges = landscape.by_owner(name)
+        else:
+            return {"technologies": {t.name: v for t, v in landscape.technology_totals().items()}}
+        return {"upgrades": [landscape.edge_json(i) for i in edges[:limit]]}
 
-ALL_SPECIES = {
-    "Caylion": Caylion,
-    "EniEt": EniEt,
-    "Faderan": Faderan,
-    "Imdril": Imdril,
-    "Kjasjavikalimm": Kjasjavikalimm,
-    "KtZrKtRtl": KtZrKtRtl,
-    "Unity": Unity,
-    "Yengii": Yengii,
-    "Zeth": Zeth,
-}
+    return answer
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument("undesirable_limit", type=int)
-    # TODO: Add num_fleets param
     parser.add_argument(
         "-s",
         "--species_in_play",
         nargs="+",
         default=ALL_SPECIES.keys(),
     )
+    parser.add_argument("-n", "--limit", type=int, default=3, help="upgrades to show per owner")
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="read JSON query objects from stdin, one per line; see batch_answerer",
+    )
     args = parser.parse_args()
 
     all_cards = sidcon.parse.all_cards()
 
-    cards_by_faction = get_cards_by_faction(all_cards, args)
-
-    overall_converter_by_faction: dict[type[Faction], Converter] = dict()
-    for faction, cards in cards_by_faction.items():
-        features = list(itertools.chain.from_iterable(c.front.features for c in cards))
-        converters = [f for f in features if isinstance(f, Converter)]
-        converter = functools.reduce(Converter.merged, converters)
-        overall_converter_by_faction[faction] = converter
-
-    for faction, converter in overall_converter_by_faction.items():
-        print(
-            f"{faction.faction_name}: {overall_converter_by_faction[faction].max_input_value} -> "
-            f"{overall_converter_by_faction[faction].output_value}"
-        )
-
+    if args.batch:
+        sidcon.batch.run(batch_answerer(all_cards))
+        return
 
-def get_cards_by_faction(
-    all_cards: Sequence[Card | KtDualCard],
-    args: argparse.Namespace,
-) -> dict[type[Faction], list[StartingCard | UndesirableCard | KtDualCard]]:
-    cards_by_faction: defaultdict[
-        type[Faction], list[StartingCard | UndesirableCard | KtDualCard]
-    ] = defaultdict(list)
+    landscape = UpgradeLandscape.from_cards(cards_in_play(all_cards, args.species_in_play))
 
-    starting_cards = [c for c in all_cards if isinstance(c, Starting)]
-    for c in starting_cards:
-        cards_by_faction[c.faction].append(c)
+    print("Total upgrade value unlocked by each technology:")
+    totals = landscape.technology_totals()
+    for technology, value in sorted(totals.items(), key=lambda kv: kv[1], reverse=True):
+        print(f"  {technology.name}: {value:g}")
 
-    used_undesirable_cards = get_used_undesirable_cards(all_cards, args)
-    cards_by_faction[CharitySyndicate].extend(used_undesirable_cards)
-
-    return cards_by_faction
-
-
-def get_used_undesirable_cards(
-    all_cards: Sequence[Card | KtDualCard],
-    args: argparse.Namespace,
-) -> list[UndesirableCard]:
-    species_in_play = [v for k, v in ALL_SPECIES.items() if k in args.species_in_play]
-
-    undesirable_cards = sorted(
-        [c for c in all_cards if isinstance(c, UndesirableCard)],
-        key=lambda c: c.front.converter.net_value,
-        reverse=True,
-    )
-    used_undesirable_cards: list[UndesirableCard] = []
-    for c in undesirable_cards:
-        if len(used_undesirable_cards) >= args.undesirable_limit:
-            break
-        if c.species in species_in_play:
-            used_undesirable_cards.append(c)
-    return used_undesirable_cards
+    for name in sorted({o for o in landscape.owners if o is not None}):
+        print(f"{name}:")
+        for i in landscape.by_owner(name)[: args.limit]:
+            e = landscape.edge_json(i)
+            if e["cost"] is None:
+                print(f"  {e['card']}: +{e['gain']:g} for an unpriced condition")
+            else:
+                print(
+                    f"  {e['card']}: +{e['gain']:g} for {e['cost']:g} "
+                    f"({e['gain_per_cost']:.3f} per unit cost)"
+                )
 
 
 if __name__ == "__main__":
@@ -1,6 +1,9 @@
 import enum
+import inspect
 import logging
+import sys
 import typing as typ
+from collections.abc import Mapping
 
 import abstractcp as acp
 
@@ -26,6 +29,7 @@ class Era(enum.IntEnum):
 
 class Technology(acp.Abstract):
     name: typ.ClassVar[str] = acp.abstract_class_property(str)
+    era: typ.ClassVar[Era] = acp.abstract_class_property(Era)
 
     @classmethod
     def from_string(cls, s: str) -> type["Technology"]:
@@ -50,15 +54,15 @@ class DonationTechnology(Technology, acp.Abstract):
 
 
 class Era1Technology(Technology, acp.Abstract):
-    ...
+    era = Era.I
 
 
 class Era2Technology(Technology, acp.Abstract):
-    ...
+    era = Era.II
 
 
 class Era3Technology(Technology, acp.Abstract):
-    ...
+    era = Era.III
 
 
 class Nanotechnology(Era1Technology):
@@ -220,3 +224,17 @@ class MatterGeneration(Era3Technology):
 @typ.final
 class TemporalDilation(Era3Technology):
     name = "Temporal Dilation"
+
+
+name_to_technology: Mapping[str, type[Technology]] = {
+    c.name: c
+    for name, c in inspect.getmembers(sys.modules[__name__])
+    if inspect.isclass(c) and acp.Abstract not in c.__bases__ and issubclass(c, Technology)
+}
+
+# Each donated technology is the same technology as its undonated counterpart.
+donation_to_technology: Mapping[type[Technology], type[Technology]] = {
+    c: name_to_technology[c.name.removeprefix("+")]
+    for c in name_to_technology.values()
+    if issubclass(c, DonationTechnology)
+}
@@ -0,0 +1,188 @@
+import argparse
+import dataclasses
+import logging
+import time
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.faction
+import sidcon.parse
+from sidcon.game import (
+    Catalogue,
+    Table,
+    groups,
+    resource_count,
+    resource_values,
+    resources,
+)
+from sidcon.unit import VictoryPoint
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# Victory points can't change hands.
+tradeable: npt.NDArray = np.array([u is not VictoryPoint for u in resources])
+
+
+def needs(table: Table) -> npt.NDArray:
+    """Returns what each player's converters take in one economy phase [game, player, resource],
+    each converter with its first input alternative the engine can run."""
+    c = table.catalogue
+    faces = table.tableau
+    alternative = np.argmax(c.input_ok[faces], axis=-1)
+    inputs = np.take_along_axis(c.inputs[faces], alternative[..., None, None], axis=-2)[..., 0, :]
+    return inputs.sum(axis=(2, 3))
+
+
+def surpluses_and_deficits(table: Table) -> tuple[npt.NDArray, npt.NDArray]:
+    """Returns what each player holds beyond what their converters need, and what they lack
+    [game, player, resource].
+
+    A converter's "any" inputs count against the resources of their group a player holds most of.
+    """
+    need = needs(table)
+    left = table.inventory - need[..., :resource_count]
+    for g, members in enumerate(groups):
+        n = need[..., resource_count + g]
+        for k in range(int(n.max(initial=0))):
+            most = members[np.argmax(left[..., members], axis=-1)]
+            games, players = np.nonzero(n > k)
+            left[games, players, most[games, players]] -= 1
+    surplus = np.where(tradeable, np.maximum(left, 0), 0)
+    deficit = np.where(tradeable, np.maximum(-left, 0), 0)
+    return surplus, np.minimum(deficit, need[..., :resource_count])
+
+
+def _first_come(wants: npt.NDArray, total: npt.NDArray) -> npt.NDArray:
+    """Splits total [game] among the players [game, player] in seat order, each taking up to
+    what they want."""
+    before = np.cumsum(wants, axis=1) - wants
+    return np.clip(total[:, None] - before, 0, wants)
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Clearing(object):
+    """A multi-party exchange at each table: every player gives give and takes take, and what's
+    given equals what's taken [game, player, resource]. gain is the rise in each player's
+    inventory value after their economy phase [game, player]."""
+
+    give: npt.NDArray
+    take: npt.NDArray
+    gain: npt.NDArray
+
+    @property
+    def volume(self) -> npt.NDArray:
+        """Returns the value traded at each table [game]."""
+        return (self.give @ resource_values).sum(axis=-1)
+
+
+def _lots() -> list[tuple[int, int, int, int]]:
+    """Returns every (r, a, s, b) such that a of resource r are worth b of resource s, the
+    smallest such a and b, for the valuable tradeable resources."""
+    halves = np.round(resource_values * 2).astype(int)
+    valued = [r for r in range(resource_count) if tradeable[r] and halves[r] > 0]
+    return [
+        (r, int(halves[s] // gcd), s, int(halves[r] // gcd))
+        for r in valued
+        for s in valued
+        if r != s
+        for gcd in [np.gcd(halves[r], halves[s])]
+    ]
+
+
+_swaps = _lots()
+
+
+def _swap(surplus: npt.NDArray, deficit: npt.NDArray) -> tuple[npt.NDArray, npt.NDArray]:
+    """Returns what each player gives and takes [game, player, resource] when, for every pair of
+    resources in turn, the players with a surplus of one and a deficit of the other trade them
+    among themselves at their values."""
+    surplus = surplus.copy()
+    deficit = deficit.copy()
+    give = np.zeros_like(surplus)
+    take = np.zeros_like(surplus)
+    for r, a, s, b in _swaps:
+        # Sellers give r for s, buyers give s for r, in lots of a r for b s.
+        sell = np.minimum(surplus[..., r] // a, deficit[..., s] // b)
+        buy = np.minimum(deficit[..., r] // a, surplus[..., s] // b)
+        lots = np.minimum(sell.sum(axis=1), buy.sum(axis=1))
+        if not lots.any():
+            continue
+        sell = _first_come(sell, lots)
+        buy = _first_come(buy, lots)
+        for units, resource, count in ((sell, r, a), (buy, s, b)):
+            give[..., resource] += units * count
+            surplus[..., resource] -= units * count
+        for units, resource, count in ((sell, s, b), (buy, r, a)):
+            take[..., resource] += units * count
+            deficit[..., resource] -= units * count
+    return give, take
+
+
+def _after_economy(table: Table, change: npt.NDArray | None = None) -> npt.NDArray:
+    played = table.copy()
+    if change is not None:
+        played.inventory += change
+    played.economy()
+    return played.value()
+
+
+def clear(table: Table) -> Clearing:
+    """Finds the exchange at each table of table that every player in it gains from.
+
+    Players trade what their converters don't need for what they lack, value for value at
+    ValuableUnit.value, in seat order starting from table.turn's. A player is in the exchange only
+    if their inventory value after the economy phase rises, so it's cleared again without the
+    players it would leave no better off, until there are none.
+    """
+    surplus, deficit = surpluses_and_deficits(table)
+    order = (np.arange(table.players) + table.turn) % table.players
+    surplus, deficit = surplus[:, order], deficit[:, order]
+    baseline = _after_economy(table)[:, order]
+    # Seated is every trading player, in the order above.
+    seated = np.ones((table.games, table.players), dtype=bool)
+    unseat = np.argsort(order)
+
+    while True:
+        give, take = _swap(surplus * seated[..., None], deficit * seated[..., None])
+        gain = (_after_economy(table, (take - give)[:, unseat]))[:, order] - baseline
+        traded = (give + take).any(axis=-1)
+        losing = seated & traded & (gain <= 0)
+        if not losing.any():
+            break
+        seated &= ~losing
+
+    return Clearing(give=give[:, unseat], take=take[:, unseat], gain=gain[:, unseat])
+
+
+def trade(table: Table) -> Clearing:
+    """Clears table's trades and makes them."""
+    clearing = clear(table)
+    table.inventory += clearing.take - clearing.give
+    return clearing
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("factions", nargs="+", help="faction names, one per player")
+    parser.add_argument("-g", "--games", type=int, default=1)
+    args = parser.parse_args()
+
+    factions = [sidcon.faction.name_to_faction[f] for f in args.factions]
+    table = Table(Catalogue(sidcon.parse.all_cards()), factions, games=args.games)
+
+    start = time.perf_counter()
+    clearing = trade(table)
+    elapsed = time.perf_counter() - start
+
+    for p, f in enumerate(factions):
+        give = {u.key: int(n) for u, n in zip(resources, clearing.give[0, p]) if n}
+        take = {u.key: int(n) for u, n in zip(resources, clearing.take[0, p]) if n}
+        print(f"{f.faction_name}: gives {give}, takes {take}, gains {clearing.gain[0, p]:g}")
+    print(f"cleared {args.games} tables in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -287,3 +287,9 @@ key_to_donation_unit: Mapping[str, type[DonationUnit]] = {
     and issubclass(c, Unit)
     and issubclass(c, DonationUnit)
 }
+
+class_name_to_unit: Mapping[str, type[Unit]] = {
+    c.__name__: c
+    for name, c in inspect.getmembers(sys.modules[__name__])
+    if inspect.isclass(c) and acp.Abstract not in c.__bases__ and issubclass(c, Unit)
+}
@@ -0,0 +1,109 @@
+import dataclasses
+import logging
+import typing as typ
+from collections import defaultdict
+from collections.abc import Collection, Mapping, Sequence
+
+import sidcon.technology
+from sidcon.card import Card
+from sidcon.face import Face
+from sidcon.tech_upgrade_value import face_value, owner, upgrade_edges
+from sidcon.technology import Era, Technology
+from sidcon.upgrade import FactionSpecificUpgradeCondition, Upgrade
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+# What can be looked up: a technology (donated or not), or a faction-specific condition.
+UpgradeKey = type[Technology] | FactionSpecificUpgradeCondition
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Enabled(object):
+    """An upgrade that a key is one of the requirements of."""
+
+    card: Card
+    front: Face
+    upgraded: Face
+    era: Era | None
+    requirements: Collection[Upgrade]
+    owner: str | None
+    value_delta: float
+
+
+def canonical(key: UpgradeKey) -> UpgradeKey:
+    """Returns the technology a donated technology is an alias of; other keys are unchanged."""
+    if isinstance(key, type):
+        return sidcon.technology.donation_to_technology.get(key, key)
+    return key
+
+
+def _keys(requirements: Collection[Upgrade]) -> set[UpgradeKey]:
+    keys: set[UpgradeKey] = set()
+    for u in requirements:
+        if isinstance(u, FactionSpecificUpgradeCondition):
+            keys.add(u)
+        elif isinstance(u, type) and issubclass(u, Technology):
+            keys.add(canonical(u))
+    return keys
+
+
+@typ.final
+class UpgradeIndex(object):
+    """Maps each technology and faction-specific condition to the upgrades it's required for.
+
+    A donated technology (e.g. "+Antimatter Power") and the technology itself are the same key:
+    looking up either returns every upgrade requiring either. Every lookup is a dictionary access;
+    nothing is computed after construction.
+    """
+
+    enabled_by: typ.Final[Mapping[UpgradeKey, Sequence[Enabled]]]
+    value_delta_by_owner: typ.Final[Mapping[UpgradeKey, Mapping[str | None, float]]]
+
+    _enabled_by_owner: Mapping[tuple[UpgradeKey, str | None], Sequence[Enabled]]
+
+    def __init__(self, cards: Sequence[Card]) -> None:
+        enabled_by: defaultdict[UpgradeKey, list[Enabled]] = defaultdict(list)
+        for edge in upgrade_edges(cards):
+            enabled = Enabled(
+                card=edge.card,
+                front=edge.front,
+                upgraded=edge.upgraded,
+                era=edge.era,
+                requirements=edge.requirements,
+                owner=owner(edge.card),
+                value_delta=face_value(edge.upgraded) - face_value(edge.front),
+            )
+            for key in _keys(edge.requirements):
+                enabled_by[key].append(enabled)
+
+        enabled_by_owner: defaultdict[tuple[UpgradeKey, str | None], list[Enabled]] = defaultdict(
+            list
+        )
+        value_delta_by_owner: defaultdict[
+            UpgradeKey, defaultdict[str | None, float]
+        ] = defaultdict(lambda: defaultdict(float))
+        for key, enabled_list in enabled_by.items():
+            for e in enabled_list:
+                enabled_by_owner[(key, e.owner)].append(e)
+                value_delta_by_owner[key][e.owner] += e.value_delta
+
+        self.enabled_by = dict(enabled_by)
+        self.value_delta_by_owner = {k: dict(v) for k, v in value_delta_by_owner.items()}
+        self._enabled_by_owner = dict(enabled_by_owner)
+
+    def enabled(self, key: UpgradeKey, owner: str | None = None) -> Sequence[Enabled]:
+        """Returns the upgrades key is required for, optionally only those owned by owner (a
+        faction name, or a species name for technology cards)."""
+        if owner is None:
+            return self.enabled_by.get(canonical(key), [])
+        return self._enabled_by_owner.get((canonical(key), owner), [])
+
+    def cards(self, key: UpgradeKey) -> list[Card]:
+        """Returns each card with an upgrade key is required for, once, in pool order."""
+        return list({id(e.card): e.card for e in self.enabled(key)}.values())
+
+    def value_deltas(self, key: UpgradeKey) -> Mapping[str | None, float]:
+        """Returns the total value each owner gains from the upgrades key is required for."""
+        return self.value_delta_by_owner.get(canonical(key), {})
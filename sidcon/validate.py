@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import abc
+import dataclasses
+import logging
+import typing as typ
+from collections import defaultdict
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
+
+from sidcon.card import Card, TechnologyCard
+from sidcon.face import Face
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+Stream = Callable[[Card], Iterable[typ.Any]]
+"A function that yields the subjects (usually Faces) of a Card that a Rule inspects."
+
+Key = Callable[[typ.Any], Hashable]
+
+_Index = Mapping[Hashable, Sequence[typ.Any]]
+
+
+def _everything(_: typ.Any) -> None:
+    return None
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Violation(object):
+    rule: str
+    group: Hashable
+    message: str
+
+    def __str__(self) -> str:
+        if self.group is None:
+            return f"{self.rule}: {self.message}"
+        return f"{self.rule} [{self.group}]: {self.message}"
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Rule(abc.ABC):
+    """An invariant over the subjects of a stream, partitioned by group_by.
+
+    Rules never look at cards directly. The Validator builds one group-by index per distinct
+    (stream, group_by) pair in a single pass over the cards, and every Rule that shares that
+    pair is evaluated against the same index.
+    """
+
+    name: str
+    stream: Stream
+    group_by: Key = _everything
+
+    def check(self, index: _Index) -> Iterable[Violation]:
+        for group, subjects in index.items():
+            yield from self.check_group(group, subjects)
+
+    @abc.abstractmethod
+    def check_group(self, group: Hashable, subjects: Sequence[typ.Any]) -> Iterable[Violation]:
+        ...
+
+    def _violation(self, group: Hashable, message: str) -> Violation:
+        return Violation(rule=self.name, group=group, message=message)
+
+
+@typ.final
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Every(Rule):
+    "Every subject must satisfy predicate."
+
+    predicate: Callable[[typ.Any], bool]
+
+    def check_group(self, group: Hashable, subjects: Sequence[typ.Any]) -> Iterable[Violation]:
+        for s in subjects:
+            if not self.predicate(s):
+                yield self._violation(group, f"'{_describe(s)}' fails predicate")
+
+
+@typ.final
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Cardinality(Rule):
+    "The subjects must have exactly count distinct keys, over the whole stream."
+
+    key: Key
+    count: int
+
+    def check(self, index: _Index) -> Iterable[Violation]:
+        yield from self.check_group(None, [s for subjects in index.values() for s in subjects])
+
+    def check_group(self, group: Hashable, subjects: Sequence[typ.Any]) -> Iterable[Violation]:
+        keys = {self.key(s) for s in subjects}
+        if len(keys) != self.count:
+            yield self._violation(group, f"expected {self.count} distinct keys, got {len(keys)}")
+
+
+@typ.final
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Spread(Rule):
+    """The subjects of each group must have count distinct keys.
+
+    When delta is given and count is 2, the two keys must also differ by exactly delta.
+    exceptions overrides count for specific groups.
+    """
+
+    key: Key
+    count: int = 1
+    delta: float | None = None
+    exceptions: Mapping[Hashable, int] = dataclasses.field(default_factory=dict)
+
+    def check_group(self, group: Hashable, subjects: Sequence[typ.Any]) -> Iterable[Violation]:
+        count = self.exceptions.get(group, self.count)
+        keys: set[Hashable] = set()
+        for s in subjects:
+            try:
+                keys.add(self.key(s))
+            except (IndexError, ValueError) as e:
+                yield self._violation(group, f"'{_describe(s)}' has no key: {e}")
+                return
+        if len(keys) != count:
+            yield self._violation(
+                group, f"expected {count} distinct keys, got {len(keys)}: {sorted(map(str, keys))}"
+            )
+        elif self.delta is not None and count == 2:
+            low, high = typ.cast(list[float], sorted(keys))  # type: ignore[type-var]
+            if abs(high - low) != self.delta:
+                yield self._violation(group, f"expected delta {self.delta}, got {high - low}")
+
+
+@typ.final
+class Validator(object):
+    rules: typ.Final[Sequence[Rule]]
+
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self.rules = rules
+
+    def validate(self, cards: Iterable[Card]) -> list[Violation]:
+        """Evaluates every rule against cards and returns every violation found."""
+        index_keys = list(dict.fromkeys((r.stream, r.group_by) for r in self.rules))
+        streams = list(dict.fromkeys(stream for stream, _ in index_keys))
+        indexes: dict[tuple[Stream, Key], defaultdict[Hashable, list[typ.Any]]] = {
+            k: defaultdict(list) for k in index_keys
+        }
+        group_bys: dict[Stream, list[Key]] = defaultdict(list)
+        for stream, group_by in index_keys:
+            group_bys[stream].append(group_by)
+
+        for card in cards:
+            for stream in streams:
+                for subject in stream(card):
+                    for group_by in group_bys[stream]:
+                        indexes[(stream, group_by)][group_by(subject)].append(subject)
+
+        violations: list[Violation] = []
+        for r in self.rules:
+            violations.extend(r.check(indexes[(r.stream, r.group_by)]))
+        return violations
+
+
+@typ.final
+class ValidationError(Exception):
+    violations: typ.Final[Sequence[Violation]]
+
+    def __init__(self, violations: Sequence[Violation]) -> None:
+        self.violations = violations
+        super().__init__(f"{len(violations)} validation rule violation(s)")
+
+    def __str__(self):
+        return "\n".join([super().__str__(), *(f"  {v}" for v in self.violations)])
+
+
+def _describe(s: typ.Any) -> str:
+    if isinstance(s, Face):
+        return s.name
+    return str(s)
+
+
+def _tech_fronts(c: Card) -> Iterable[Face]:
+    if isinstance(c, TechnologyCard):
+        yield c.front
+
+
+def _tech_backs(c: Card) -> Iterable[Face]:
+    if isinstance(c, TechnologyCard):
+        for _, _, back in c.front.upgrades:
+            yield back
+
+
+def _name(f: Face) -> str:
+    return f.name
+
+
+# Im'dril has Galactic Reunion instead of Galactic Colonization........
+_tech_back_aliases: Mapping[str, str] = {"Galactic Reunion": "Galactic Colonization"}
+
+
+def _aliased_name(f: Face) -> str:
+    return _tech_back_aliases.get(f.name, f.name)
+
+
+def _sorted_upgrade_requirements(f: Face) -> tuple[typ.Any, ...]:
+    return tuple(sorted(f.upgrades[0][1], key=lambda t: str(t)))
+
+
+# Some of the unity upgrades produce the same output value as others, but most do not.
+unity_same_back_names: Sequence[str] = [
+    "Multispecies Hybrid Cultures",
+    "Full Interspecies Integration",
+    "Living Infrastructure",
+    "Galactic Domination",
+    "Stasis Field",
+    "Macroscale Teleportation",
+    "Dyson Swarms",
+    "Galactic Colonization",
+]
+
+tech_card_rules: Sequence[Rule] = [
+    Every(
+        name="front has one feature", stream=_tech_fronts, predicate=lambda f: len(f.features) == 1
+    ),
+    Cardinality(name="front names", stream=_tech_fronts, key=_name, count=21),
+    Spread(
+        name="front input value", stream=_tech_fronts, group_by=_name, key=lambda f: f.input_value
+    ),
+    Spread(
+        name="front upgrade requirements",
+        stream=_tech_fronts,
+        group_by=_name,
+        key=_sorted_upgrade_requirements,
+    ),
+    Every(
+        name="back has one feature", stream=_tech_backs, predicate=lambda f: len(f.features) == 1
+    ),
+    Cardinality(name="back names", stream=_tech_backs, key=_name, count=22),
+    Spread(
+        name="back output value",
+        stream=_tech_backs,
+        group_by=_aliased_name,
+        key=lambda f: f.output_value,
+        count=2,
+        delta=0.5,
+        exceptions={name: 1 for name in unity_same_back_names},
+    ),
+]
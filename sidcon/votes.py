@@ -0,0 +1,198 @@
+import argparse
+import logging
+import math
+import typing as typ
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+import sidcon.batch
+import sidcon.parse
+from sidcon.card import Card, CreatedCard
+from sidcon.cost import FactionSpecificCost
+from sidcon.tech_upgrade_value import face_value
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+vote_costs: Mapping[FactionSpecificCost, int] = {
+    FactionSpecificCost.CAYLION_COLLABORATIVE_THREE_VOTES: 3,
+    FactionSpecificCost.CAYLION_COLLABORATIVE_FOUR_VOTES: 4,
+    FactionSpecificCost.CAYLION_COLLABORATIVE_FIVE_VOTES: 5,
+    FactionSpecificCost.CAYLION_COLLABORATIVE_SIX_VOTES: 6,
+}
+
+max_votes = max(vote_costs.values())
+
+# What another player asks for a vote, as a distribution over value: by default, one cube, small
+# or large.
+default_vote_prices: Mapping[float, float] = {1.0: 0.5, 1.5: 0.5}
+
+# Up to nine players, so up to eight others to buy votes from.
+default_max_sellers = 8
+default_votes_per_seller = 2
+
+
+def is_vote_cost(x: typ.Any) -> bool:
+    return isinstance(x, FactionSpecificCost) and x in vote_costs
+
+
+def _cheapest_sums(prices: Mapping[float, float], offers: int) -> npt.NDArray:
+    """Returns the expected total of the k cheapest of offers independent asking prices, for
+    every k from 0 to max_votes; inf where k > offers.
+
+    The j-th cheapest price is at most v exactly when at least j prices are at most v, which is a
+    binomial tail in P(price <= v); every (v, j) is computed at once.
+    """
+    support = np.array(sorted(prices), dtype=np.float64)
+    pmf = np.array([prices[v] for v in sorted(prices)], dtype=np.float64)
+    cdf = np.clip(np.cumsum(pmf) / pmf.sum(), 0.0, 1.0)
+
+    r = np.arange(offers + 1)
+    binomial = np.array([math.comb(offers, k) for k in r], dtype=np.float64)
+    # at_least[v, j]: P(at least j of the offers are at most support[v]).
+    at_most = binomial * cdf[:, None] ** r * (1 - cdf[:, None]) ** (offers - r)
+    at_least = np.cumsum(at_most[:, ::-1], axis=1)[:, ::-1]
+    jth_cdf = at_least[:, 1:]
+    jth_pmf = np.diff(jth_cdf, axis=0, prepend=0.0)
+    jth_expected = support @ jth_pmf
+
+    sums = np.full(max_votes + 1, np.inf)
+    sums[0] = 0.0
+    k = min(offers, max_votes)
+    sums[1 : k + 1] = np.cumsum(jth_expected[:k])  # noqa: E203
+    return sums
+
+
+@typ.final
+class VoteMarket(object):
+    """Prices votes for the Caylion Collaborative, bought from the other players at the table.
+
+    Each other player offers votes_per_seller votes, each at an independently drawn asking price,
+    and the Collaborative buys the cheapest. table[sellers, votes] is the expected total price of
+    votes votes from sellers other players (inf if they don't have that many), computed exactly
+    for every table size up front, so pricing any number of costs is one array lookup.
+    """
+
+    table: typ.Final[npt.NDArray]
+
+    def __init__(
+        self,
+        prices: Mapping[float, float] = default_vote_prices,
+        max_sellers: int = default_max_sellers,
+        votes_per_seller: int = default_votes_per_seller,
+    ) -> None:
+        self.table = np.stack(
+            [_cheapest_sums(prices, s * votes_per_seller) for s in range(max_sellers + 1)]
+        )
+        self.table.setflags(write=False)
+
+    def price(self, cost: FactionSpecificCost, sellers: int) -> float:
+        if not is_vote_cost(cost):
+            raise ValueError(f"'{cost}' isn't a vote cost")
+        return float(self.table[sellers, vote_costs[cost]])
+
+    def prices(self, votes: npt.ArrayLike, sellers: int) -> npt.NDArray:
+        """Returns the expected price of each of an array of vote counts."""
+        return self.table[sellers, np.asarray(votes)]
+
+
+@typ.final
+class VoteCostRanking(object):
+    """Ranks the cards bought with votes by value gained per unit of expected price.
+
+    Cards' vote counts and values are gathered once; a ranking for a table size is a lookup into
+    the market's table and a sort.
+    """
+
+    market: typ.Final[VoteMarket]
+    cards: typ.Final[Sequence[CreatedCard]]
+    votes: typ.Final[npt.NDArray]
+    value: typ.Final[npt.NDArray]
+
+    def __init__(self, cards: Sequence[Card], market: VoteMarket | None = None) -> None:
+        self.market = market if market is not None else VoteMarket()
+        self.cards = [c for c in cards if isinstance(c, CreatedCard) and is_vote_cost(c.cost)]
+        self.votes = np.array(
+            [vote_costs[typ.cast(FactionSpecificCost, c.cost)] for c in self.cards], dtype=np.intp
+        )
+        self.value = np.array([face_value(c.front) for c in self.cards], dtype=np.float64)
+
+    def ranked(self, sellers: int) -> tuple[npt.NDArray, npt.NDArray]:
+        """Returns the cards' indices, best first, and each card's expected price."""
+        prices = self.market.prices(self.votes, sellers)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            value_per_price = np.where(
+                (prices > 0) & np.isfinite(prices), self.value / prices, np.nan
+            )
+        # lexsort puts NaN, and so unaffordable cards, last.
+        return np.lexsort((-self.value, -value_per_price)), prices
+
+    def ranked_json(self, sellers: int, limit: int | None = None) -> list[dict[str, typ.Any]]:
+        order, prices = self.ranked(sellers)
+        return [
+            {
+                "card": self.cards[i].name,
+                "votes": int(self.votes[i]),
+                "value": float(self.value[i]),
+                "expected_price": float(prices[i]) if np.isfinite(prices[i]) else None,
+            }
+            for i in order[:limit]
+        ]
+
+
+def batch_answerer(
+    all_cards: Sequence[Card],
+) -> typ.Callable[[Mapping[str, typ.Any]], dict[str, typ.Any]]:
+    """Returns a function answering batch queries against all_cards.
+
+    A query is an object like {"sellers": 4, "limit": 5}: the number of other players at the
+    table, and how many of the best vote-cost cards to return.
+    """
+    ranking = VoteCostRanking(all_cards)
+
+    def answer(query: Mapping[str, typ.Any]) -> dict[str, typ.Any]:
+        sellers = sidcon.batch.integer(query, "sellers")
+        if not 0 <= sellers < len(ranking.market.table):
+            raise sidcon.batch.QueryError(f"sellers must be 0 to {len(ranking.market.table) - 1}")
+        limit = sidcon.batch.integer(query, "limit") if "limit" in query else None
+        return {"cards": ranking.ranked_json(sellers, limit)}
+
+    return answer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "sellers",
+        type=int,
+        nargs="?",
+        default=4,
+        help="other players at the table, who the Collaborative buys votes from",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="read JSON query objects from stdin, one per line; see batch_answerer",
+    )
+    args = parser.parse_args()
+
+    all_cards = sidcon.parse.all_cards()
+
+    if args.batch:
+        sidcon.batch.run(batch_answerer(all_cards))
+        return
+
+    ranking = VoteCostRanking(all_cards)
+    print(f"Expected vote prices with {args.sellers} other players:")
+    for cost, votes in vote_costs.items():
+        print(f"  {cost.value}: {ranking.market.price(cost, args.sellers):g}")
+    for e in ranking.ranked_json(args.sellers):
+        price = "unaffordable" if e["expected_price"] is None else f"{e['expected_price']:g}"
+        print(f"{e['card']}: {e['value']:g} for {e['votes']} votes ({price})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import sidcon.parse
+import sidcon.rollout
+from sidcon.faction import (
+    CaylionPlutocracy,
+    CharitySyndicate,
+    EniEtAscendancy,
+    FaderanConclave,
+    ImdrilNomads,
+    KtZrKtRtlAdhocracy,
+    ShallowUnity,
+    YengiiSociety,
+    ZethAnocracy,
+)
+from sidcon.game import Catalogue
+
+
+@pytest.fixture(scope="session")
+def catalogue():
+    return Catalogue(sidcon.parse.all_cards())
+
+
+@pytest.fixture(scope="session")
+def factions():
+    # A full table of nine players.
+    return [
+        CaylionPlutocracy,
+        EniEtAscendancy,
+        ZethAnocracy,
+        CharitySyndicate,
+        YengiiSociety,
+        FaderanConclave,
+        ImdrilNomads,
+        KtZrKtRtlAdhocracy,
+        ShallowUnity,
+    ]
+
+
+@pytest.fixture()
+def warm_table(catalogue, factions):
+    # A few turns in, with random technologies and cards, so that there's something to trade and
+    # run.
+    return sidcon.rollout.play_table(catalogue, factions, 40, 3, np.random.default_rng(0))
@@ -0,0 +1,66 @@
+import io
+import json
+
+import pytest
+
+import sidcon.batch
+import sidcon.parse
+import sidcon.starting_economy_value
+
+
+@pytest.fixture(scope="module")
+def answer():
+    return sidcon.starting_economy_value.batch_answerer(sidcon.parse.all_cards())
+
+
+class TestBatch(object):
+    def test_run(self, answer):
+        lines = [
+            '{"id": "a", "undesirable_limit": 3}',
+            "",
+            '{"id": "b", "undesirable_limit": 3, "factions": ["Caylion Plutocracy"]}',
+            '{"id": "c"}',
+            "not json",
+        ]
+        out = io.StringIO()
+        assert sidcon.batch.run(answer, lines, out) == 4
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [r.get("id") for r in results] == ["a", "b", "c", None]
+        assert results[1]["factions"] == {
+            "Caylion Plutocracy": results[0]["factions"]["Caylion Plutocracy"]
+        }
+        assert "error" in results[2] and "error" in results[3]
+
+    def test_matches_cli(self, answer):
+        cards = sidcon.parse.all_cards()
+        converters = sidcon.starting_economy_value.get_overall_converter_by_faction(
+            sidcon.starting_economy_value.get_cards_by_faction(cards, 2, ["Caylion", "Zeth"])
+        )
+        got = answer({"undesirable_limit": 2, "species_in_play": ["Caylion", "Zeth"]})
+        assert got["factions"] == {
+            f.faction_name: {"max_input_value": c.max_input_value, "output_value": c.output_value}
+            for f, c in converters.items()
+        }
+
+    def test_unknown_faction(self, answer):
+        with pytest.raises(sidcon.batch.QueryError):
+            answer({"undesirable_limit": 2, "factions": ["Nobody"]})
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            # A string rather than a list of species.
+            {"undesirable_limit": 8, "species_in_play": "Caylion"},
+            {"undesirable_limit": 8, "species_in_play": ["Nobody"]},
+            {"undesirable_limit": 8.5},
+            {"undesirable_limit": True},
+            {"undesirable_limit": "8"},
+            {"undesirable_limit": 8, "factions": "Charity Syndicate"},
+        ],
+    )
+    def test_badly_typed(self, answer, query):
+        with pytest.raises(sidcon.batch.QueryError):
+            answer(query)
+        out = io.StringIO()
+        sidcon.batch.run(answer, [json.dumps(query)], out)
+        assert "error" in json.loads(out.getvalue())
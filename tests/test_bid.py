@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+import sidcon.bid
+import sidcon.game
+import sidcon.parse
+from sidcon.bid import BidAuction
+from sidcon.card import DualFacedColonyCard
+from sidcon.faction import (
+    CaylionPlutocracy,
+    EniEtAscendancy,
+    FaderanConclave,
+    ImdrilNomads,
+    ShallowUnity,
+    ZethAnocracy,
+)
+from sidcon.unit import DesertColony, JungleColony, Ship
+
+_factions = [CaylionPlutocracy, EniEtAscendancy, ZethAnocracy, ImdrilNomads, FaderanConclave]
+
+
+@pytest.fixture(scope="module")
+def cards():
+    return sidcon.parse.all_cards()
+
+
+@pytest.fixture(scope="module")
+def auction(cards):
+    return BidAuction(cards, _factions)
+
+
+class TestValues(object):
+    def test_colony_demand(self, cards):
+        # The Caylion pay jungle colonies for upgrades, and nothing else.
+        demand = sidcon.bid.colony_demand(cards, CaylionPlutocracy)
+        assert demand[JungleColony] > 0
+        assert demand[DesertColony] == 0
+
+    def test_no_colony_support(self, cards):
+        colony = next(c for c in cards if isinstance(c, DualFacedColonyCard))
+        demand = sidcon.bid.colony_demand(cards, ImdrilNomads)
+        assert sidcon.bid.colony_value(colony, ImdrilNomads, demand) == 0
+
+    def test_values(self, auction):
+        assert auction.value.shape == (len(_factions), len(auction.items))
+        assert (auction.value >= 0).all()
+
+
+class TestRun(object):
+    def test_seeded(self, auction):
+        a = auction.run(1000, [0.5] * len(_factions), np.random.default_rng(0))
+        b = auction.run(1000, [0.5] * len(_factions), np.random.default_rng(0))
+        assert a.to_json() == b.to_json()
+
+    def test_bids_are_affordable(self, auction):
+        results = auction.run(1000, [1.0] * len(_factions), np.random.default_rng(0))
+        assert (results.paid <= auction.ships * results.rounds).all()
+        assert (results.items <= results.rounds).all()
+
+    def test_no_bids(self, auction):
+        # Nobody pays, but everybody still picks while items are left.
+        results = auction.run(1000, [0.0] * len(_factions), np.random.default_rng(0))
+        assert not results.paid.any()
+        assert (results.items == results.rounds).all()
+
+    def test_budget_per_round(self, auction):
+        ships = np.random.default_rng(1).integers(0, 4, (1000, len(_factions)))
+        results = auction.run(1000, [1.0] * len(_factions), np.random.default_rng(0), ships)
+        assert (results.paid <= ships.sum(axis=0)).all()
+
+    def test_budget_from_table(self, cards):
+        factions = [ShallowUnity, ZethAnocracy, CaylionPlutocracy]
+        table = sidcon.game.Table(sidcon.game.Catalogue(cards), factions, games=100)
+        ships = table.inventory[..., sidcon.game.resources.index(Ship)]
+        auction = BidAuction(cards, factions)
+        # Unity starts without ships, so it can only win first pick with some.
+        assert auction.ships[0] == 0
+        results = auction.run(100, [1.0, 0.0, 0.0], np.random.default_rng(0), ships + 5)
+        assert results.paid[0] > 0 and not results.paid[1:].any()
+
+    def test_shading_decides_first_pick(self, cards):
+        auction = BidAuction(cards, [CaylionPlutocracy, ZethAnocracy], colonies=2, teams=0)
+        rounds = 100
+        drawn = auction._draw(rounds, np.random.default_rng(0))
+        best = auction.value[:, drawn].max(axis=-1).sum(axis=-1)
+        for shading, first in [([1.0, 0.0], 0), ([0.0, 1.0], 1)]:
+            results = auction.run(rounds, shading, np.random.default_rng(0), ships=10)
+            assert results.won[first] == pytest.approx(best[first])
+            assert results.paid[1 - first] == 0
+
+    def test_ties_go_to_higher_tiebreaker(self, cards):
+        # Both bid their one ship, so Zeth picks first every round.
+        auction = BidAuction(cards, [CaylionPlutocracy, ZethAnocracy])
+        rounds = 100
+        results = auction.run(rounds, [1.0, 1.0], np.random.default_rng(0))
+        drawn = auction._draw(rounds, np.random.default_rng(0))
+        assert results.won[1] == pytest.approx(auction.value[1, drawn].max(axis=-1).sum())
+        assert (results.paid == rounds).all()
@@ -0,0 +1,144 @@
+import logging
+import pickle
+
+import pytest
+
+import sidcon.parse
+from sidcon.card import KtDualCard
+from sidcon.faction import (
+    CaylionCollaborative,
+    EniEtAscendancy,
+    FaderanConclave,
+    GrandFleet,
+    KjasjavikalimmDirectorate,
+    SocietyofFallingLight,
+    ZethAnocracy,
+)
+from sidcon.technology import Era
+from sidcon.unit import (
+    AnyColony,
+    DesertColony,
+    Green,
+    JungleColony,
+    OceanColony,
+    Ultratech,
+)
+
+
+@pytest.fixture(scope="module")
+def kt_cards():
+    return [c for c in sidcon.parse.all_cards() if isinstance(c, KtDualCard)]
+
+
+def _kt(name):
+    (kt,) = [c for c in sidcon.parse.all_cards() if isinstance(c, KtDualCard) and c.name == name]
+    return kt
+
+
+class TestKtDualCard(object):
+    def test_front(self, kt_cards):
+        assert len(kt_cards) == 6
+        for kt in kt_cards:
+            assert kt.front is kt.state(0, 0)
+            assert kt.name == f"{kt.left.name} {kt.right.name}"
+
+    def test_states_are_lazy(self):
+        kt = _kt("Hand Crafted Polyutility Components")
+        assert list(kt._states) == [(0, 0)]
+        assert len(kt.front.upgrades) == 2
+        assert list(kt._states) == [(0, 0)]
+
+        _, _, upgraded = kt.front.upgrades[0]
+        assert upgraded.name == "Microfabricated Polyutility Components"
+        assert set(kt._states) == {(0, 0), (1, 0)}
+
+    def test_upgrades(self):
+        kt = _kt("Hand Crafted Polyutility Components")
+        (left_era, left_requirements, left_upgraded) = kt.left.upgrades[0]
+        (right_era, right_requirements, right_upgraded) = kt.right.upgrades[0]
+        assert [(era, u) for era, u, _ in kt.front.upgrades] == [
+            (left_era, left_requirements),
+            (right_era, right_requirements),
+        ]
+        # Both upgrade orders reach the same, memoized, state.
+        (_, _, a), (_, _, b) = kt.front.upgrades
+        assert a.upgrades[0][2] is b.upgrades[0][2]
+        assert a.upgrades[0][2].name == f"{left_upgraded.name} {right_upgraded.name}"
+
+    def test_states(self, kt_cards):
+        for kt in kt_cards:
+            states = list(kt.states())
+            assert len(states) == len(kt.left.reachable_faces) * len(kt.right.reachable_faces)
+            assert {f.name for f in states} == {f.name for f in kt.front.reachable_faces}
+
+    def test_states_keep(self):
+        kt = _kt("Hand Crafted Polyutility Components")
+        states = list(kt.states(lambda left, right: left is kt.left))
+        assert [f.name for f in states] == [
+            "Hand Crafted Polyutility Components",
+            "Hand Crafted Adaptive Architecture",
+        ]
+        assert set(kt._states) == {(0, 0), (0, 1)}
+
+    def test_pickle(self, kt_cards):
+        for kt in kt_cards:
+            loaded = pickle.loads(pickle.dumps(kt))
+            assert loaded == kt
+            assert [f.name for f in loaded.front.reachable_faces] == [
+                f.name for f in kt.front.reachable_faces
+            ]
+            assert loaded.front.upgrades == kt.front.upgrades
+
+
+class TestCard(object):
+    def test_era_or_none(self):
+        cards = sidcon.parse.all_cards()
+        nanotechnology = next(c for c in cards if c.name == "Nanotechnology")
+        assert nanotechnology.era_or_none == Era.I
+        assert _kt("Hand Crafted Polyutility Components").era_or_none is None
+
+    def test_reachable_tree(self, kt_cards):
+        for c in kt_cards:
+            tree = c.front.reachable_tree
+            assert [f for f, _, _ in tree] == c.front.reachable_faces
+            assert tree[0] == (c.front, 0, -1)
+            for f, depth, parent in tree[1:]:
+                parent_face, parent_depth, _ = tree[parent]
+                assert depth == parent_depth + 1
+                assert any(u is f for _, _, u in parent_face.upgrades)
+
+    def test_faces(self, kt_cards):
+        for c in kt_cards:
+            # The fully upgraded state is reached through either half, but is one face.
+            assert len(c.front.reachable_faces) == 5
+            assert len(c.faces) == 4
+            assert {id(f) for f in c.faces} == {id(f) for f in c.states()}
+
+
+class TestSetupCard(object):
+    def test_colonies_and_research_teams(self):
+        setup = {c.faction: c for c in sidcon.parse.all_setup_cards()}
+        assert len(setup) == 18
+        assert setup[SocietyofFallingLight].colonies == [JungleColony, OceanColony, DesertColony]
+        assert setup[KjasjavikalimmDirectorate].colonies == [AnyColony, AnyColony]
+        assert setup[ZethAnocracy].colonies == []
+        assert setup[ZethAnocracy].research_teams == 1
+        assert setup[CaylionCollaborative].research_teams == 1
+        assert setup[EniEtAscendancy].research_teams == 0
+
+    def test_unparsed(self, caplog):
+        with caplog.at_level(logging.WARNING, logger="sidcon.card"):
+            sidcon.parse.all_setup_cards()
+        assert sorted(r.getMessage() for r in caplog.records) == [
+            "Caylion Collaborative's setup card: 'Era 2' isn't parsed",
+            "Caylion Plutocracy's setup card: 'with x2' isn't parsed",
+            "Deep Unity's setup card: '3 Dice' isn't parsed",
+            "Kjasjavikalimm Independent Nations's setup card: '+Linguistic Analysis' isn't parsed",
+        ]
+
+    def test_front_is_starting_resources(self):
+        setup = {c.faction: c for c in sidcon.parse.all_setup_cards()}
+        (resources,) = setup[GrandFleet].front.features
+        assert resources[Green] == 5
+        assert resources[Ultratech] == 2
+        assert len(setup[FaderanConclave].front.features) == 2
@@ -0,0 +1,62 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+import sidcon.cardtable
+import sidcon.parse
+from sidcon.cardtable import CardTable, CardTableFormatError, SharedCardTable
+
+
+def _names_in_worker(name):
+    with CardTable.attach(name) as table:
+        return [table.name(i) for i in range(len(table))]
+
+
+class TestCardTable(object):
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "sidcon.cards")
+        cards = sidcon.parse.all_cards()
+        sidcon.cardtable.write(cards, path)
+        with CardTable.open(path) as table:
+            assert list(table) == cards
+            assert [table.name(i) for i in range(len(table))] == [c.name for c in cards]
+            assert [table.card_type(i) for i in range(len(table))] == [type(c) for c in cards]
+
+    def test_faces(self):
+        cards = sidcon.parse.all_cards()
+        table = CardTable(sidcon.cardtable.to_bytes(cards))
+        for i, c in enumerate(cards):
+            first = int(table.cards[i]["first_face"])
+            assert table.face(first) == c.front
+            assert table.string(table.faces[first]["name"]) == c.front.name
+            assert table.faces[first]["depth"] == 0
+        depth = table.faces["depth"]
+        parents = table.faces["parent"][depth > 0]
+        np.testing.assert_array_equal(depth[parents] + 1, depth[depth > 0])
+
+    def test_converter_counts(self):
+        cards = sidcon.parse.all_cards()
+        table = CardTable(sidcon.cardtable.to_bytes(cards))
+        i = table.index("Antimatter Power")
+        face = table.faces[table.cards[i]["first_face"]]
+        inputs, outputs = table.converter_counts(int(face["first_converter"]))
+        assert len(inputs) >= 1 and len(outputs) >= 1
+        unit_values = np.array(
+            [getattr(u, "value", 0.0) for u in sidcon.cardtable.units], dtype=np.float64
+        )
+        converter = table.converters[face["first_converter"]]
+        assert inputs[:, sidcon.cardtable.OWNED].sum(axis=0) @ unit_values == pytest.approx(
+            converter["min_input_value"]
+        )
+
+    def test_bad_magic(self):
+        with pytest.raises(CardTableFormatError):
+            CardTable(bytes(4096))
+
+    def test_shared_memory(self):
+        cards = sidcon.parse.all_cards()
+        with SharedCardTable(cards) as shared:
+            with multiprocessing.get_context("spawn").Pool(2) as pool:
+                got = pool.map(_names_in_worker, [shared.name] * 2)
+        assert got == [[c.name for c in cards]] * 2
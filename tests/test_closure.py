@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+import sidcon.closure
+import sidcon.parse
+import sidcon.upgrade_index
+from sidcon.card import KtDualCard
+from sidcon.closure import UpgradeClosure
+from sidcon.converter import PurpleConverter
+from sidcon.index import CardIndex
+from sidcon.tech_upgrade_value import face_value
+from sidcon.technology import AntimatterPower, DonationAntimatterPower
+from sidcon.upgrade import FactionSpecificUpgradeCondition
+
+
+@pytest.fixture(scope="module")
+def cards():
+    return sidcon.parse.all_cards()
+
+
+@pytest.fixture(scope="module")
+def closure(cards):
+    return UpgradeClosure(cards)
+
+
+def _paths(face, keys=frozenset(), cost=0.0):
+    # The recursive walk the closure replaces: every (face, keys, cost) along every path.
+    yield face, keys, cost
+    for _, requirements, upgraded in face.upgrades:
+        yield from _paths(
+            upgraded,
+            keys
+            | {
+                sidcon.upgrade_index.canonical(u)
+                for u in requirements
+                if not isinstance(u, PurpleConverter)
+            },
+            cost + sum(u.min_input_value for u in requirements if isinstance(u, PurpleConverter)),
+        )
+
+
+def _best_by_walk(card, known):
+    reachable = [(f, c) for f, keys, c in _paths(card.front) if keys <= known]
+    return max(reachable, key=lambda fc: (face_value(fc[0]), -fc[1]))
+
+
+class TestMask(object):
+    def test_round_trip(self):
+        keys = [AntimatterPower, FactionSpecificUpgradeCondition.TRIPLES]
+        assert sidcon.closure.keys(sidcon.closure.mask(keys)) == keys
+
+    def test_donation(self):
+        assert sidcon.closure.mask([DonationAntimatterPower]) == sidcon.closure.mask(
+            [AntimatterPower]
+        )
+
+    def test_popcount(self):
+        masks = np.array([0, 1, 0b1011, (1 << 32) - 1], dtype=np.int64)
+        np.testing.assert_array_equal(sidcon.closure.popcount(masks), [0, 1, 3, 32])
+
+
+class TestUpgradeClosure(object):
+    def test_faces_are_distinct(self, cards, closure):
+        for i, c in enumerate(cards):
+            start, stop = closure.face_offsets[i], closure.face_offsets[i + 1]
+            faces = closure.faces[slice(start, stop)]
+            assert faces[0] is c.front
+            assert {id(f) for f in faces} == {id(f) for f, _, _ in _paths(c.front)}
+            assert len({id(f) for f in faces}) == len(faces)
+
+    def test_kt_states_stored_once(self, cards, closure):
+        for c in cards:
+            if isinstance(c, KtDualCard):
+                assert len(closure.reachable(c, known=-1)) == len(list(c.states()))
+
+    @pytest.mark.parametrize(
+        "known",
+        [
+            frozenset(),
+            frozenset([AntimatterPower]),
+            frozenset(sidcon.closure.requirement_keys),
+        ],
+    )
+    def test_best_matches_walk(self, cards, closure, known):
+        m = sidcon.closure.mask(known)
+        best_faces = closure.best_faces(m)
+        for i, c in enumerate(cards):
+            face, cost = _best_by_walk(c, known)
+            best = closure.best(c, m)
+            assert best.value == pytest.approx(face_value(face))
+            assert best.cost == pytest.approx(cost)
+            assert set(best.requirements) <= known
+            assert closure.faces[best_faces[i]] is best.face
+
+    def test_reachable_front_first(self, cards, closure):
+        for c in cards[:50]:
+            reachable = closure.reachable(c)
+            assert reachable[0].face is c.front
+            assert reachable[0].requirements == []
+
+
+class TestCardIndex(object):
+    def test_best_reachable(self, cards):
+        index = CardIndex(cards)
+        for card in index.upgrade_targets(AntimatterPower):
+            assert index.best_reachable(card).requirements == []
+            best = index.best_reachable(card, sidcon.closure.requirement_keys)
+            assert best.value == max(face_value(f) for f in card.front.reachable_faces)
@@ -0,0 +1,55 @@
+import numpy as np
+
+import sidcon.columnar
+import sidcon.parse
+
+
+class TestColumnar(object):
+    def test_round_trip(self, tmp_path):
+        cards = sidcon.parse.all_cards()
+        directory = str(tmp_path / "columns")
+        sidcon.columnar.export(cards, directory)
+        got = sidcon.columnar.load(directory)
+        want = sidcon.columnar.build(cards)
+        assert set(got) == set(want)
+        for name in want:
+            assert isinstance(got[name], np.memmap)
+            np.testing.assert_array_equal(got[name], want[name])
+
+    def test_npz(self, tmp_path):
+        cards = sidcon.parse.all_cards()
+        path = str(tmp_path / "columns.npz")
+        sidcon.columnar.export_npz(cards, path)
+        got = sidcon.columnar.load(path)
+        np.testing.assert_array_equal(
+            got["alternative.counts"], sidcon.columnar.build(cards)["alternative.counts"]
+        )
+
+    def test_fronts(self):
+        cards = sidcon.parse.all_cards()
+        columns = sidcon.columnar.Columns(sidcon.columnar.build(cards))
+        fronts = np.flatnonzero(columns["face.depth"] == 0)
+        assert len(fronts) == len(cards)
+        assert [columns.string("face.card_name", i) for i in fronts] == [c.name for c in cards]
+
+    def test_parents(self):
+        columns = sidcon.columnar.build(sidcon.parse.all_cards())
+        upgraded = np.flatnonzero(columns["face.depth"] > 0)
+        parents = columns["face.parent"][upgraded]
+        np.testing.assert_array_equal(
+            columns["face.depth"][parents], columns["face.depth"][upgraded] - 1
+        )
+        np.testing.assert_array_equal(
+            columns["face.card_index"][parents], columns["face.card_index"][upgraded]
+        )
+
+    def test_values_match_counts(self):
+        columns = sidcon.columnar.build(sidcon.parse.all_cards())
+        unit_values = np.nan_to_num(columns["unit.value"])
+        np.testing.assert_allclose(
+            columns["alternative.counts"] @ unit_values, columns["alternative.value"]
+        )
+        np.testing.assert_allclose(
+            columns["alternative.donation_counts"] @ unit_values,
+            columns["alternative.donation_value"],
+        )
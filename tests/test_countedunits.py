@@ -1,7 +1,22 @@
+import itertools
+
 import pytest
 
 import sidcon.countedunits
-from sidcon.unit import Green, Ultratech, Blue
+from sidcon.unit import (
+    AnyColony,
+    AnyLarge,
+    AnySmall,
+    Blue,
+    Brown,
+    DesertColony,
+    Green,
+    Ship,
+    SmallWild,
+    Ultratech,
+    White,
+    Yellow,
+)
 
 
 class TestAdd(object):
@@ -47,3 +62,69 @@ class TestSubtract(object):
     def test_raises_ValueError(self, left, right):
         with pytest.raises(ValueError):
             _ = sidcon.countedunits.subtract(left, right)
+
+
+class TestPayment(object):
+    @pytest.mark.parametrize(
+        "held,inputs,want",
+        [
+            pytest.param(
+                {Green: 2, Ship: 1}, {Green: 1, Ship: 1}, {Green: 1, Ship: 1}, id="exact"
+            ),
+            pytest.param({White: 2, Brown: 1, Yellow: 1}, {AnySmall: 2}, {White: 2}, id="any"),
+            pytest.param(
+                {White: 1, Brown: 2}, {White: 1, AnySmall: 1}, {White: 1, Brown: 1}, id="mixed"
+            ),
+            pytest.param(
+                {White: 2, SmallWild: 1}, {Green: 1, White: 1}, {White: 1, SmallWild: 1}, id="wild"
+            ),
+            pytest.param(
+                {Yellow: 1, Blue: 1, DesertColony: 1},
+                {AnyLarge: 2, AnyColony: 1},
+                {Yellow: 1, Blue: 1, DesertColony: 1},
+                id="large_and_colony",
+            ),
+            pytest.param({White: 2}, {Green: 1}, None, id="wrong_kind"),
+            pytest.param({White: 1, Yellow: 3}, {AnySmall: 2}, None, id="wrong_class"),
+            pytest.param({Green: 2}, {Ship: 1}, None, id="missing"),
+        ],
+    )
+    def test_basic(self, held, inputs, want):
+        assert sidcon.countedunits.payment(held, inputs) == want
+
+    def test_keeps_wilds(self):
+        # Every payment is worth the same, so the wild is kept.
+        got = sidcon.countedunits.payment({White: 1, Green: 1, SmallWild: 1}, {AnySmall: 1})
+        assert got is not None and SmallWild not in got
+
+    def test_cheapest(self):
+        values = {White: 1.0, Brown: 2.0, Green: 2.0, SmallWild: 0.5}
+        held = {White: 3, Brown: 2, Green: 1, SmallWild: 2}
+        inputs = {White: 2, SmallWild: 2}
+        # The wilds pay for the whites, and the whites for the wilds.
+        got = sidcon.countedunits.payment(held, inputs, values)
+        assert got == {White: 2, SmallWild: 2}
+
+    def test_exact(self):
+        # Against every payment of every small input from a small holding.
+        values = {White: 1.0, Brown: 1.5, Green: 0.5, SmallWild: 0.75}
+        units = list(values)
+        held = {White: 1, Brown: 2, Green: 1, SmallWild: 1}
+        for counts in itertools.product(range(3), repeat=len(units) + 1):
+            inputs = {u: n for u, n in zip([*units, AnySmall], counts) if n}
+            got = sidcon.countedunits.payment(held, inputs, values)
+            best = None
+            for paid in itertools.product(*(range(held[u] + 1) for u in units)):
+                payment = dict(zip(units, paid))
+                concrete = [u for u in units if u is not SmallWild]
+                short = sum(max(inputs.get(u, 0) - payment[u], 0) for u in concrete)
+                if sum(paid) != sum(inputs.values()) or short > payment[SmallWild]:
+                    continue
+                cost = sum(values[u] * n for u, n in payment.items())
+                best = cost if best is None else min(best, cost)
+            if best is None:
+                assert got is None
+            else:
+                assert got is not None
+                assert sum(values[u] * n for u, n in got.items()) == best
+                assert all(n <= held[u] for u, n in got.items())
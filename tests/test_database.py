@@ -0,0 +1,41 @@
+import sidcon.database
+import sidcon.faction
+import sidcon.parse
+
+
+class TestDatabase(object):
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "cards.db")
+        cards = sidcon.parse.all_cards()
+        sidcon.database.export(cards, path)
+        assert sidcon.database.load(path) == cards
+
+    def test_load_where(self, tmp_path):
+        path = str(tmp_path / "cards.db")
+        cards = sidcon.parse.all_cards()
+        sidcon.database.export(cards, path)
+        got = sidcon.database.load(
+            path,
+            where="WHERE technology_id = (SELECT id FROM technologies WHERE name = ?)",
+            params=["Antimatter Power"],
+        )
+        assert len(got) == 9
+        assert {c.name for c in got} == {"Antimatter Power"}
+
+    def test_setup_cards_round_trip(self, tmp_path):
+        path = str(tmp_path / "cards.db")
+        cards = sidcon.parse.all_setup_cards()
+        sidcon.database.export(cards, path)
+        assert sidcon.database.load(path) == cards
+
+    def test_load_where_faction(self, tmp_path):
+        path = str(tmp_path / "cards.db")
+        cards = sidcon.parse.all_cards()
+        sidcon.database.export(cards, path)
+        for faction in sidcon.faction.name_to_faction.values():
+            got = sidcon.database.load(
+                path,
+                where="WHERE faction_id = (SELECT id FROM factions WHERE name = ?)",
+                params=[faction.faction_name],
+            )
+            assert got == [c for c in cards if getattr(c, "faction", None) is faction]
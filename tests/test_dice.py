@@ -0,0 +1,100 @@
+import itertools
+from collections import Counter
+
+import pytest
+
+import sidcon.dice
+import sidcon.parse
+from sidcon.cost import FactionSpecificCost
+from sidcon.dice import Roll, faces
+from sidcon.feature import UniqueFeature
+from sidcon.upgrade import FactionSpecificUpgradeCondition
+
+
+def _met(dice, condition):
+    counts = Counter(dice)
+    if condition == FactionSpecificCost.DEEP_UNITY_NOT_TRIPLES:
+        return len(dice) >= 3 and len(counts) > 1
+    if condition == FactionSpecificUpgradeCondition.TRIPLES:
+        return max(counts.values()) >= 3
+    n, face = sidcon.dice._needs[condition]
+    return counts[face] >= n
+
+
+def _brute_force(condition, dice, plus, minus):
+    """Tries every roll and every way of applying every subset of the modifiers."""
+    modifiers = [1] * plus + [-1] * minus
+    met = 0
+    for roll in itertools.product(range(faces), repeat=dice):
+        for targets in itertools.product(range(dice + 1), repeat=len(modifiers)):
+            modified = list(roll) + [0]
+            for target, m in zip(targets, modifiers):
+                modified[target] += m
+            modified = modified[:dice]
+            if all(0 <= d < faces for d in modified) and _met(modified, condition):
+                met += 1
+                break
+    return met / faces**dice
+
+
+class TestRoll(object):
+    @pytest.mark.parametrize(
+        "dice,plus,minus", [(1, 0, 0), (2, 1, 0), (3, 0, 0), (3, 1, 0), (3, 0, 1), (3, 1, 1)]
+    )
+    def test_matches_brute_force(self, dice, plus, minus):
+        roll = Roll(dice=dice, plus=plus, minus=minus)
+        for condition in sidcon.dice.dice_conditions:
+            assert roll.probability(condition) == pytest.approx(
+                _brute_force(condition, dice, plus, minus)
+            ), condition
+
+    def test_closed_forms(self):
+        roll = Roll()
+        assert roll.probability(FactionSpecificCost.DEEP_UNITY_SINGLE_FOUR) == pytest.approx(
+            1 - (7 / 8) ** 3
+        )
+        assert roll.probability(FactionSpecificUpgradeCondition.TRIPLES) == pytest.approx(8 / 512)
+        assert roll.probability(FactionSpecificCost.DEEP_UNITY_NOT_TRIPLES) == pytest.approx(
+            1 - 8 / 512
+        )
+        assert Roll(dice=2).probability(FactionSpecificUpgradeCondition.TRIPLES) == 0.0
+
+    def test_many_dice(self):
+        roll = Roll(dice=10, plus=2, minus=2)
+        p = roll.probability(FactionSpecificUpgradeCondition.DOUBLE_SEVENS)
+        assert 0 < p < 1
+        assert roll.probability(FactionSpecificUpgradeCondition.DOUBLE_THREES) > p
+
+    def test_expected(self):
+        roll = Roll()
+        condition = FactionSpecificUpgradeCondition.TRIPLES
+        p = roll.probability(condition)
+        assert roll.expected_rounds(condition) == pytest.approx(1 / p)
+        assert roll.expected_rounds_held(condition, 1) == pytest.approx(p)
+        assert roll.expected_value(2.0, condition, 2) == pytest.approx(
+            2.0 * (p + 1 - (1 - p) ** 2)
+        )
+        assert Roll(dice=2).expected_rounds(condition) == float("inf")
+
+    def test_not_a_dice_condition(self):
+        with pytest.raises(ValueError):
+            Roll().probability(FactionSpecificCost.JII_CONSTRAINT)
+
+    def test_from_features(self):
+        roll = Roll.from_features(
+            [
+                UniqueFeature.PLUS_ONE_TO_A_DIE,
+                UniqueFeature.PLUS_ONE_TO_A_DIE,
+                UniqueFeature.MINUS_ONE_TO_A_DIE,
+            ]
+        )
+        assert roll == Roll(plus=2, minus=1)
+
+
+class TestDiceCosts(object):
+    def test_dice_costs(self):
+        costs = sidcon.dice.dice_costs(sidcon.parse.all_cards())
+        assert len(costs) == 9
+        assert {cost for _, cost in costs} == set(FactionSpecificCost) & set(
+            sidcon.dice.dice_conditions
+        )
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import sidcon.faction
+import sidcon.parse
+from sidcon.faction import CharitySyndicate, DeepUnity, ShallowUnity, ZethAnocracy
+from sidcon.faction_comparison import FactionComparison, alternates, header, metrics
+from sidcon.index import CardIndex
+
+
+@pytest.fixture(scope="module")
+def games():
+    return sidcon.parse.faction_games_from_filepath()
+
+
+@pytest.fixture(scope="module")
+def comparison():
+    return FactionComparison(CardIndex(sidcon.parse.all_cards()))
+
+
+class TestFactionGames(object):
+    def test_games(self, games):
+        assert len(games) == len(sidcon.faction.name_to_faction)
+        assert sum(g == "Base" for g in games.values()) == 9
+        assert set(games.values()) == {"Base", "Bifurcation"}
+
+    def test_alternates(self, games):
+        pairs = alternates(games)
+        assert len(pairs) == 9
+        assert (ZethAnocracy, CharitySyndicate) in pairs
+        assert (ShallowUnity, DeepUnity) in pairs
+        for base, alternate in pairs:
+            assert sidcon.faction.to_species[base] == sidcon.faction.to_species[alternate]
+
+
+class TestFactionComparison(object):
+    def test_undesirable_sensitivity(self, comparison):
+        assert comparison.measure(CharitySyndicate, 0)["undesirable_sensitivity"] > 0
+        assert comparison.measure(ZethAnocracy, 0)["undesirable_sensitivity"] == 0
+
+    def test_no_starting_cards(self, comparison):
+        measured = comparison.measure(DeepUnity, 0)
+        assert np.isnan(measured["starting_economy"])
+        assert np.isfinite(measured["tech_gain"])
+
+    def test_rows(self, comparison, games):
+        rows = comparison.rows(alternates(games), 0)
+        assert len(rows) == 9 * len(metrics)
+        assert all(len(r) == len(header) for r in rows)
+        assert [r[1] for r in rows[: len(metrics)]] == list(metrics)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from sidcon.feasibility import FeasibilityIndex
+
+
+@pytest.fixture(scope="module")
+def index(catalogue):
+    return FeasibilityIndex(catalogue)
+
+
+def _affordable(table):
+    c = table.catalogue
+    return c.input_ok[table.tableau] & table._affordable(c.inputs[table.tableau])
+
+
+class TestFeasibilityIndex(object):
+    def test_matches_table(self, index, warm_table):
+        feasible = index.feasible(warm_table.inventory, warm_table.tableau)
+        assert (feasible == _affordable(warm_table)).all()
+        assert feasible.any() and not feasible.all()
+
+    def test_runnable(self, index, warm_table):
+        runnable = index.runnable(warm_table.inventory, warm_table.tableau)
+        assert (runnable == _affordable(warm_table).any(axis=-1)).all()
+
+    def test_empty_inventory(self, index, warm_table):
+        # Only converters that take nothing can run with nothing.
+        empty = np.zeros_like(warm_table.inventory)
+        free = index.catalogue.input_ok[warm_table.tableau] & ~index.catalogue.inputs[
+            warm_table.tableau
+        ].any(axis=-1)
+        assert (index.feasible(empty, warm_table.tableau) == free).all()
+
+
+class TestFeasibility(object):
+    def test_update_inventory(self, index, warm_table):
+        feasibility = index.track(warm_table.inventory, warm_table.tableau)
+        rng = np.random.default_rng(1)
+        for _ in range(10):
+            change = rng.integers(-2, 3, size=warm_table.inventory.shape)
+            change[rng.random(warm_table.inventory.shape[:2]) < 0.5] = 0
+            warm_table.inventory = np.maximum(warm_table.inventory + change, 0)
+            feasibility.update(warm_table.inventory)
+            assert (feasibility.feasible == _affordable(warm_table)).all()
+
+    def test_update_tableau(self, index, warm_table):
+        feasibility = index.track(warm_table.inventory, warm_table.tableau)
+        warm_table.step()
+        feasibility.update(warm_table.inventory, warm_table.tableau)
+        assert (feasibility.feasible == _affordable(warm_table)).all()
+        assert (feasibility.runnable == _affordable(warm_table).any(axis=-1)).all()
@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+
+import sidcon.closure
+import sidcon.game
+import sidcon.parse
+from sidcon.faction import (
+    CaylionCollaborative,
+    CaylionPlutocracy,
+    GrandFleet,
+    ImdrilNomads,
+    KtZrKtRtlAdhocracy,
+)
+from sidcon.game import Table, resources
+from sidcon.unit import (
+    AnyColony,
+    AnySmall,
+    DesertColony,
+    Green,
+    IceColony,
+    LargeWild,
+    OceanColony,
+    Ship,
+    SmallWild,
+    VictoryPoint,
+    White,
+    Yellow,
+)
+
+
+def _column(u):
+    return resources.index(u)
+
+
+class TestStartingResources(object):
+    def test_caylion_plutocracy(self):
+        assert sidcon.game.starting_resources(CaylionPlutocracy) == {
+            AnyColony: 1,
+            sidcon.unit.Black: 2,
+            Green: 5,
+            White: 4,
+            sidcon.unit.Brown: 2,
+            Ship: 1,
+        }
+
+    def test_counts_before_units(self):
+        starting = sidcon.game.starting_resources(GrandFleet)
+        assert starting[Green] == 5
+        assert starting[White] == 4
+        assert starting[Ship] == 3
+
+
+class TestEncode(object):
+    def test_groups(self):
+        encoded, donated = sidcon.game.encode({Yellow: 2, AnySmall: 1, LargeWild: 3})
+        assert encoded[_column(Yellow)] == 2
+        assert encoded[sidcon.game.resource_count] == 1
+        assert encoded[sidcon.game.resource_count + 1] == 3
+        assert donated == 0
+
+    def test_donation(self):
+        # Donations are given away, not kept.
+        encoded, donated = sidcon.game.encode({Yellow: 1, sidcon.unit.DonationYellow: 2})
+        assert encoded[_column(Yellow)] == 1
+        assert donated == 2 * Yellow.value
+        assert sidcon.game.encode({sidcon.unit.DonationEnvoy: 1}) is not None
+
+    def test_unmodelled(self):
+        assert sidcon.game.encode({sidcon.unit.Envoy: 1}) is None
+
+
+class TestTable(object):
+    def test_players(self, catalogue, factions):
+        with pytest.raises(ValueError):
+            Table(catalogue, factions[:2])
+        with pytest.raises(ValueError):
+            Table(catalogue, factions * 2)
+
+    def test_setup(self, catalogue, factions):
+        table = Table(catalogue, factions, games=3)
+        assert table.inventory.shape == (3, len(factions), len(resources))
+        assert table.inventory[0, 0, _column(Green)] == 5
+        assert (table.inventory == table.inventory[0]).all()
+        assert (table.tableau[:, 1] > 0).sum(axis=-1).tolist() == [10, 10, 10]
+        assert table.tiebreaker.tolist() == [f.tiebreaker for f in factions]
+
+    def test_batched_games_agree(self, catalogue, factions):
+        one = Table(catalogue, factions, games=1)
+        many = Table(catalogue, factions, games=7)
+        for _ in range(4):
+            one.step()
+            many.step()
+        assert (many.inventory == one.inventory).all()
+        assert (many.donated == one.donated).all()
+
+    def test_economy_never_overdraws(self, catalogue, factions):
+        table = Table(catalogue, factions, games=2)
+        for _ in range(8):
+            table.step()
+            assert (table.inventory >= 0).all()
+
+    def test_wild_gain_and_any_pay(self, catalogue, factions):
+        table = Table(catalogue, factions, games=1)
+        table.inventory[:] = 0
+        table.inventory[0, 0, _column(White)] = 2
+        everyone = np.ones((1, len(factions)), dtype=bool)
+
+        gain, _ = sidcon.game.encode({SmallWild: 3})
+        table._gain(np.broadcast_to(gain, (1, len(factions), gain.size)), everyone)
+        # The wilds go to the smalls the player has least of.
+        assert table.inventory[0, 0, _column(White)] == 2
+        assert table.inventory[0, 0, [_column(sidcon.unit.Brown), _column(Green)]].tolist() == [
+            2,
+            1,
+        ]
+
+        need, _ = sidcon.game.encode({AnySmall: 2})
+        need = np.broadcast_to(need, (1, len(factions), need.size))
+        assert table._affordable(need).all()
+        table._pay(need, everyone)
+        smalls = [_column(White), _column(sidcon.unit.Brown), _column(Green)]
+        assert table.inventory[0, 1, smalls].tolist() == [0, 0, 1]
+
+    def test_colony_support(self, catalogue):
+        table = Table(catalogue, [ImdrilNomads, KtZrKtRtlAdhocracy, CaylionCollaborative])
+        gain, _ = sidcon.game.encode({DesertColony: 2, IceColony: 2, OceanColony: 1})
+        table._gain(np.broadcast_to(gain, (1, 3, gain.size)), np.ones((1, 3), dtype=bool))
+        colonies = table.inventory[..., sidcon.game.groups[sidcon.game.colony_group]]
+        # Kt'Zr'Kt'Rtl Adhocracy starts with a colony.
+        assert colonies.sum(axis=-1)[0].tolist() == [0, 6, 3]
+
+    def test_upgrade(self, catalogue, factions):
+        table = Table(catalogue, factions, games=2)
+        table.inventory += 100
+        table.research(sidcon.closure.requirement_keys, games=[1])
+        table.upgrade()
+        assert (table.tableau[0] == Table(catalogue, factions).tableau[0]).all()
+        upgradable = (catalogue.upgrade_target[table.tableau[1]] >= 0).any(axis=-1)
+        assert not upgradable.any()
+
+    def test_acquire(self, catalogue, factions):
+        table = Table(catalogue, factions, games=2)
+        card = catalogue.cards[0]
+        slots = table.tableau.shape[2]
+        table.acquire(card, player=1)
+        assert table.tableau.shape[2] == slots + 1
+        assert (table.tableau[:, 1, -1] == catalogue.front(card)).all()
+        table.acquire(card, player=0, games=[1])
+        assert (table.tableau[:, 0] == catalogue.front(card)).sum(axis=-1).tolist() == [0, 1]
+
+    def test_standings(self, catalogue, factions):
+        table = Table(catalogue, factions, games=2)
+        table.inventory[:] = 0
+        table.inventory[1, 3, _column(VictoryPoint)] = 1
+        by_tiebreaker = np.argsort([-f.tiebreaker for f in factions], kind="stable")
+        assert table.standings()[0].tolist() == by_tiebreaker.tolist()
+        assert table.standings()[1, 0] == 3
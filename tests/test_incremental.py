@@ -0,0 +1,58 @@
+import shutil
+
+import pytest
+
+import sidcon.parse
+from sidcon.card import KtDualCard
+from sidcon.incremental import IncrementalLoader
+
+
+@pytest.fixture
+def data_files(tmp_path):
+    copies = []
+    for fname in sidcon.parse.filenames:
+        copy = tmp_path / fname.split("/")[-1]
+        shutil.copy(fname, copy)
+        copies.append(str(copy))
+    return copies
+
+
+def _edit(fname, old, new):
+    with open(fname) as f:
+        text = f.read()
+    assert old in text
+    with open(fname, "w") as f:
+        f.write(text.replace(old, new, 1))
+
+
+class TestIncrementalLoader(object):
+    def test_matches_full_parse(self, data_files):
+        loader = IncrementalLoader(data_files)
+        got = loader.all_cards()
+        want = [c for fname in data_files for c in sidcon.parse.cards_from_filepath(fname)]
+        assert len(got) == len(want)
+        assert [c.name for c in got] == [c.name for c in want]
+        assert loader.last_stats.reused == 0
+
+    def test_unchanged_files_are_not_reloaded(self, data_files):
+        loader = IncrementalLoader(data_files)
+        loader.all_cards()
+        assert not loader.reload()
+
+    def test_rebuilds_only_changed_row(self, data_files):
+        loader = IncrementalLoader(data_files)
+        before = loader.all_cards()
+        _edit(data_files[0], "bbb➪Ug,", "bbb➪UU,")
+        after = loader.all_cards()
+        assert loader.last_stats.rebuilt == 1
+        changed = [a for a, b in zip(after, before) if a is not b]
+        assert [c.name for c in changed] == ["Nanotechnology"]
+
+    def test_rebuilds_kt_partner(self, data_files):
+        loader = IncrementalLoader(data_files)
+        loader.all_cards()
+        _edit(data_files[0], "Diffusion,0,Starting,➪TYB****", "Diffusion,0,Starting,➪TYB***")
+        after = loader.all_cards()
+        assert loader.last_stats.rebuilt == 1
+        (kt,) = [c for c in after if isinstance(c, KtDualCard) and "Diffusion" in c.name]
+        assert kt.name == "Expansive Social Diffusion"
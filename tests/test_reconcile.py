@@ -0,0 +1,90 @@
+import os
+
+import sidcon.card
+import sidcon.reconcile
+from sidcon.face import Face
+from sidcon.reconcile import reconcile, sheet_candidates
+from sidcon.row import Column, SheetValues
+
+_header = (
+    "s,Faction,Front Name,Era,Cost,Front Factory,Upgrade1,Upgrade2,Back Name,Back Factory,Input,"
+    "Front Output,Front Efficiency,Back Output,Back Efficiency,Upgrades"
+)
+
+_rows = [
+    # Every value agrees.
+    "1,Caylion Plutocracy,Nanotechnology,1,Researched,bbb➪Ug,Genetic Engineering,"
+    "Atomic Transmutation,Nanofabricators,bbb➪UgY,3,4,1.333,5.5,1.833,1.375",
+    # No input, so the sheet's efficiencies are 1000.
+    "20,Caylion Plutocracy,Planetary Ecological Dominance,0,Starting,➪gggw*,TTJ→$Y,"
+    "Genetic Engineering,Systemwide Gravitic Dominance,➪gggwT*,0,5,1000.000,6.5,1000.000,1.300",
+    # Only one converter can be fed, so the input value is the largest input, 3 rather than 6.
+    '3,Caylion Plutocracy,Parallel Factories,1,Researched,"bbb➪Ug,ggg➪YBb §",,,,,3,8,2.667,,,',
+    # The front output is wrong; blank cells aren't checked.
+    "4,Caylion Plutocracy,Miscounted Factory,1,Researched,bbb➪Ug,,,,,3,5,1.333,,,",
+    # A Kt'Zr'Kt'Rtl dual card, valued as a whole on its left half's row.
+    "176,Kt'Zr'Kt'Rtl Adhocracy,High-Risk Laboratories,0,Starting,➪wgbb,Hyperspace Mining,"
+    "Singularity Control,Stellar Power Harnessing,➪wwggbb,,,,,,",
+    "177,Kt'Zr'Kt'Rtl Adhocracy,Anarchic Sacrificial,0,Starting,U➪,Clinical Immortality,"
+    "Universal Translator,Polysystem,U➪B,3,4,1.333,7.5,2.500,1.875",
+]
+
+
+class TestSheetCandidates(object):
+    def test_single(self):
+        assert sheet_candidates("4.5") == {4.5}
+        assert sheet_candidates("-1") == {-1.0}
+
+    def test_alternatives(self):
+        assert sheet_candidates("(1.5 or 4)") == {1.5, 4.0}
+        assert sheet_candidates("([0] / 1.5 /2)") == {0.0, 1.5, 2.0}
+
+    def test_empty(self):
+        assert sheet_candidates("") == frozenset()
+
+
+class TestCandidates(object):
+    def test_max_input(self):
+        face = Face.from_strings("Parallel Factories", ["bbb➪Ug", "ggg➪YBb"])
+        assert sidcon.reconcile._input_candidates(face, max_input=False) == {6.0}
+        assert sidcon.reconcile._input_candidates(face, max_input=True) == {3.0}
+
+    def test_zero_input_efficiency(self):
+        ratios = sidcon.reconcile._ratio_candidates(
+            frozenset([5.0]), frozenset([0.0, 2.0]), 1000.0
+        )
+        assert ratios == {1000.0, 2.5}
+        assert (
+            sidcon.reconcile._ratio_candidates(frozenset([5.0]), frozenset([0.0]), None) == set()
+        )
+
+
+class TestReconcile(object):
+    def test_fixture(self, tmp_path):
+        path = tmp_path / "cards.csv"
+        path.write_text("\n".join([_header, *_rows]) + "\n")
+        got = reconcile(str(path))
+        assert [(d.card_number, d.column, d.sheet, d.computed) for d in got] == [
+            ("4", Column.FRONT_OUTPUT_VALUE, "5", {4.0})
+        ]
+
+    def test_sheet_values(self):
+        values = SheetValues.from_dict(dict(zip(_header.split(","), _rows[0].split(","))))
+        assert values.get(Column.INPUT_VALUE) == "3"
+        assert values.get(Column.UPGRADES) == "1.375"
+
+    def test_all(self):
+        got = {
+            (os.path.basename(d.filepath), d.front_name, d.column)
+            for d in sidcon.reconcile.reconcile_all()
+        }
+        # Known disagreements between the sheets and the parsed faces.
+        assert {
+            ("cards.csv", "Asteroid Mining", Column.INPUT_VALUE),
+            ("cards.csv", "Hand Crafted", Column.FRONT_OUTPUT_VALUE),
+            ("bifurcation-cards.csv", "Hydrothermal Smelting", Column.BACK_OUTPUT_VALUE),
+        } <= got
+        # Every other Kt'Zr'Kt'Rtl dual card agrees once its halves are paired.
+        names = {name for _, name, _ in got}
+        for half in sidcon.card.kt_card_name_mapping:
+            assert half == "Hand Crafted" or half not in names
@@ -0,0 +1,20 @@
+import pytest
+
+import sidcon.research
+import sidcon.technology
+from sidcon.technology import AntimatterPower, DonationAntimatterPower, Era
+
+
+class TestResearch(object):
+    def test_all_research_teams(self):
+        teams = sidcon.research.all_research_teams()
+        assert len(teams) == 41
+        assert {t.era for t in teams} == set(Era)
+        assert all((t.technology is None) == (t.era == Era.IV) for t in teams)
+
+    def test_research_costs(self):
+        costs = sidcon.research.research_costs()
+        assert set(costs) == set(sidcon.technology.name_to_technology.values())
+        assert costs[DonationAntimatterPower] == costs[AntimatterPower]
+        # Quantum Theoreticians: g9/T6, either of which is worth 9.
+        assert costs[AntimatterPower].min_input_value == pytest.approx(9.0)
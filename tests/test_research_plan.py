@@ -0,0 +1,104 @@
+import itertools
+
+import pytest
+
+import sidcon.faction
+import sidcon.parse
+from sidcon.research_plan import ResearchPlanner, even_schedule
+from sidcon.technology import (
+    AntimatterPower,
+    ClinicalImmortality,
+    Era,
+    GeneticEngineering,
+    HyperspaceMining,
+    Megastructures,
+    QuantumComputers,
+)
+
+technologies = [
+    ClinicalImmortality,
+    GeneticEngineering,
+    QuantumComputers,
+    AntimatterPower,
+    HyperspaceMining,
+    Megastructures,
+]
+schedule = [Era.I, Era.II, Era.II, Era.III]
+
+
+@pytest.fixture(scope="module")
+def planner():
+    caylion = sidcon.faction.name_to_faction["Caylion Plutocracy"]
+    return ResearchPlanner.for_factions(
+        sidcon.parse.all_cards(), [caylion], technologies=technologies
+    )
+
+
+def _score(planner, order, known=()):
+    score = 0.0
+    known = list(known)
+    for step, t in enumerate(order):
+        before = planner.value(known)
+        known.append(t)
+        score += (planner.value(known) - before) * (len(schedule) - step)
+        score -= planner.costs[planner.technologies.index(t)]
+    return score
+
+
+def _allowed(order):
+    eras = [t.era for t in order]
+    return eras == sorted(eras) and all(t.era <= e for t, e in zip(order, schedule))
+
+
+class TestResearchPlanner(object):
+    def test_best_matches_brute_force(self, planner):
+        orders = [
+            order
+            for n in range(len(schedule) + 1)
+            for order in itertools.permutations(technologies, n)
+            if _allowed(order)
+        ]
+        want = max(_score(planner, o) for o in orders)
+        plan = planner.best(schedule)
+        assert _allowed(plan.technologies)
+        assert plan.score == pytest.approx(want)
+        assert _score(planner, plan.technologies) == pytest.approx(want)
+
+    def test_best_with_known(self, planner):
+        known = planner.known([ClinicalImmortality])
+        plan = planner.best(schedule, known=known)
+        assert ClinicalImmortality not in plan.technologies
+
+    def test_best_with_later_era_known(self, planner):
+        orders = [
+            order
+            for n in range(len(schedule) + 1)
+            for order in itertools.permutations(
+                [t for t in technologies if t is not Megastructures], n
+            )
+            if _allowed(order)
+        ]
+        want = max(_score(planner, o, known=[Megastructures]) for o in orders)
+        plan = planner.best(schedule, known=planner.known([Megastructures]))
+        assert plan.technologies
+        assert _allowed(plan.technologies)
+        assert plan.score == pytest.approx(want)
+
+    def test_cheapest_matches_brute_force(self, planner):
+        target = planner.values.max() / 2
+        subsets = [
+            s
+            for n in range(len(technologies) + 1)
+            for s in itertools.combinations(technologies, n)
+            if planner.value(s) >= target
+        ]
+        want = min(sum(planner.costs[planner.technologies.index(t)] for t in s) for s in subsets)
+        plan = planner.cheapest(target)
+        assert plan is not None
+        assert plan.cost == pytest.approx(want)
+        assert planner.value(plan.technologies) >= target
+        assert planner.cheapest(planner.values.max() + 1) is None
+
+    def test_even_schedule(self):
+        assert even_schedule(6) == [Era.I, Era.I, Era.II, Era.II, Era.III, Era.III]
+        assert len(even_schedule(21)) == 21
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import sidcon.parse
+import sidcon.rollout
+from sidcon.card import DualFacedColonyCard, TechnologyCard
+from sidcon.rollout import RolloutRunner
+
+
+class TestMarket(object):
+    def test_species_in_play(self, catalogue, factions):
+        market = sidcon.rollout.market(catalogue.cards, factions)
+        species = {c.species for c in market if isinstance(c, TechnologyCard)}
+        # Nobody plays the Kjasjavikalimm.
+        assert {s.__name__ for s in species} == {
+            "Caylion",
+            "EniEt",
+            "Faderan",
+            "Imdril",
+            "KtZrKtRtl",
+            "Unity",
+            "Yengii",
+            "Zeth",
+        }
+        assert sum(isinstance(c, DualFacedColonyCard) for c in market) == 40
+
+
+class TestPlay(object):
+    def test_seeded(self, catalogue, factions):
+        a = sidcon.rollout.play(catalogue, factions, 50, 4, np.random.default_rng(1))
+        b = sidcon.rollout.play(catalogue, factions, 50, 4, np.random.default_rng(1))
+        assert a.to_json() == b.to_json()
+        assert a.games == 50
+        assert a.wins.sum() == 50
+        assert (a.technologies <= 4 * 50).all()
+
+    def test_add(self, catalogue, factions):
+        a = sidcon.rollout.play(catalogue, factions, 10, 1, np.random.default_rng(1))
+        b = sidcon.rollout.play(catalogue, factions[::-1], 10, 1, np.random.default_rng(1))
+        assert (a + a).games == 20
+        with pytest.raises(ValueError):
+            a + b
+
+
+class TestRolloutRunner(object):
+    def test_parallel_matches_serial(self, catalogue, factions):
+        runner = RolloutRunner(catalogue, factions, turns=3, chunk=40, seed=7, workers=2)
+        partial = list(runner.run(150))
+        assert [o.games for o in partial][-1] == 150
+        assert len(partial) == 4
+        assert partial[-1].to_json() == runner.run_serially(150).to_json()
+
+    def test_chunks_independent_of_workers(self, catalogue, factions):
+        one = RolloutRunner(catalogue, factions, turns=2, chunk=30, seed=3, workers=1)
+        two = RolloutRunner(catalogue, factions, turns=2, chunk=30, seed=3, workers=2)
+        assert list(one.run(60))[-1].to_json() == list(two.run(60))[-1].to_json()
@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+import pytest
+
+from sidcon.index import CardIndex
+from sidcon.service import Service, serve
+
+
+@pytest.fixture(scope="module")
+def service():
+    return Service(CardIndex.from_files())
+
+
+# Parameters of the wrong JSON type.
+_badly_typed = [
+    {"op": ["card", "values"]},
+    {"op": "card", "name": 5},
+    {"op": "card", "name": ["a", "b"]},
+    {"op": "card", "name": None},
+    {"op": "tableau", "faction": {}},
+    {"op": "upgrade_targets", "technology": None},
+    {"op": "faction_values", "undesirable_limit": None},
+    {"op": "faction_values", "undesirable_limit": 1.5},
+    {"op": "faction_values", "undesirable_limit": "three"},
+    {"op": "faction_values", "undesirable_limit": 3, "species_in_play": 5},
+    {"op": "faction_values", "undesirable_limit": 3, "species_in_play": ["Caylion", 5]},
+]
+
+
+async def _exchange(service, requests):
+    """Sends each (head, body) over one connection and returns each (status, payload)."""
+    server = await serve(service, port=0)
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    got = []
+    for head, body in requests:
+        writer.write(head + body)
+        await writer.drain()
+        status = (await reader.readline()).split()[1]
+        headers = {}
+        while (line := await reader.readline()) != b"\r\n":
+            key, _, value = line.decode().partition(":")
+            headers[key.lower()] = value.strip()
+        payload = json.loads(await reader.readexactly(int(headers["content-length"])))
+        got.append((int(status), payload))
+    writer.close()
+    server.close()
+    await server.wait_closed()
+    return got
+
+
+class TestService(object):
+    def test_card(self, service):
+        got = service.handle({"op": "card", "name": "antimatter power"})
+        assert {c["name"] for c in got["cards"]} == {"Antimatter Power"}
+        assert all(c["type"] == "TechnologyCard" for c in got["cards"])
+
+    def test_tableau(self, service):
+        got = service.handle({"op": "tableau", "faction": "Caylion Plutocracy"})
+        assert got["faction"] == "Caylion Plutocracy"
+        assert got["cards"]
+        assert all(c["faction"] == "Caylion Plutocracy" for c in got["cards"])
+
+    def test_upgrade_targets(self, service):
+        got = service.handle({"op": "upgrade_targets", "technology": "Antimatter Power"})
+        assert got["cards"]
+
+    def test_faction_values(self, service):
+        got = service.handle(
+            {"op": "faction_values", "undesirable_limit": 3, "species_in_play": ["Caylion"]}
+        )
+        assert got["factions"]["Caylion Plutocracy"]["max_input_value"] == 6.5
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            [],
+            {"name": "Antimatter Power"},
+            {"op": "nope"},
+            {"op": "card"},
+            {"op": "card", "name": "No Such Card"},
+            {"op": "tableau", "faction": "No Such Faction"},
+        ],
+    )
+    def test_errors(self, service, query):
+        assert "error" in service.handle(query)
+
+    @pytest.mark.parametrize("query", _badly_typed)
+    def test_badly_typed(self, service, query):
+        assert "error" in service.handle(query)
+
+    def test_get_integer(self, service):
+        got = service.handle({"op": "faction_values", "undesirable_limit": ["3"]})
+        assert "Caylion Plutocracy" in got["factions"]
+
+    def test_http(self, service):
+        batch = json.dumps([{"op": "card", "name": "Antimatter Power"}, {"op": "nope"}]).encode()
+        (status1, single), (status2, batch), (status3, _) = asyncio.run(
+            _exchange(
+                service,
+                [
+                    (b"GET /card?name=Antimatter+Power HTTP/1.1\r\n\r\n", b""),
+                    (f"POST / HTTP/1.1\r\nContent-Length: {len(batch)}\r\n\r\n".encode(), batch),
+                    (b"GET /nope HTTP/1.1\r\nConnection: close\r\n\r\n", b""),
+                ],
+            )
+        )
+        assert status1 == 200 and single["cards"][0]["name"] == "Antimatter Power"
+        assert status2 == 200 and len(batch) == 2 and "error" in batch[1]
+        assert status3 == 404
+
+    @pytest.mark.parametrize("query", _badly_typed)
+    def test_http_badly_typed(self, service, query):
+        body = json.dumps(query).encode()
+        ((status, payload),) = asyncio.run(
+            _exchange(
+                service,
+                [(f"POST / HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode(), body)],
+            )
+        )
+        assert status == 200 and "error" in payload
+
+    def test_http_internal_error(self, service, monkeypatch):
+        def fail(_):
+            raise RuntimeError("bug")
+
+        monkeypatch.setitem(service._ops, "card", fail)
+        (status1, payload), (status2, _) = asyncio.run(
+            _exchange(
+                service,
+                [
+                    (b"GET /card?name=Antimatter+Power HTTP/1.1\r\n\r\n", b""),
+                    (b"GET /values?name=Antimatter+Power HTTP/1.1\r\n\r\n", b""),
+                ],
+            )
+        )
+        assert status1 == 500 and "error" in payload
+        assert status2 == 200
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import sidcon.parse
+import sidcon.state
+from sidcon.game import Table
+from sidcon.state import EconomySearch, GameState
+
+
+@pytest.fixture()
+def table(catalogue, factions):
+    return Table(catalogue, factions)
+
+
+def _replay(catalogue, player, decisions):
+    searched = {(slot, j): k for slot, j, k in decisions}
+    state = player
+    for slot, j in sidcon.state.converters(catalogue, player):
+        face = state.tableau[slot]
+        if (slot, j) in searched:
+            if searched[slot, j] is not None:
+                state = sidcon.state.run(catalogue, state, face, j, searched[slot, j])
+            continue
+        for k in np.flatnonzero(catalogue.input_ok[face, j]):
+            if state.affordable(catalogue.inputs[face, j, k]):
+                state = sidcon.state.run(catalogue, state, face, j, int(k))
+                break
+    return state
+
+
+class TestGameState(object):
+    def test_from_table(self, table, factions):
+        state = GameState.from_table(table)
+        assert [p.faction for p in state.players] == factions
+        for p, player in enumerate(state.players):
+            assert (player.inventory == table.inventory[0, p]).all()
+            assert not player.inventory.flags.writeable
+            assert len(player.tableau) == (table.tableau[0, p] != 0).sum()
+
+    def test_branching_shares(self, catalogue, table):
+        state = GameState.from_table(table)
+        card = catalogue.cards[0]
+        branch = state.acquire(catalogue, 1, card)
+        assert branch.players[1].tableau == state.players[1].tableau + (catalogue.front(card),)
+        assert all(branch.players[p] is state.players[p] for p in (0, 2, 3, 4))
+        assert branch.players[1].inventory is state.players[1].inventory
+
+    def test_paid_leaves_parent(self, catalogue, table):
+        player = GameState.from_table(table).players[0]
+        before = player.inventory.copy()
+        face = player.tableau[1]
+        after = sidcon.state.run(catalogue, player, face, 0, 0)
+        assert (player.inventory == before).all()
+        assert not (after.inventory == before).all()
+
+
+class TestEconomySearch(object):
+    def test_greedy_matches_table(self, catalogue, table):
+        state = GameState.from_table(table)
+        table.economy()
+        for p, player in enumerate(state.players):
+            greedy = EconomySearch(catalogue, 0)._greedy(
+                player, sidcon.state.converters(catalogue, player)
+            )
+            assert (greedy.inventory == table.inventory[0, p]).all()
+
+    def test_search_improves_on_greedy(self, catalogue, table):
+        state = GameState.from_table(table)
+        for p, player in enumerate(state.players):
+            greedy, _ = EconomySearch(catalogue, 0).best(state, p)
+            value, decisions = EconomySearch(catalogue, 6).best(state, p)
+            assert value >= greedy
+            assert _replay(catalogue, player, decisions).value == value
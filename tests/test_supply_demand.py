@@ -0,0 +1,100 @@
+from collections.abc import Mapping
+
+import numpy as np
+import pytest
+
+import sidcon.donation
+import sidcon.parse
+import sidcon.supply_demand
+from sidcon.card import CreatedCard
+from sidcon.converter import Converter
+from sidcon.supply_demand import (
+    CONVERTER,
+    CREATED,
+    DEMAND,
+    SUPPLY,
+    UPGRADE,
+    SupplyDemand,
+)
+from sidcon.unit import (
+    Blue,
+    Brown,
+    DesertColony,
+    Green,
+    Ship,
+    Ultratech,
+    VictoryPoint,
+    White,
+)
+
+
+@pytest.fixture(scope="module")
+def cards():
+    return sidcon.parse.all_cards()
+
+
+@pytest.fixture(scope="module")
+def table(cards):
+    return SupplyDemand.from_cards(cards)
+
+
+def _column(u):
+    return sidcon.donation.units.index(u)
+
+
+class TestSupplyDemand(object):
+    def test_shape(self, table):
+        assert table.counts.shape == (
+            len(sidcon.supply_demand.eras),
+            len(table.owners),
+            len(sidcon.supply_demand.sources),
+            2,
+            len(sidcon.donation.units),
+        )
+
+    def test_converter_inputs(self, cards, table):
+        # Against a walk of every converter with a single input alternative.
+        want = sum(
+            x.inputs.get(White, 0)
+            for c in cards
+            for face in c.faces
+            for x in face.features
+            if isinstance(x, Converter) and isinstance(x.inputs, Mapping)
+        )
+        got = table.total(keep=[2])[CONVERTER, DEMAND, _column(White)]
+        assert got >= want > 0
+
+    def test_sources(self, cards, table):
+        total = table.total(keep=[2])
+        assert total[UPGRADE, DEMAND].sum() > 0
+        assert total[UPGRADE, SUPPLY, _column(VictoryPoint)] > 0
+        created = [c for c in cards if isinstance(c, CreatedCard)]
+        assert created and total[CREATED, DEMAND].sum() > 0
+
+    def test_scarcity(self, table):
+        scarcity = table.scarcity()
+        # Nothing supplies desert colonies, but upgrades take them.
+        assert np.isnan(scarcity[_column(DesertColony)])
+        assert table.total()[DEMAND, _column(DesertColony)] > 0
+        assert 0 < scarcity[_column(White)] < np.inf
+        assert table.scarcity(keep=[0]).shape == (
+            len(sidcon.supply_demand.eras),
+            len(sidcon.donation.units),
+        )
+
+    def test_kt_states_count_once(self, cards):
+        # Microfabricated Adaptive Architecture is reached through either half, but counts once
+        # among the card's four states.
+        (kt,) = [c for c in cards if c.name == "Hand Crafted Polyutility Components"]
+        supply = SupplyDemand.from_cards([kt]).total()[SUPPLY]
+        assert {u: supply[_column(u)] for u in [Blue, Ship, Green, Brown, Ultratech]} == {
+            Blue: 4,
+            Ship: 4,
+            Green: 2,
+            Brown: 2,
+            Ultratech: 2,
+        }
+        assert supply.sum() == 14
+
+    def test_cached(self):
+        assert sidcon.supply_demand.for_all_cards() is sidcon.supply_demand.for_all_cards()
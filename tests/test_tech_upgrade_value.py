@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+import sidcon.batch
+import sidcon.parse
+import sidcon.research
+from sidcon.tech_upgrade_value import UpgradeLandscape, batch_answerer, face_value
+from sidcon.technology import AntimatterPower, DonationAntimatterPower
+
+
+@pytest.fixture(scope="module")
+def landscape():
+    return UpgradeLandscape.from_cards(sidcon.parse.all_cards())
+
+
+class TestUpgradeLandscape(object):
+    def test_gain(self, landscape):
+        for i, e in enumerate(landscape.edges):
+            assert landscape.gain[i] == face_value(e.upgraded) - face_value(e.front)
+
+    def test_technology_cost(self, landscape):
+        cost = sidcon.research.research_costs()[AntimatterPower].min_input_value
+        for i in landscape.by_technology(AntimatterPower):
+            if list(landscape.edges[i].requirements) == [AntimatterPower]:
+                assert landscape.cost[i] == cost
+
+    def test_technology_value(self, landscape):
+        edges = landscape.by_technology(AntimatterPower)
+        assert len(edges) > 0
+        assert landscape.technology_totals()[AntimatterPower] == pytest.approx(
+            landscape.gain[edges].sum()
+        )
+
+    def test_donation_alias(self, landscape):
+        np.testing.assert_array_equal(
+            landscape.by_technology(DonationAntimatterPower),
+            landscape.by_technology(AntimatterPower),
+        )
+
+    def test_ranked(self, landscape):
+        per_cost = landscape.gain_per_cost[landscape.ranked()]
+        priced = per_cost[~np.isnan(per_cost)]
+        assert np.all(priced[:-1] >= priced[1:])
+        assert np.all(np.isnan(per_cost[len(priced) :]))  # noqa: E203
+
+
+class TestBatch(object):
+    def test_answer(self):
+        answer = batch_answerer(sidcon.parse.all_cards())
+        totals = answer({})["technologies"]
+        assert totals["Antimatter Power"] > 0
+        upgrades = answer({"technology": "Antimatter Power", "limit": 2})["upgrades"]
+        assert len(upgrades) == 2
+        caylion = answer({"species_in_play": ["Caylion"]})["technologies"]
+        assert caylion["Antimatter Power"] < totals["Antimatter Power"]
+
+    def test_faction(self):
+        answer = batch_answerer(sidcon.parse.all_cards())
+        assert answer({"faction": "Caylion Plutocracy"})["upgrades"]
+        assert answer({"faction": "Caylion"})["upgrades"]
+        with pytest.raises(sidcon.batch.QueryError):
+            answer({"faction": "No Such Faction"})
+
+    def test_badly_typed(self):
+        answer = batch_answerer(sidcon.parse.all_cards())
+        for query in [
+            {"species_in_play": "Caylion"},
+            {"species_in_play": ["Nobody"]},
+            {"technology": "Antimatter Power", "limit": 2.5},
+        ]:
+            with pytest.raises(sidcon.batch.QueryError):
+                answer(query)
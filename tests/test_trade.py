@@ -0,0 +1,43 @@
+import sidcon.trade
+from sidcon.game import Table, resource_values, resources
+from sidcon.unit import VictoryPoint
+
+
+class TestSurplusesAndDeficits(object):
+    def test_disjoint(self, warm_table):
+        surplus, deficit = sidcon.trade.surpluses_and_deficits(warm_table)
+        assert (surplus >= 0).all() and (deficit >= 0).all()
+        assert not (surplus & deficit).any()
+        assert (surplus <= warm_table.inventory).all()
+        assert not surplus[..., resources.index(VictoryPoint)].any()
+
+    def test_lots_are_fair(self):
+        for r, a, s, b in sidcon.trade._swaps:
+            assert a * resource_values[r] == b * resource_values[s]
+
+
+class TestClear(object):
+    def test_balanced(self, warm_table):
+        clearing = sidcon.trade.clear(warm_table)
+        assert clearing.volume.sum() > 0
+        assert (clearing.give.sum(axis=1) == clearing.take.sum(axis=1)).all()
+        assert (clearing.give @ resource_values == clearing.take @ resource_values).all()
+        assert (clearing.give <= warm_table.inventory).all()
+
+    def test_everyone_gains(self, warm_table):
+        clearing = sidcon.trade.clear(warm_table)
+        traded = (clearing.give + clearing.take).any(axis=-1)
+        assert (clearing.gain[traded] > 0).all()
+        assert (clearing.gain[~traded] == 0).all()
+
+    def test_gain_is_economy_value(self, warm_table):
+        before = warm_table.copy()
+        before.economy()
+        clearing = sidcon.trade.trade(warm_table)
+        warm_table.economy()
+        assert (warm_table.value() - before.value() == clearing.gain).all()
+
+    def test_starting_tables(self, catalogue, factions):
+        table = Table(catalogue, factions)
+        clearing = sidcon.trade.clear(table)
+        assert (clearing.gain >= 0).all()
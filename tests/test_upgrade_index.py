@@ -0,0 +1,59 @@
+import pytest
+
+import sidcon.parse
+from sidcon.technology import AntimatterPower, DonationAntimatterPower, Technology
+from sidcon.upgrade import FactionSpecificUpgradeCondition
+from sidcon.upgrade_index import UpgradeIndex
+
+
+@pytest.fixture(scope="module")
+def cards():
+    return sidcon.parse.all_cards()
+
+
+@pytest.fixture(scope="module")
+def index(cards):
+    return UpgradeIndex(cards)
+
+
+def _scan(cards, key):
+    # The scan the index replaces.
+    keys = [key, DonationAntimatterPower] if key is AntimatterPower else [key]
+    return [
+        c
+        for c in cards
+        if any(
+            u in keys
+            for f in c.front.reachable_faces
+            for _, requirements, _ in f.upgrades
+            for u in requirements
+        )
+    ]
+
+
+class TestUpgradeIndex(object):
+    @pytest.mark.parametrize(
+        "key", [AntimatterPower, FactionSpecificUpgradeCondition.CROSS_COLONIZATION]
+    )
+    def test_cards_match_scan(self, cards, index, key):
+        assert index.cards(key) == _scan(cards, key)
+        assert index.cards(key)
+
+    def test_donation_alias(self, index):
+        assert index.enabled(DonationAntimatterPower) == index.enabled(AntimatterPower)
+        assert index.value_deltas(DonationAntimatterPower) == index.value_deltas(AntimatterPower)
+
+    def test_value_deltas(self, index):
+        deltas = index.value_deltas(AntimatterPower)
+        for owner, delta in deltas.items():
+            enabled = index.enabled(AntimatterPower, owner)
+            assert delta == pytest.approx(sum(e.value_delta for e in enabled))
+        assert sum(len(index.enabled(AntimatterPower, o)) for o in deltas) == len(
+            index.enabled(AntimatterPower)
+        )
+
+    def test_keys_are_canonical(self, index):
+        for key in index.enabled_by:
+            if isinstance(key, type):
+                assert issubclass(key, Technology)
+                assert not key.name.startswith("+")
@@ -0,0 +1,56 @@
+import pytest
+
+import sidcon.parse
+import sidcon.validate
+from sidcon.validate import Cardinality, Every, Rule, Spread, Validator
+
+
+def _letters(card):
+    yield from card
+
+
+class TestValidator(object):
+    def test_no_violations(self):
+        rules = [
+            Every(name="lowercase", stream=_letters, predicate=str.islower),
+            Cardinality(name="distinct", stream=_letters, key=lambda s: s, count=3),
+        ]
+        got = Validator(rules).validate(["ab", "bc"])
+        assert got == []
+
+    def test_reports_every_violation(self):
+        rules = [
+            Every(name="lowercase", stream=_letters, predicate=str.islower),
+            Cardinality(name="distinct", stream=_letters, key=lambda s: s, count=2),
+        ]
+        got = Validator(rules).validate(["aB", "C"])
+        assert [v.rule for v in got] == ["lowercase", "lowercase", "distinct"]
+
+    def test_spread_delta_and_exceptions(self):
+        rules = [
+            Spread(
+                name="spread",
+                stream=_letters,
+                group_by=str.lower,
+                key=ord,
+                count=2,
+                delta=32,
+                exceptions={"c": 1},
+            )
+        ]
+        got = Validator(rules).validate(["aA", "bB", "c", "dd"])
+        assert [v.group for v in got] == ["d"]
+
+    def test_cardinality_ignores_groups(self):
+        rules = [
+            Cardinality(name="distinct", stream=_letters, group_by=str.lower, key=ord, count=3)
+        ]
+        assert Validator(rules).validate(["aA", "b"]) == []
+
+    def test_rule_is_abstract(self):
+        with pytest.raises(TypeError):
+            Rule(name="rule", stream=_letters)  # type: ignore[abstract]
+
+
+def test_tech_card_rules_pass():
+    assert Validator(sidcon.validate.tech_card_rules).validate(sidcon.parse.all_cards()) == []
@@ -0,0 +1,78 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+import sidcon.batch
+import sidcon.parse
+import sidcon.votes
+from sidcon.cost import FactionSpecificCost
+from sidcon.votes import VoteCostRanking, VoteMarket
+
+prices = {1.0: 0.25, 1.5: 0.5, 3.0: 0.25}
+
+
+def _brute_force(offers, votes):
+    if votes > offers:
+        return math.inf
+    expected = 0.0
+    for asks in itertools.product(prices, repeat=offers):
+        p = math.prod(prices[a] for a in asks)
+        expected += p * sum(sorted(asks)[:votes])
+    return expected
+
+
+@pytest.fixture(scope="module")
+def ranking():
+    return VoteCostRanking(sidcon.parse.all_cards())
+
+
+class TestVoteMarket(object):
+    def test_matches_brute_force(self):
+        market = VoteMarket(prices, max_sellers=3, votes_per_seller=2)
+        for sellers in range(4):
+            for votes in range(sidcon.votes.max_votes + 1):
+                assert market.table[sellers, votes] == pytest.approx(
+                    _brute_force(2 * sellers, votes)
+                )
+
+    def test_price(self):
+        market = VoteMarket()
+        cost = FactionSpecificCost.CAYLION_COLLABORATIVE_THREE_VOTES
+        assert market.price(cost, 1) == np.inf
+        assert market.price(cost, 8) == pytest.approx(3.0, abs=0.01)
+        assert market.price(cost, 2) > market.price(cost, 8)
+        with pytest.raises(ValueError):
+            market.price(FactionSpecificCost.JII_CONSTRAINT, 4)
+
+    def test_prices(self):
+        market = VoteMarket()
+        assert list(market.prices([3, 6], 4)) == [market.table[4, 3], market.table[4, 6]]
+
+
+class TestVoteCostRanking(object):
+    def test_cards(self, ranking):
+        assert len(ranking.cards) == 19
+        assert set(ranking.votes) == {4, 5, 6}
+
+    def test_ranked(self, ranking):
+        order, prices = ranking.ranked(4)
+        assert sorted(order) == list(range(len(ranking.cards)))
+        value_per_price = ranking.value[order] / prices[order]
+        assert list(value_per_price) == sorted(value_per_price, reverse=True)
+
+    def test_unaffordable_last(self, ranking):
+        order, prices = ranking.ranked(2)
+        assert np.isinf(prices[order[-1]])
+        assert np.isfinite(prices[order[0]])
+
+    def test_batch_answerer(self):
+        answer = sidcon.votes.batch_answerer(sidcon.parse.all_cards())
+        cards = answer({"sellers": 4, "limit": 2})["cards"]
+        assert len(cards) == 2
+        assert cards[0]["expected_price"] == pytest.approx(7.01953125)
+        with pytest.raises(sidcon.batch.QueryError):
+            answer({"sellers": 20})
+        with pytest.raises(sidcon.batch.QueryError):
+            answer({"sellers": 4.5})